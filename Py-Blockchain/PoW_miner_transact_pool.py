@@ -170,4 +170,3 @@ if __name__ == "__main__":
             print("  ", tx)
 
     print("\nChain valid:", bc.is_chain_valid())
-S
\ No newline at end of file
@@ -1,50 +1,8 @@
 import hashlib
 import json
 import time
-from ecdsa import SigningKey, SECP256k1, VerifyingKey, BadSignatureError
 
-
-# ---------- Wallet / Keys / Addresses ----------
-
-class Wallet:
-    def __init__(self):
-        self.private_key = SigningKey.generate(curve=SECP256k1)
-        self.public_key = self.private_key.get_verifying_key()
-
-    @property
-    def address(self):
-        """
-        Simple address: RIPEMD160(SHA256(pubkey_bytes))
-        """
-        pub_bytes = self.public_key.to_string()
-        sha = hashlib.sha256(pub_bytes).digest()
-        ripe = hashlib.new("ripemd160", sha).hexdigest()
-        return ripe
-
-    def sign(self, message: str) -> str:
-        """
-        Sign an arbitrary message (string) and return hex signature.
-        """
-        message_bytes = message.encode()
-        signature = self.private_key.sign(message_bytes)
-        return signature.hex()
-
-
-def verify_signature(public_key_hex: str, message: str, signature_hex: str) -> bool:
-    try:
-        pub_bytes = bytes.fromhex(public_key_hex)
-        vk = VerifyingKey.from_string(pub_bytes, curve=SECP256k1)
-        vk.verify(bytes.fromhex(signature_hex), message.encode())
-        return True
-    except (BadSignatureError, ValueError):
-        return False
-
-
-def pubkey_to_address(public_key_hex: str) -> str:
-    pub_bytes = bytes.fromhex(public_key_hex)
-    sha = hashlib.sha256(pub_bytes).digest()
-    ripe = hashlib.new("ripemd160", sha).hexdigest()
-    return ripe
+from pychain.crypto import Wallet, pubkey_to_address, verify_signature
 
 
 # ---------- Block / Blockchain ----------
@@ -104,13 +62,15 @@ class Blockchain:
         }
         return json.dumps(tx_core, sort_keys=True)
 
-    def add_signed_transaction(self, sender_pubkey_hex, recipient_address, amount, signature_hex):
+    def add_signed_transaction(self, sender_pubkey_hex, recipient_address, amount, signature_hex, timestamp=None):
         """
         Verify signature and, if valid, add to pool.
         sender_pubkey_hex: hex of sender's public key
         recipient_address: address string
+        timestamp: the timestamp that was signed (defaults to now)
         """
-        timestamp = time.time()
+        if timestamp is None:
+            timestamp = time.time()
         message = self.create_transaction_message(
             sender=pubkey_to_address(sender_pubkey_hex),
             recipient=recipient_address,
@@ -269,7 +229,8 @@ if __name__ == "__main__":
         sender_pubkey_hex=alice.public_key.to_string().hex(),
         recipient_address=bob.address,
         amount=10,
-        signature_hex=signature_hex
+        signature_hex=signature_hex,
+        timestamp=tx_timestamp
     )
 
     # Mine block, reward to miner
@@ -0,0 +1,190 @@
+#admission.py — rate limits and a bounded verification queue for incoming transactions
+#
+# /transaction/new used to verify every signature on the request thread and
+# append to an unbounded pool, so a burst of submissions starved every other
+# endpoint. Here each submission first takes a token from its client's and its
+# sender's bucket (429 when empty), then waits in a bounded queue for one of a
+# few verifier threads (503 when the queue or the pool is full). Both refusals
+# carry a Retry-After estimate and are counted in stats. Bad amounts and
+# overspends are refused (400) before they take a queue slot.
+
+import collections
+import math
+import queue
+import threading
+import time
+
+from mempool_journal import JournalError
+
+
+# ---------- Token buckets ----------
+
+class RateLimiter:
+    """
+    One token bucket per key: `rate` tokens per second up to `burst`.
+    Only the max_keys most recently seen keys are tracked, so memory stays
+    bounded however many clients show up (an evicted key starts full again).
+    """
+
+    def __init__(self, rate, burst, max_keys=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets = collections.OrderedDict()  # key -> [tokens, updated]
+        self.lock = threading.Lock()
+
+    def take(self, key, now=None):
+        """
+        Spend one token for key. Returns 0 if allowed, else seconds until a token is due.
+        """
+        if not self.rate:
+            return 0
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            bucket = self.buckets.pop(key, None)
+            if bucket is None:
+                bucket = [float(self.burst), now]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            self.buckets[key] = bucket
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / self.rate
+
+
+# ---------- Verification queue ----------
+
+class Job:
+    __slots__ = ("args", "result", "error", "done")
+
+    def __init__(self, args):
+        self.args = args
+        self.result = None
+        self.error = None  # (HTTP status, message) instead of a result when the node itself failed
+        self.done = threading.Event()
+
+
+class Admission:
+    """
+    Admits transactions into blockchain's pool through rate limits and a
+    bounded queue served by `workers` threads calling
+    blockchain.add_signed_transaction.
+    """
+
+    def __init__(self, blockchain, client_rate=200, client_burst=400, sender_rate=20, sender_burst=50,
+                 queue_size=256, workers=2, max_pool=50000, wait=5.0):
+        self.blockchain = blockchain
+        self.clients = RateLimiter(client_rate, client_burst)
+        self.senders = RateLimiter(sender_rate, sender_burst)
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.workers = workers
+        self.max_pool = max_pool
+        self.wait = wait
+        self.verify_s = 0.002  # running average, seeds the first Retry-After estimates
+        self.threads = []
+        self.lock = threading.Lock()  # guards threads and stats (verifier and request threads)
+        self.stats = {"accepted": 0, "invalid": 0, "rejected_early": 0, "rate_limited_client": 0,
+                      "rate_limited_sender": 0, "queue_full": 0, "pool_full": 0, "queued_past_wait": 0,
+                      "max_queue_depth": 0, "journal_failed": 0, "errors": 0}
+
+    def start(self):
+        """
+        Start the verifier threads (submit does this on first use).
+        """
+        with self.lock:
+            if self.threads:
+                return self
+            for n in range(self.workers):
+                thread = threading.Thread(target=self.run, name=f"tx-verify-{n}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        return self
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            started = time.perf_counter()
+            try:
+                job.result = self.blockchain.add_signed_transaction(*job.args)
+                outcome = "accepted" if job.result[0] else "invalid"
+            except (ValueError, TypeError) as e:
+                job.result = False, f"Invalid transaction: {e}"
+                outcome = "invalid"
+            except JournalError as e:
+                job.error = 503, str(e)
+                outcome = "journal_failed"
+            except Exception as e:  # one failing job must not take its verifier thread with it
+                job.error = 500, f"Could not admit transaction: {e!r}"
+                outcome = "errors"
+            with self.lock:
+                self.verify_s = 0.9 * self.verify_s + 0.1 * (time.perf_counter() - started)
+                self.stats[outcome] += 1
+            job.done.set()
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def drain_time(self):
+        """
+        Rough seconds until the current queue is verified.
+        """
+        return self.jobs.qsize() * self.verify_s / max(1, self.workers)
+
+    def submit(self, client, sender_pubkey, recipient_address, amount, signature, timestamp):
+        """
+        (status, msg, retry_after): status 201 / 400 once verified, 202 if
+        still queued after `wait` seconds, 429 when rate limited and 503 when
+        the queue or the pool is full.
+        """
+        retry = self.clients.take(client)
+        if retry:
+            self.count("rate_limited_client")
+            return 429, "Too many transactions from this client", retry
+        retry = self.senders.take(sender_pubkey)
+        if retry:
+            self.count("rate_limited_sender")
+            return 429, "Too many transactions from this sender", retry
+
+        ok, msg = self.blockchain.precheck(sender_pubkey, recipient_address, amount, timestamp)
+        if not ok:
+            self.count("rejected_early")  # never reaches the verify queue
+            return 400, msg, None
+
+        if self.max_pool is not None and len(self.blockchain.unconfirmed_transactions) >= self.max_pool:
+            self.count("pool_full")
+            return 503, "Mempool full", 5.0  # drains only as blocks are mined
+
+        if not self.threads:
+            self.start()
+        job = Job((sender_pubkey, recipient_address, amount, signature, timestamp))
+        try:
+            self.jobs.put_nowait(job)
+        except queue.Full:
+            self.count("queue_full")
+            return 503, "Verification queue full", max(self.drain_time(), 1.0)
+        with self.lock:
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.jobs.qsize())
+
+        if not job.done.wait(self.wait):
+            self.count("queued_past_wait")
+            return 202, "Transaction queued for verification", None
+        if job.error is not None:
+            status, msg = job.error
+            return status, msg, (1.0 if status == 503 else None)
+        ok, msg = job.result
+        return (201 if ok else 400), msg, None
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats, queue_depth=self.jobs.qsize(), queue_size=self.jobs.maxsize,
+                        verify_ms=round(self.verify_s * 1000, 3))
+
+
+def retry_after_header(seconds):
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
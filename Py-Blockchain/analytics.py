@@ -0,0 +1,271 @@
+#analytics.py — columnar chain export (.npy) and vectorized chain reports
+#
+# The chain is flattened into one array per field, written as NumPy .npy
+# files that np.load(..., mmap_mode="r") maps without reading them:
+#
+#   height, timestamp, nonce, tx_count, tx_start     one row per block
+#   tx_block, sender, recipient, amount, tx_time     one row per transaction
+#   addresses                                        id -> address (sender / recipient hold ids)
+#   meta.json                                        tip, counts, network id
+#
+# tx_block is the row of the transaction's block in the block columns (equal
+# to its height unless the export starts above genesis), and a block's
+# transactions are rows tx_start[i] : tx_start[i] + tx_count[i]. Exporting
+# needs only the standard library; the reports need numpy.
+#
+#   python analytics.py export --node http://127.0.0.1:5001 --out cols
+#   python analytics.py export --chain-store node1/chain.dat --out cols
+#   python analytics.py report cols --top 20 --interval 3600 --bins 20
+
+import argparse
+import array
+import io
+import json
+import os
+import sys
+import zipfile
+
+from pychain import lazy_import
+
+np = lazy_import("numpy")  # optional: only the reports need it; None when not installed
+
+ORDER = "<" if sys.byteorder == "little" else ">"
+BLOCK_COLUMNS = {"height": "q", "timestamp": "d", "nonce": "q", "tx_count": "i", "tx_start": "q"}
+TX_COLUMNS = {"tx_block": "q", "sender": "i", "recipient": "i", "amount": "d", "tx_time": "d"}
+DTYPES = {"q": "i8", "i": "i4", "d": "f8"}
+
+
+# ---------- Building ----------
+
+def address_text(address):
+    return address.hex() if isinstance(address, bytes) else str(address)
+
+
+def build_columns(blocks):
+    """
+    Columns for `blocks`: Block objects (transactions hold packed addresses)
+    or /chain block dicts. Returns (columns {name: array.array}, addresses
+    [text, in id order], meta).
+    """
+    columns = {name: array.array(code) for name, code in {**BLOCK_COLUMNS, **TX_COLUMNS}.items()}
+    ids = {}
+    tip = None
+    for row, block in enumerate(blocks):
+        if isinstance(block, dict):
+            height, timestamp, nonce, tip = block["index"], block["timestamp"], block["nonce"], block["hash"]
+            transactions, get = block["transactions"], dict.get
+        else:
+            height, timestamp, nonce, tip = block.index, block.timestamp, block.nonce, block.hash
+            transactions, get = block.transactions, getattr
+        columns["height"].append(height)
+        columns["timestamp"].append(timestamp)
+        columns["nonce"].append(nonce)
+        columns["tx_start"].append(len(columns["amount"]))
+        count = 0
+        for tx in transactions:
+            if isinstance(tx, str):
+                continue  # "Genesis Block" marker
+            sender, recipient = get(tx, "sender_address"), get(tx, "recipient_address")
+            columns["tx_block"].append(row)
+            columns["sender"].append(ids.setdefault(sender, len(ids)))
+            columns["recipient"].append(ids.setdefault(recipient, len(ids)))
+            columns["amount"].append(get(tx, "amount"))
+            columns["tx_time"].append(get(tx, "timestamp"))
+            count += 1
+        columns["tx_count"].append(count)
+
+    addresses = [address_text(address) for address in ids]
+    meta = {
+        "blocks": len(columns["height"]),
+        "first_height": columns["height"][0] if columns["height"] else None,
+        "tip": tip,
+        "transactions": len(columns["amount"]),
+        "addresses": len(addresses),
+        "network_id": addresses.index("NETWORK") if "NETWORK" in addresses else None
+    }
+    return columns, addresses, meta
+
+
+def npy_bytes(descr, count, data):
+    """
+    An .npy (format 1.0) file holding a 1-d array of `count` `descr` items.
+    """
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (descr, count)
+    header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1") + data
+
+
+def column_files(columns, addresses, meta):
+    """
+    {file name: bytes} for every column, the address table and meta.json.
+    """
+    files = {}
+    for name, values in columns.items():
+        files[f"{name}.npy"] = npy_bytes(ORDER + DTYPES[values.typecode], len(values), values.tobytes())
+    encoded = [address.encode() for address in addresses]
+    width = max((len(a) for a in encoded), default=1)
+    files["addresses.npy"] = npy_bytes(f"|S{width}", len(encoded), b"".join(a.ljust(width, b"\0") for a in encoded))
+    files["meta.json"] = json.dumps(dict(meta, columns=sorted(files)), indent=2).encode()
+    return files
+
+
+def archive(files):
+    """
+    The files as one uncompressed zip, which np.load also opens as an .npz.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as z:
+        for name, data in files.items():
+            z.writestr(name, data)
+    return buffer.getvalue()
+
+
+def write_files(files, directory):
+    os.makedirs(directory, exist_ok=True)
+    for name, data in files.items():
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+
+
+# ---------- Exporting ----------
+
+def export_from_node(node, directory, timeout=300):
+    import requests
+
+    response = requests.get(f"{node}/analytics/columns", timeout=timeout)
+    response.raise_for_status()
+    with zipfile.ZipFile(io.BytesIO(response.content)) as z:
+        files = {name: z.read(name) for name in z.namelist()}
+    write_files(files, directory)
+    return json.loads(files["meta.json"])
+
+
+def export_from_store(path, directory):
+    """
+    Export a node's chain.dat directly, one block at a time.
+    """
+    from chain_store import ChainStore
+
+    blocks = (json.loads(block_json) for block_json in ChainStore(path).scan())
+    columns, addresses, meta = build_columns(blocks)
+    write_files(column_files(columns, addresses, meta), directory)
+    return meta
+
+
+# ---------- Reports ----------
+
+def load(directory, mmap=True):
+    """
+    {name: array} for an export, memory-mapped unless mmap=False, plus
+    "meta" (the meta.json dict).
+    """
+    if np is None:
+        raise RuntimeError("the reports need numpy (pip install numpy)")
+    columns = {}
+    for name in list(BLOCK_COLUMNS) + list(TX_COLUMNS) + ["addresses"]:
+        columns[name] = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+    with open(os.path.join(directory, "meta.json")) as f:
+        columns["meta"] = json.load(f)
+    return columns
+
+
+def balances(columns):
+    """
+    Balance per address id (rewards included, the NETWORK sender zeroed).
+    """
+    n = len(columns["addresses"])
+    amount = columns["amount"]
+    result = (np.bincount(columns["recipient"], weights=amount, minlength=n)
+              - np.bincount(columns["sender"], weights=amount, minlength=n))
+    network = columns["meta"]["network_id"]
+    if network is not None:
+        result[network] = 0
+    return result
+
+
+def rich_list(columns, top=20):
+    held = balances(columns)
+    top = min(top, len(held))
+    if not top:
+        return []
+    best = np.argpartition(held, -top)[-top:]
+    best = best[np.argsort(held[best])[::-1]]
+    return [{"address": columns["addresses"][i].decode(), "balance": float(held[i])} for i in best]
+
+
+def volume(columns, interval=3600.0):
+    """
+    Transfers (rewards excluded) per `interval` seconds of block time.
+    """
+    block_time = np.asarray(columns["timestamp"])[columns["tx_block"]]
+    keep = np.ones(len(block_time), dtype=bool)
+    network = columns["meta"]["network_id"]
+    if network is not None:
+        keep = np.asarray(columns["sender"]) != network
+    if not keep.any():
+        return []
+    times = block_time[keep]
+    start = np.floor(times.min() / interval) * interval
+    bucket = ((times - start) // interval).astype(np.int64)
+    counts = np.bincount(bucket)
+    amounts = np.bincount(bucket, weights=np.asarray(columns["amount"])[keep])
+    return [{"start": float(start + i * interval), "transactions": int(counts[i]), "amount": float(amounts[i])}
+            for i in np.flatnonzero(counts)]
+
+
+def block_intervals(columns, bins=20):
+    """
+    Seconds between consecutive blocks, as summary statistics and a
+    histogram. Genesis is skipped: its timestamp is when the node started.
+    """
+    times = np.asarray(columns["timestamp"])
+    if columns["meta"]["first_height"] == 0:
+        times = times[1:]
+    gaps = np.diff(times)
+    if not len(gaps):
+        return {"blocks": 0}
+    counts, edges = np.histogram(gaps, bins=bins)
+    return {
+        "blocks": int(len(gaps)),
+        "mean": float(gaps.mean()),
+        "median": float(np.median(gaps)),
+        "p90": float(np.percentile(gaps, 90)),
+        "max": float(gaps.max()),
+        "histogram": [{"from": float(edges[i]), "to": float(edges[i + 1]), "blocks": int(counts[i])}
+                      for i in range(len(counts))]
+    }
+
+
+def report(directory, top=20, interval=3600.0, bins=20):
+    columns = load(directory)
+    return {
+        "meta": columns["meta"],
+        "rich_list": rich_list(columns, top),
+        "volume": volume(columns, interval),
+        "block_intervals": block_intervals(columns, bins)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar chain export and reports.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write the chain as .npy columns")
+    source = export.add_mutually_exclusive_group(required=True)
+    source.add_argument("--node", help="node URL (downloads its /analytics/columns)")
+    source.add_argument("--chain-store", help="a node's chain.dat")
+    export.add_argument("--out", required=True, help="directory for the .npy files")
+    reports = commands.add_parser("report", help="rich list, volume and block intervals of an export")
+    reports.add_argument("directory")
+    reports.add_argument("--top", type=int, default=20)
+    reports.add_argument("--interval", type=float, default=3600.0, help="seconds per volume bucket")
+    reports.add_argument("--bins", type=int, default=20, help="block-interval histogram bins")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        if args.node:
+            meta = export_from_node(args.node, args.out)
+        else:
+            meta = export_from_store(args.chain_store, args.out)
+        print(json.dumps(meta, indent=2))
+    else:
+        print(json.dumps(report(args.directory, args.top, args.interval, args.bins), indent=2))
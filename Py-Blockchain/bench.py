@@ -0,0 +1,804 @@
+#bench.py — reproducible benchmarks for every Block/Blockchain variant in this folder
+#
+#   python bench.py                                 # all variants, all scenarios
+#   python bench.py --quick                         # small sizes, for a smoke run
+#   python bench.py --variants node network_node --scenarios validate --sizes 1000 10000
+#   python bench.py --output bench.json --compare previous.json
+#
+# Scenarios: pow (hashes/sec per difficulty), ingest (add_signed_transaction
+# throughput), validate (is_chain_valid, with and without an assume-valid
+# checkpoint), balance (balance_of vs chain length; one GET /balance per address
+# vs a single POST /balances),
+# chain_json (/chain response), memory (bytes held per transaction after
+# decoding /chain JSON, the time to build the Block objects, and what is left
+# after pruning bodies), compression
+# (/chain size and CPU per HTTP encoding, chain store size and write/load time),
+# bootstrap (time until a new node can serve: full replay vs snapshot + suffix),
+# filters (address filter size vs /chain, false positives, scan time),
+# journal (mempool journal group commits, restart reload vs re-verifying),
+# analytics (columnar export time and size, reports vs a loop over /chain JSON),
+# startup (cold import time of the variant in a fresh interpreter, and of the
+# pychain layers it sits on).
+
+import argparse
+import gc
+import importlib.util
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+VARIANTS = {
+    "py_blockchain": "Py-Blockchain.py",
+    "pow_miner": "PoW_miner_transact_pool.py",
+    "pow_wallets": "PoW_wallets_signing.py",
+    "node": "node.py",
+    "network_node": "network_node.py",
+}
+
+SCENARIOS = ["pow", "ingest", "validate", "balance", "chain_json", "memory", "compression", "bootstrap",
+             "filters", "journal", "analytics", "startup"]
+
+
+# ---------- Loading variants ----------
+
+def load_variant(name):
+    path = os.path.join(HERE, VARIANTS[name])
+    spec = importlib.util.spec_from_file_location(f"bench_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def is_signed(mod):
+    return hasattr(mod, "Wallet")
+
+
+# ---------- Fixtures ----------
+
+class TxPool:
+    """
+    A fixed set of signed transactions, generated once from seeded amounts.
+    Pure-python ECDSA signing is slow, so large chains reuse the pool; every
+    copy is still verified individually by is_chain_valid.
+    """
+
+    def __init__(self, mod, size, seed):
+        rng = random.Random(seed)
+        self.txs = []
+        self.submissions = []
+        signed = is_signed(mod)
+        wallets = [mod.Wallet() for _ in range(8)] if signed else []
+        bc = mod.Blockchain(difficulty=1) if signed else None
+        base_ts = 1_700_000_000.0
+
+        for i in range(size):
+            amount = rng.randint(1, 100)
+            timestamp = base_ts + i
+            if not signed:
+                sender, recipient = f"user{rng.randrange(50)}", f"user{rng.randrange(50)}"
+                self.txs.append({"sender": sender, "recipient": recipient,
+                                 "amount": amount, "timestamp": timestamp})
+                self.submissions.append((sender, recipient, amount))
+                continue
+
+            sender = wallets[i % len(wallets)]
+            recipient = wallets[(i + 1) % len(wallets)].address
+            message = bc.create_transaction_message(sender.address, recipient, amount, timestamp)
+            signature = sender.sign(message)
+            pubkey = sender.public_key.to_string().hex()
+            self.txs.append({
+                "sender_address": sender.address,
+                "sender_pubkey": pubkey,
+                "recipient_address": recipient,
+                "amount": amount,
+                "timestamp": timestamp,
+                "signature": signature
+            })
+            self.submissions.append((pubkey, recipient, amount, signature, timestamp))
+
+        self.addresses = sorted({tx.get("recipient_address", tx.get("recipient")) for tx in self.txs})
+
+    def take(self, count):
+        out = []
+        while len(out) < count:
+            out.extend(self.txs[:count - len(out)])
+        return [dict(tx) for tx in out]
+
+
+def build_chain(mod, pool, total_txs, txs_per_block, difficulty=1):
+    """
+    Build a chain through the variant's own mining path.
+    """
+    if not hasattr(mod.Blockchain, "mine"):
+        bc = mod.Blockchain()
+        for start in range(0, total_txs, txs_per_block):
+            bc.add_block(pool.take(min(txs_per_block, total_txs - start)))
+        return bc
+
+    bc = mod.Blockchain(difficulty=difficulty)
+    for start in range(0, total_txs, txs_per_block):
+        bc.unconfirmed_transactions = pool.take(min(txs_per_block, total_txs - start))
+        quiet(bc.mine)
+    return bc
+
+
+def quiet(func, *args, **kwargs):
+    """
+    The demo variants print from mine(); keep benchmark output clean.
+    """
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        return func(*args, **kwargs)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def block_as_dict(b):
+    if hasattr(b, "to_dict"):
+        return b.to_dict()
+    return {
+        "index": b.index,
+        "timestamp": b.timestamp,
+        "previous_hash": b.previous_hash,
+        "hash": b.hash,
+        "nonce": b.nonce,
+        "transactions": b.transactions
+    }
+
+
+def chain_as_dicts(bc):
+    return [block_as_dict(b) for b in bc.chain]
+
+
+def decode_chain(mod, chain_dicts):
+    """
+    Turn /chain JSON into the variant's in-memory blocks, as resolve_conflicts does.
+    """
+    if hasattr(mod.Block, "from_dict"):
+        return [mod.Block.from_dict(b) for b in chain_dicts]
+    return [
+        mod.Block(index=b["index"], transactions=b["transactions"], timestamp=b["timestamp"],
+                  previous_hash=b["previous_hash"], nonce=b["nonce"])
+        for b in chain_dicts
+    ]
+
+
+def validate(bc, chain_dicts=None):
+    if not hasattr(bc, "is_chain_valid"):
+        return bc.is_valid()
+    if chain_dicts is not None:
+        return bc.is_chain_valid(chain_dicts)
+    return bc.is_chain_valid()
+
+
+def takes_chain_argument(mod):
+    """
+    network_node validates chains received as JSON dicts; the others validate self.chain.
+    """
+    if not hasattr(mod.Blockchain, "is_chain_valid"):
+        return False
+    return "chain" in inspect.signature(mod.Blockchain.is_chain_valid).parameters
+
+
+def timed(func, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+    return result, samples
+
+
+def stats(samples):
+    return {
+        "runs": len(samples),
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "max_s": max(samples),
+    }
+
+
+# ---------- Scenarios ----------
+
+def scenario_pow(mod, args):
+    if not hasattr(mod.Blockchain, "proof_of_work"):
+        return [{"skipped": "variant has no proof of work"}]
+    results = []
+    pool = TxPool(mod, 10, args.seed)
+    for difficulty in args.difficulties:
+        bc = mod.Blockchain(difficulty=difficulty)
+        hashes = 0
+        elapsed = 0.0
+        blocks = 0
+        while blocks < args.pow_blocks or (elapsed < args.pow_seconds and blocks < args.pow_blocks * 20):
+            block = mod.Block(
+                index=len(bc.chain),
+                transactions=pool.take(10),
+                timestamp=time.time(),
+                previous_hash=bc.last_block.hash
+            )
+            start = time.perf_counter()
+            bc.proof_of_work(block)
+            elapsed += time.perf_counter() - start
+            hashes += block.nonce + 1
+            blocks += 1
+        results.append({
+            "params": {"difficulty": difficulty, "txs_per_block": 10},
+            "blocks": blocks,
+            "hashes": hashes,
+            "seconds": elapsed,
+            "hashes_per_sec": hashes / elapsed if elapsed else None,
+            "seconds_per_block": elapsed / blocks
+        })
+    return results
+
+
+def scenario_ingest(mod, args):
+    count = args.ingest_count
+    pool = TxPool(mod, min(count, args.pool_size), args.seed)
+    submissions = [pool.submissions[i % len(pool.submissions)] for i in range(count)]
+
+    if is_signed(mod):
+        def run(allow_overspend=True):
+            bc = mod.Blockchain(difficulty=1)
+            # TxPool wallets are unfunded; measure the accept path unless asked not to
+            bc.allow_overspend = allow_overspend
+            accepted = 0
+            for pubkey, recipient, amount, signature, timestamp in submissions:
+                result = quiet(bc.add_signed_transaction, pubkey, recipient, amount, signature, timestamp)
+                ok = result[0] if isinstance(result, tuple) else result
+                accepted += bool(ok)
+            return accepted
+        label = "add_signed_transaction"
+    elif hasattr(mod.Blockchain, "add_transaction"):
+        def run():
+            bc = mod.Blockchain(difficulty=1)
+            for sender, recipient, amount in submissions:
+                bc.add_transaction(sender, recipient, amount)
+            return count
+        label = "add_transaction"
+    else:
+        return [{"skipped": "variant has no transaction pool"}]
+
+    accepted, samples = timed(run, args.repeat)
+    results = [{
+        "params": {"transactions": count, "call": label},
+        "accepted": accepted,
+        **stats(samples),
+        "tx_per_sec": count / statistics.median(samples)
+    }]
+    if hasattr(mod.Blockchain, "precheck"):
+        # Unfunded senders: rejected by the balance overlay before signature checks
+        rejected, samples = timed(lambda: run(allow_overspend=False), args.repeat)
+        results.append({
+            "params": {"transactions": count, "call": label + " (overspend)"},
+            "accepted": rejected,
+            **stats(samples),
+            "tx_per_sec": count / statistics.median(samples)
+        })
+    return results
+
+
+def scenario_validate(mod, args):
+    results = []
+    pool = TxPool(mod, args.pool_size, args.seed)
+    for size in args.sizes:
+        bc = build_chain(mod, pool, size, args.txs_per_block)
+        chain_dicts = chain_as_dicts(bc) if takes_chain_argument(mod) else None
+        valid, samples = timed(lambda: validate(bc, chain_dicts), args.repeat)
+
+        checkpointed = {}
+        if hasattr(bc, "add_checkpoint"):
+            # A checkpoint one block below the tip: only the tip's signatures are checked
+            tip = len(bc.chain) - 1
+            bc.add_checkpoint(tip - 1, bc.chain[tip - 1].hash)
+            ok, cp_samples = timed(lambda: validate(bc, chain_dicts), args.repeat)
+            bc.checkpoints.clear()
+            checkpointed = {"assume_valid": dict(stats(cp_samples), valid=ok),
+                            "assume_valid_speedup": statistics.median(samples) / statistics.median(cp_samples)}
+
+        results.append({
+            "params": {"transactions": size, "txs_per_block": args.txs_per_block,
+                       "signed": is_signed(mod)},
+            "blocks": len(bc.chain),
+            "valid": valid,
+            **stats(samples),
+            "tx_per_sec": size / statistics.median(samples),
+            **checkpointed
+        })
+    return results
+
+
+def scenario_balance(mod, args):
+    if not hasattr(mod.Blockchain, "balance_of"):
+        return [{"skipped": "variant has no balance_of"}]
+    results = []
+    pool = TxPool(mod, args.pool_size, args.seed)
+    rng = random.Random(args.seed)
+    for blocks in args.chain_lengths:
+        bc = build_chain(mod, pool, blocks * args.balance_txs_per_block, args.balance_txs_per_block)
+        queries = [rng.choice(pool.addresses) for _ in range(args.balance_queries)]
+
+        def run():
+            for address in queries:
+                bc.balance_of(address)
+
+        _, samples = timed(run, args.repeat)
+        result = {
+            "params": {"blocks": blocks, "txs_per_block": args.balance_txs_per_block,
+                       "queries": len(queries)},
+            **stats(samples),
+            "latency_ms": 1000 * statistics.median(samples) / len(queries)
+        }
+        if hasattr(mod.Blockchain, "balances_of"):
+            # The same queries over HTTP: one GET /balance each vs one POST /balances
+            original = mod.blockchain
+            mod.blockchain = bc
+            try:
+                client = mod.app.test_client()
+                _, single = timed(lambda: [client.get(f"/balance/{a}") for a in queries], args.repeat)
+                _, batch = timed(lambda: client.post("/balances", json={"addresses": queries, "pending": True}),
+                                 args.repeat)
+            finally:
+                mod.blockchain = original
+            result["http_single_ms"] = 1000 * statistics.median(single)
+            result["http_batch_ms"] = 1000 * statistics.median(batch)
+        results.append(result)
+    return results
+
+
+def scenario_chain_json(mod, args):
+    if not hasattr(mod, "app"):
+        return [{"skipped": "variant has no HTTP API"}]
+    results = []
+    pool = TxPool(mod, args.pool_size, args.seed)
+    client = mod.app.test_client()
+    original = mod.blockchain
+    try:
+        for size in args.sizes:
+            bc = build_chain(mod, pool, size, args.txs_per_block)
+            mod.blockchain = bc
+
+            encode, encode_samples = timed(lambda: json.dumps(chain_as_dicts(bc)), args.repeat)
+            response, samples = timed(lambda: client.get("/chain"), args.repeat)
+            results.append({
+                "params": {"transactions": size, "txs_per_block": args.txs_per_block},
+                "status": response.status_code,
+                "bytes": len(response.data),
+                "encode_only": stats(encode_samples),
+                **stats(samples)
+            })
+    finally:
+        mod.blockchain = original
+    return results
+
+
+def scenario_memory(mod, args):
+    if not hasattr(mod.Blockchain, "mine"):
+        return [{"skipped": "variant has no transaction blocks"}]
+    results = []
+    pool = TxPool(mod, args.pool_size, args.seed)
+    for size in args.sizes:
+        bc = build_chain(mod, pool, size, args.txs_per_block)
+        text = json.dumps(chain_as_dicts(bc))
+        del bc
+
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        blocks = decode_chain(mod, json.loads(text))
+        decode_s = time.perf_counter() - start
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+
+        pruned = {}
+        if hasattr(mod.Block, "prune"):
+            # Headers only, apart from the last --prune-depth bodies
+            for block in blocks[:-args.prune_depth]:
+                block.prune()
+            gc.collect()
+            pruned = {"pruned_retained_bytes": tracemalloc.get_traced_memory()[0],
+                      "prune_depth": args.prune_depth}
+        tracemalloc.stop()
+
+        results.append({
+            "params": {"transactions": size, "txs_per_block": args.txs_per_block},
+            "blocks": len(blocks),
+            "json_bytes": len(text),
+            "retained_bytes": retained,
+            "bytes_per_tx": retained / size,
+            "decode_s": decode_s,
+            **pruned
+        })
+        del blocks
+    return results
+
+
+def scenario_compression(mod, args):
+    if not hasattr(mod, "chain_json"):
+        return [{"skipped": "variant has no compressed transfer"}]
+    import compression
+    from chain_store import ChainStore
+
+    results = []
+    pool = TxPool(mod, args.pool_size, args.seed)
+    for size in args.sizes:
+        bc = build_chain(mod, pool, size, args.txs_per_block)
+        body = mod.chain_json(bc.chain)
+        transfer = {}
+        for encoding in compression.available_encodings():
+            packed, c_samples = timed(lambda: compression.compress(body, encoding), args.repeat)
+            _, d_samples = timed(lambda: compression.decompress(packed, encoding), args.repeat)
+            transfer[encoding] = {
+                "bytes": len(packed),
+                "ratio": len(body) / len(packed),
+                "compress_s": statistics.median(c_samples),
+                "decompress_s": statistics.median(d_samples)
+            }
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ChainStore(os.path.join(tmp, "chain.dat"))
+            blocks_json = [b.to_json() for b in bc.chain]
+            _, w_samples = timed(lambda: store.rewrite(blocks_json), args.repeat)
+            _, r_samples = timed(store.load, args.repeat)
+            storage = dict(store.stats(), write_s=statistics.median(w_samples),
+                           load_s=statistics.median(r_samples))
+            storage.pop("path")
+
+        results.append({
+            "params": {"transactions": size, "txs_per_block": args.txs_per_block},
+            "json_bytes": len(body),
+            "transfer": transfer,
+            "storage": storage
+        })
+    return results
+
+
+def scenario_bootstrap(mod, args):
+    if not hasattr(mod.Blockchain, "bootstrap"):
+        return [{"skipped": "variant has no snapshot bootstrap"}]
+    results = []
+    pool = TxPool(mod, args.pool_size, args.seed)
+    for size in args.sizes:
+        bc = build_chain(mod, pool, size, args.txs_per_block)
+        chain_dicts = chain_as_dicts(bc)
+        suffix = min(args.suffix_blocks, len(chain_dicts) - 2)
+        height = len(chain_dicts) - suffix
+
+        # The snapshot a peer would have taken `suffix` blocks ago
+        peer = mod.Blockchain(difficulty=1)
+        peer.replace_chain(peer.chain_from_dicts(chain_dicts[:height]))
+        snapshot = peer.take_snapshot()
+
+        def full():
+            node = mod.Blockchain(difficulty=1)
+            blocks = node.chain_from_dicts(chain_dicts)
+            assert node.is_chain_valid(blocks)
+            node.replace_chain(blocks)
+
+        def from_snapshot():
+            node = mod.Blockchain(difficulty=1)
+            ok, msg = node.bootstrap(snapshot, chain_dicts[height - 1:])
+            assert ok, msg
+
+        _, full_samples = timed(full, args.repeat)
+        _, snap_samples = timed(from_snapshot, args.repeat)
+        results.append({
+            "params": {"transactions": size, "txs_per_block": args.txs_per_block,
+                       "suffix_blocks": suffix},
+            "full_replay": stats(full_samples),
+            "snapshot": stats(snap_samples),
+            "snapshot_bytes": len(json.dumps(snapshot)),
+            "median_s": statistics.median(snap_samples),
+            "speedup": statistics.median(full_samples) / statistics.median(snap_samples)
+        })
+    return results
+
+
+def scenario_filters(mod, args):
+    if not hasattr(mod.Blockchain, "block_filter"):
+        return [{"skipped": "variant has no address filters"}]
+    import filters
+    results = []
+    pool = TxPool(mod, args.pool_size, args.seed)
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        bc = build_chain(mod, pool, size, args.txs_per_block)
+        entries = [(bc.block_at(h).hash, data) for h, data in sorted(bc.index.filters.items())]
+        absent = [rng.randbytes(20).hex() for _ in range(args.balance_queries)]
+
+        def scan():
+            return sum(filters.match_any(data, block_hash, absent) for block_hash, data in entries)
+
+        false_positives, samples = timed(scan, args.repeat)
+        results.append({
+            "params": {"transactions": size, "txs_per_block": args.txs_per_block, "queries": len(absent)},
+            "filter_bytes": sum(len(data) for _, data in entries),
+            "chain_bytes": len(mod.chain_json(bc.chain)),
+            "false_positive_rate": false_positives / len(entries),
+            "scan": stats(samples),
+            "median_s": statistics.median(samples)
+        })
+    return results
+
+
+def scenario_journal(mod, args):
+    if not hasattr(mod.Blockchain, "attach_journal"):
+        return [{"skipped": "variant has no mempool journal"}]
+    import threading
+    from mempool_journal import MempoolJournal
+
+    pool = TxPool(mod, args.pool_size, args.seed)
+    submissions = pool.submissions  # distinct transactions; the journal keys entries by txid
+    threads = 8
+
+    def ingest(path=None):
+        bc = mod.Blockchain(difficulty=1)
+        bc.allow_overspend = True
+        if path:
+            bc.attach_journal(MempoolJournal(path))
+        workers = [threading.Thread(target=lambda chunk: [bc.add_signed_transaction(*s) for s in chunk],
+                                    args=(submissions[k::threads],)) for k in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return bc
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mempool.log")
+        _, plain = timed(ingest, args.repeat)
+        bc = None
+        journaled = []
+        for _ in range(args.repeat):
+            if os.path.exists(path):
+                os.remove(path)
+            start = time.perf_counter()
+            bc = ingest(path)
+            journaled.append(time.perf_counter() - start)
+        journal = bc.journal.status()
+
+        def reload():
+            node = mod.Blockchain(difficulty=1)
+            node.allow_overspend = True
+            return node.attach_journal(MempoolJournal(path))["loaded"]
+
+        loaded, reload_samples = timed(reload, args.repeat)
+    return [{
+        "params": {"transactions": len(submissions), "threads": threads},
+        "ingest_tx_per_sec": len(submissions) / statistics.median(plain),
+        "journaled_tx_per_sec": len(submissions) / statistics.median(journaled),
+        "fsyncs": journal["commits"],
+        "largest_commit": journal["largest_commit"],
+        "journal_bytes": journal["file_bytes"],
+        "loaded": loaded,
+        "reload": stats(reload_samples),
+        "median_s": statistics.median(reload_samples),
+        "speedup_vs_reverify": statistics.median(plain) / statistics.median(reload_samples)
+    }]
+
+
+def scenario_analytics(mod, args):
+    if not hasattr(mod, "chain_json"):
+        return [{"skipped": "variant has no /chain JSON"}]
+    import analytics
+    if analytics.np is None:
+        return [{"skipped": "numpy is not installed"}]
+
+    def loop(chain_dicts):
+        # What an analyst's script over /chain does for the same rich list
+        held = {}
+        for block in chain_dicts:
+            for tx in block["transactions"]:
+                if isinstance(tx, dict):
+                    held[tx["sender_address"]] = held.get(tx["sender_address"], 0) - tx["amount"]
+                    held[tx["recipient_address"]] = held.get(tx["recipient_address"], 0) + tx["amount"]
+        held.pop("NETWORK", None)
+        return sorted(held.items(), key=lambda kv: -kv[1])[:20]
+
+    results = []
+    pool = TxPool(mod, args.pool_size, args.seed)
+    for size in args.sizes:
+        bc = build_chain(mod, pool, size, args.txs_per_block)
+        body = mod.chain_json(bc.chain)
+        files, export_samples = timed(lambda: analytics.column_files(*analytics.build_columns(bc.chain)),
+                                      args.repeat)
+        _, loop_samples = timed(lambda: loop(json.loads(body)["chain"]), args.repeat)
+        with tempfile.TemporaryDirectory() as tmp:
+            analytics.write_files(files, tmp)
+            _, report_samples = timed(lambda: analytics.report(tmp), args.repeat)
+        results.append({
+            "params": {"transactions": size, "txs_per_block": args.txs_per_block},
+            "column_bytes": sum(len(data) for data in files.values()),
+            "json_bytes": len(body),
+            "export": stats(export_samples),
+            "report": stats(report_samples),
+            "median_s": statistics.median(report_samples),
+            "speedup_vs_json_loop": statistics.median(loop_samples) / statistics.median(report_samples)
+        })
+    return results
+
+
+def cold_import(code, repeat):
+    """
+    Wall time of `python -c code` in a fresh interpreter, minus `python -c pass`.
+    """
+    def run(source):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", source], cwd=HERE, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return time.perf_counter() - start
+
+    runs = max(repeat, 5)  # single runs are dominated by scheduler noise
+    baseline = statistics.median(run("pass") for _ in range(runs))
+    return [run(code) - baseline for _ in range(runs)]
+
+
+def scenario_startup(mod, args):
+    path = mod.__file__
+    load = ("import importlib.util; "
+            f"spec = importlib.util.spec_from_file_location('variant', {path!r}); "
+            "spec.loader.exec_module(importlib.util.module_from_spec(spec))")
+    results = []
+    targets = [("variant", load)]
+    if os.path.basename(path) == "network_node.py":
+        targets += [(name, f"import {name}") for name in ("pychain", "pychain.crypto", "pychain.chain")]
+    for target, code in targets:
+        samples = cold_import(code, args.repeat)
+        results.append({"params": {"module": target}, "import": stats(samples),
+                        "median_s": statistics.median(samples)})
+    return results
+
+
+SCENARIO_FUNCS = {
+    "pow": scenario_pow,
+    "ingest": scenario_ingest,
+    "validate": scenario_validate,
+    "balance": scenario_balance,
+    "chain_json": scenario_chain_json,
+    "memory": scenario_memory,
+    "compression": scenario_compression,
+    "bootstrap": scenario_bootstrap,
+    "filters": scenario_filters,
+    "journal": scenario_journal,
+    "analytics": scenario_analytics,
+    "startup": scenario_startup,
+}
+
+
+# ---------- Reporting ----------
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def headline(result):
+    """
+    The single number per result used for regression comparison (lower is better).
+    """
+    if "hashes_per_sec" in result and result["hashes_per_sec"]:
+        return 1.0 / result["hashes_per_sec"]
+    return result.get("median_s")
+
+
+def result_key(entry):
+    return (entry["variant"], entry["scenario"], json.dumps(entry.get("params", {}), sort_keys=True))
+
+
+def compare(current, previous_path, threshold):
+    with open(previous_path) as f:
+        previous = {result_key(r): r for r in json.load(f)["results"]}
+    rows = []
+    for entry in current["results"]:
+        old = previous.get(result_key(entry))
+        if old is None or headline(old) is None or headline(entry) is None:
+            continue
+        ratio = headline(entry) / headline(old)
+        rows.append({
+            "variant": entry["variant"],
+            "scenario": entry["scenario"],
+            "params": entry.get("params", {}),
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + threshold
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Py-Blockchain variants.")
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--difficulties", nargs="+", type=int, default=[1, 2, 3, 4])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000],
+                        help="signed transactions per chain for validate / chain_json")
+    parser.add_argument("--chain-lengths", nargs="+", type=int, default=[100, 1000, 10000],
+                        help="blocks per chain for the balance scenario")
+    parser.add_argument("--txs-per-block", type=int, default=100)
+    parser.add_argument("--balance-txs-per-block", type=int, default=10)
+    parser.add_argument("--balance-queries", type=int, default=20)
+    parser.add_argument("--ingest-count", type=int, default=1000)
+    parser.add_argument("--pool-size", type=int, default=200)
+    parser.add_argument("--prune-depth", type=int, default=2,
+                        help="block bodies kept for the pruned figure in the memory scenario")
+    parser.add_argument("--suffix-blocks", type=int, default=10,
+                        help="blocks after the snapshot in the bootstrap scenario")
+    parser.add_argument("--pow-blocks", type=int, default=5)
+    parser.add_argument("--pow-seconds", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--quick", action="store_true", help="small sizes for a smoke run")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.difficulties = [1, 2]
+        args.sizes = [100, 500]
+        args.chain_lengths = [10, 100]
+        args.txs_per_block = 50
+        args.ingest_count = 100
+        args.pool_size = 50
+        args.pow_blocks = 2
+        args.pow_seconds = 0.2
+        args.repeat = 1
+
+    report = {
+        "meta": {
+            "started_at": time.time(),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "git_revision": git_revision(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "results": []
+    }
+
+    for name in args.variants:
+        mod = load_variant(name)
+        for scenario in args.scenarios:
+            print(f"[bench] {name} / {scenario}", file=sys.stderr)
+            for result in SCENARIO_FUNCS[scenario](mod, args):
+                report["results"].append({"variant": name, "scenario": scenario, **result})
+
+    report["meta"]["finished_at"] = time.time()
+
+    if args.compare:
+        report["comparison"] = compare(report, args.compare, args.threshold)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare and any(row["regression"] for row in report["comparison"]):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
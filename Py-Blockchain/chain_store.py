@@ -0,0 +1,222 @@
+#chain_store.py — append-only, block-level compressed chain file
+#
+# Layout:
+#   b"PYCHAIN1"
+#   u32 dictionary length, dictionary bytes        (zlib preset dictionary)
+#   records: u32 payload length, u32 crc32, payload (zlib-compressed block JSON)
+#
+# Blocks are compressed one at a time so add_block() is a single append and any
+# block can be read back alone. Block JSON is very repetitive across blocks (key
+# names, the same addresses and pubkeys), but each block on its own is small, so
+# every record is compressed against a shared preset dictionary of the fragments
+# that repeat most. rewrite() retrains that dictionary from the chain it writes.
+# Record offsets are kept so read() can fetch one block (a pruned body) alone.
+
+import array
+import collections
+import os
+import re
+import struct
+import zlib
+
+MAGIC = b"PYCHAIN1"
+HEADER = struct.Struct("<II")
+MAX_DICT = 32 * 1024
+LEVEL = 9
+TRAIN_SAMPLES = 1024
+
+# Skeleton every block and transaction shares; kept at the end of the
+# dictionary (closest to the data, cheapest to reference) unless retrained.
+BASE_DICTIONARY = (
+    b'"Genesis Block"'
+    b'{"sender_address": "NETWORK", "sender_pubkey": null, "signature": null'
+    b'{"hash": "000, "index": , "nonce": , "previous_hash": "000, "timestamp": , "transactions": [{"amount": , '
+    b'"recipient_address": "", "sender_address": "", "sender_pubkey": "", "signature": "", "timestamp": }, {"amount": '
+)
+
+_STRING = re.compile(rb'"([0-9a-f]{40,})"')
+
+
+def train_dictionary(samples, size=MAX_DICT):
+    """
+    Pick the long hex values (addresses, pubkeys) that recur across blocks and
+    pack the most valuable ones into a zlib preset dictionary.
+    """
+    counts = collections.Counter()
+    for sample in samples:
+        for value in set(_STRING.findall(sample)):
+            counts[value] += 1
+
+    budget = size - len(BASE_DICTIONARY)
+    picked = []
+    for value, count in sorted(counts.items(), key=lambda kv: -(kv[1] - 1) * len(kv[0])):
+        if count < 2 or len(value) + 2 > budget:
+            continue
+        picked.append(b'"' + value + b'"')
+        budget -= len(value) + 2
+    # zlib favours the end of the dictionary, so the most valuable entries go last
+    picked.reverse()
+    return b"".join(picked) + BASE_DICTIONARY
+
+
+class ChainStore:
+    def __init__(self, path):
+        self.path = path
+        self.dictionary = BASE_DICTIONARY
+        self.count = 0
+        self.raw_bytes = 0
+        self.trained_at = 0
+        self.offsets = array.array("Q")
+        if not os.path.exists(path):
+            self._write([], BASE_DICTIONARY)
+
+    # ----- Encoding -----
+
+    def _compress(self, data, dictionary=None):
+        dictionary = self.dictionary if dictionary is None else dictionary
+        c = zlib.compressobj(LEVEL, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, dictionary)
+        return c.compress(data) + c.flush()
+
+    def _decompress(self, payload):
+        d = zlib.decompressobj(-15, self.dictionary)
+        return d.decompress(payload) + d.flush()
+
+    def _record(self, block_json, dictionary=None):
+        payload = self._compress(block_json, dictionary)
+        return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+    # ----- Reading -----
+
+    def scan(self):
+        """
+        Yield block JSON bytes for every intact record, one at a time. Once
+        exhausted, a torn final record (crash mid-append) has been cut off so
+        the next append starts on a clean boundary.
+        """
+        offsets = array.array("Q")
+        raw_bytes = 0
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a chain store")
+            (dict_len,) = struct.unpack("<I", f.read(4))
+            self.dictionary = f.read(dict_len)
+            good = f.tell()
+            while True:
+                head = f.read(HEADER.size)
+                if len(head) < HEADER.size:
+                    break
+                length, crc = HEADER.unpack(head)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                block_json = self._decompress(payload)
+                offsets.append(good)
+                raw_bytes += len(block_json)
+                good = f.tell()
+                yield block_json
+            end = f.seek(0, os.SEEK_END)
+        if good < end:
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+        self.offsets = offsets
+        self.count = len(offsets)
+        self.raw_bytes = raw_bytes
+        self.trained_at = self.count
+
+    def load(self):
+        return list(self.scan())
+
+    def read(self, position):
+        """
+        JSON bytes of the block at `position` (its height).
+        """
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[position])
+            length, crc = HEADER.unpack(f.read(HEADER.size))
+            payload = f.read(length)
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"{self.path}: record {position} is corrupt")
+        return self._decompress(payload)
+
+    # ----- Writing -----
+
+    def append(self, block_json):
+        record = self._record(block_json)
+        with open(self.path, "ab") as f:
+            self.offsets.append(f.seek(0, os.SEEK_END))
+            f.write(record)
+            f.flush()
+            os.fsync(f.fileno())
+        self.count += 1
+        self.raw_bytes += len(block_json)
+
+    def truncate(self, count):
+        """
+        Drop every record from position `count` on. Call after scan().
+        """
+        if count >= self.count:
+            return
+        with open(self.path, "r+b") as f:
+            f.truncate(self.offsets[count])
+            f.flush()
+            os.fsync(f.fileno())
+        for _ in self.scan():  # recount offsets and sizes of what is left
+            pass
+
+    def should_retrain(self):
+        """
+        Retrain whenever the chain has doubled since the dictionary was built.
+        """
+        return self.count >= 64 and self.count >= 2 * max(self.trained_at, 1)
+
+    def rewrite(self, blocks_json, retrain=True):
+        """
+        Replace the whole file atomically (chain replacement / compaction).
+        """
+        dictionary = train_dictionary(blocks_json) if retrain else self.dictionary
+        self._write(blocks_json, dictionary)
+        if retrain:
+            self.trained_at = self.count
+
+    def compact(self):
+        """
+        Retrain the dictionary on a sample of the stored blocks and recompress
+        every record into a new file, one block at a time.
+        """
+        step = max(1, self.count // TRAIN_SAMPLES)
+        samples = [self.read(i) for i in range(0, self.count, step)]
+        self._write((self.read(i) for i in range(self.count)), train_dictionary(samples))
+        self.trained_at = self.count
+
+    def _write(self, blocks_json, dictionary):
+        """
+        blocks_json may be a generator reading this store: the old dictionary
+        stays in use until every record has been written.
+        """
+        tmp = self.path + ".tmp"
+        offsets = array.array("Q")
+        raw_bytes = 0
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(dictionary)) + dictionary)
+            for block_json in blocks_json:
+                offsets.append(f.tell())
+                raw_bytes += len(block_json)
+                f.write(self._record(block_json, dictionary))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.dictionary = dictionary
+        self.offsets = offsets
+        self.count = len(offsets)
+        self.raw_bytes = raw_bytes
+
+    def stats(self):
+        size = os.path.getsize(self.path)
+        return {
+            "path": self.path,
+            "blocks": self.count,
+            "raw_bytes": self.raw_bytes,
+            "file_bytes": size,
+            "ratio": round(self.raw_bytes / size, 3) if size else None,
+            "dictionary_bytes": len(self.dictionary)
+        }
@@ -0,0 +1,448 @@
+#cluster.py — local multi-node cluster harness with a signed-traffic load generator
+#
+#   python cluster.py --nodes 4 --tps 20 --duration 30 --mine-interval 5
+#   python cluster.py --nodes 3 --output cluster.json
+#
+# Starts N network_node.py processes on localhost, registers every node with
+# every other through /nodes/register, submits validly signed transactions from
+# generated wallets at a fixed rate, mines on the nodes in turn, and reports
+# sustained TPS, block propagation latency, convergence time after
+# /nodes/resolve and per-node CPU / memory. Needs nothing but this folder.
+
+import argparse
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+from pychain import Blockchain, Wallet  # noqa: E402
+
+
+# ---------- Processes ----------
+
+def clock_ticks():
+    try:
+        return os.sysconf("SC_CLK_TCK")
+    except (ValueError, OSError, AttributeError):
+        return 100
+
+
+def process_usage(pid):
+    """
+    CPU seconds and resident memory of a process, read from /proc (Linux).
+    Returns (None, None) where /proc is not available.
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / clock_ticks()
+        rss_kb = None
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss_kb = int(line.split()[1])
+                    break
+        return cpu, rss_kb
+    except (OSError, IndexError, ValueError):
+        return None, None
+
+
+class NodeProcess:
+    def __init__(self, port, difficulty, log_dir, extra_args=()):
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.log_path = os.path.join(log_dir, f"node-{port}.log")
+        self.log = open(self.log_path, "w")
+        cmd = [sys.executable, os.path.join(HERE, "network_node.py"),
+               "--host", "127.0.0.1", "--port", str(port),
+               # The load generator's wallets are never funded
+               "--difficulty", str(difficulty), "--no-debug", "--allow-overspend", *extra_args]
+        self.proc = subprocess.Popen(cmd, stdout=self.log, stderr=subprocess.STDOUT, cwd=HERE)
+        self.cpu_start = None
+        self.peak_rss_kb = 0
+
+    def wait_ready(self, timeout=20.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"node on port {self.port} exited, see {self.log_path}")
+            try:
+                if requests.get(f"{self.url}/status", timeout=0.5).status_code == 200:
+                    self.cpu_start, _ = process_usage(self.proc.pid)
+                    return
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(0.1)
+        raise RuntimeError(f"node on port {self.port} did not start, see {self.log_path}")
+
+    def sample(self):
+        _, rss = process_usage(self.proc.pid)
+        if rss is not None:
+            self.peak_rss_kb = max(self.peak_rss_kb, rss)
+
+    def usage(self, elapsed):
+        cpu, rss = process_usage(self.proc.pid)
+        cpu_seconds = None if cpu is None or self.cpu_start is None else cpu - self.cpu_start
+        return {
+            "url": self.url,
+            "pid": self.proc.pid,
+            "cpu_seconds": cpu_seconds,
+            "cpu_percent": None if cpu_seconds is None else round(100.0 * cpu_seconds / elapsed, 1),
+            "rss_kb": rss,
+            "peak_rss_kb": self.peak_rss_kb or rss
+        }
+
+    def stop(self):
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.log.close()
+
+
+def status(url, timeout=2):
+    return requests.get(f"{url}/status", timeout=timeout).json()
+
+
+# ---------- Load generation ----------
+
+class LoadGenerator:
+    """
+    Open-loop generator: submissions are scheduled at a fixed rate whether or
+    not earlier ones have returned, so a slow node shows up as latency and
+    errors rather than as a silently lower offered load. Each transaction
+    goes to `fanout` consecutive nodes (nodes do not relay transactions to
+    each other); only the first submission is counted.
+    """
+
+    def __init__(self, urls, wallets, tps, seed, workers=16, fanout=1):
+        self.urls = urls
+        self.fanout = min(fanout, len(urls))
+        self.wallets = wallets
+        self.tps = tps
+        self.rng = random.Random(seed)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.errors = 0
+        self.latencies = []
+        self.stop_event = threading.Event()
+        self.helper = Blockchain(difficulty=1)
+
+    def make_submission(self):
+        sender, recipient = self.rng.sample(self.wallets, 2)
+        amount = self.rng.randint(1, 10)
+        timestamp = time.time()
+        message = self.helper.create_transaction_message(sender.address, recipient.address, amount, timestamp)
+        return {
+            "sender_pubkey": sender.public_key.to_string().hex(),
+            "recipient_address": recipient.address,
+            "amount": amount,
+            "signature": sender.sign(message),
+            "timestamp": timestamp
+        }
+
+    def submit(self, url, payload, counted=True):
+        start = time.perf_counter()
+        try:
+            response = requests.post(f"{url}/transaction/new", json=payload, timeout=10)
+        except requests.exceptions.RequestException:
+            with self.lock:
+                self.errors += counted
+            return
+        if not counted:
+            return
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.latencies.append(elapsed)
+            if response.status_code == 201:
+                self.accepted += 1
+            elif response.status_code in (429, 503):
+                self.throttled += 1
+            else:
+                self.rejected += 1
+
+    def run(self, duration):
+        interval = 1.0 / self.tps
+        targets = itertools.cycle(range(len(self.urls)))
+        start = time.perf_counter()
+        sent = 0
+        while not self.stop_event.is_set():
+            now = time.perf_counter() - start
+            if now >= duration:
+                break
+            due = int(now / interval) + 1
+            while sent < due:
+                first, payload = next(targets), self.make_submission()
+                for k in range(self.fanout):
+                    url = self.urls[(first + k) % len(self.urls)]
+                    self.pool.submit(self.submit, url, payload, k == 0)
+                sent += 1
+            time.sleep(min(interval, 0.05))
+        self.pool.shutdown(wait=True)
+        return sent
+
+
+# ---------- Mining / propagation ----------
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def summarize(values):
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_s": sum(values) / len(values),
+        "p50_s": percentile(values, 50),
+        "p95_s": percentile(values, 95),
+        "max_s": max(values)
+    }
+
+
+def watch_propagation(block_hash, height, urls, timeout, poll):
+    """
+    Seconds until each node reports the block (or a chain at least as long).
+    """
+    start = time.perf_counter()
+    remaining = set(urls)
+    seen = {}
+    while remaining and time.perf_counter() - start < timeout:
+        for url in list(remaining):
+            try:
+                info = status(url, timeout=1)
+            except requests.exceptions.RequestException:
+                continue
+            if info["tip"] == block_hash or info["height"] > height:
+                seen[url] = time.perf_counter() - start
+                remaining.discard(url)
+        if remaining:
+            time.sleep(poll)
+    return seen, sorted(remaining)
+
+
+def miner_loop(nodes, wallets, interval, stop_event, results, args):
+    turn = itertools.cycle(nodes)
+    while not stop_event.wait(interval):
+        node = next(turn)
+        miner = random.choice(wallets)
+        start = time.perf_counter()
+        try:
+            response = requests.get(f"{node.url}/mine", params={"miner_address": miner.address}, timeout=60)
+        except requests.exceptions.RequestException:
+            results["mine_errors"] += 1
+            continue
+        mine_seconds = time.perf_counter() - start
+        if response.status_code != 200:
+            results["empty_rounds"] += 1
+            continue
+
+        block = response.json()
+        others = [n.url for n in nodes if n is not node]
+        seen, missing = watch_propagation(block["hash"], block["index"] + 1, others,
+                                          args.propagation_timeout, args.poll)
+        results["blocks"].append({
+            "miner": node.url,
+            "index": block["index"],
+            "transactions": len(block["transactions"]),
+            "mine_call_s": mine_seconds,
+            "propagation_s": seen,
+            "not_propagated": missing
+        })
+
+
+def converge(nodes, timeout, poll):
+    """
+    Ask every node to run consensus, then time until all tips agree. The
+    requests return at once; rounds run on each node's consensus worker.
+    """
+    start = time.perf_counter()
+    for node in nodes:
+        try:
+            requests.get(f"{node.url}/nodes/resolve", timeout=timeout)
+        except requests.exceptions.RequestException:
+            pass
+    while time.perf_counter() - start < timeout:
+        try:
+            tips = {status(node.url)["tip"] for node in nodes}
+        except requests.exceptions.RequestException:
+            tips = set()
+        if len(tips) == 1:
+            return time.perf_counter() - start, True
+        time.sleep(poll)
+    return time.perf_counter() - start, False
+
+
+# ---------- Main ----------
+
+def run(args):
+    log_dir = args.log_dir or tempfile.mkdtemp(prefix="pychain-cluster-")
+    nodes = [NodeProcess(args.base_port + i, args.difficulty, log_dir, args.node_arg)
+             for i in range(args.nodes)]
+    try:
+        for node in nodes:
+            node.wait_ready()
+
+        for node in nodes:
+            peers = [n.url for n in nodes if n is not node]
+            requests.post(f"{node.url}/nodes/register", json={"nodes": peers}, timeout=5)
+
+        wallets = [Wallet() for _ in range(args.wallets)]
+        generator = LoadGenerator([n.url for n in nodes], wallets, args.tps, args.seed,
+                                  fanout=args.tx_fanout)
+
+        stop_event = threading.Event()
+        mining = {"blocks": [], "mine_errors": 0, "empty_rounds": 0}
+        miner = threading.Thread(target=miner_loop,
+                                 args=(nodes, wallets, args.mine_interval, stop_event, mining, args),
+                                 daemon=True)
+
+        def sampler():
+            while not stop_event.wait(0.5):
+                for node in nodes:
+                    node.sample()
+
+        sampler_thread = threading.Thread(target=sampler, daemon=True)
+
+        print(f"[cluster] {args.nodes} nodes up, logs in {log_dir}", file=sys.stderr)
+        started = time.perf_counter()
+        miner.start()
+        sampler_thread.start()
+        sent = generator.run(args.duration)
+        load_seconds = time.perf_counter() - started
+        stop_event.set()
+        miner.join()
+
+        # Mine whatever is still pending so confirmed TPS covers the whole run. Peers
+        # sync announced blocks in the background, so let each block reach the
+        # others before the next node mines on top of it.
+        for node in nodes:
+            try:
+                response = requests.get(f"{node.url}/mine", params={"miner_address": wallets[0].address},
+                                        timeout=60)
+            except requests.exceptions.RequestException:
+                continue
+            if response.status_code == 200:
+                block = response.json()
+                watch_propagation(block["hash"], block["index"] + 1, [n.url for n in nodes if n is not node],
+                                  args.propagation_timeout, args.poll)
+
+        convergence_s, converged = converge(nodes, args.convergence_timeout, args.poll)
+        elapsed = time.perf_counter() - started
+        final = [status(node.url) for node in nodes]
+        rounds = [info["consensus"] for info in final]
+        relay = [info["relay"] for info in final]
+
+        chain = requests.get(f"{nodes[0].url}/chain", timeout=60).json()["chain"]
+        confirmed = sum(
+            1 for block in chain[1:] for tx in block["transactions"]
+            if tx != "Genesis Block" and tx["sender_address"] != "NETWORK"
+        )
+
+        propagation = [s for b in mining["blocks"] for s in b["propagation_s"].values()]
+        return {
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+            "load": {
+                "offered": sent,
+                "offered_tps": sent / load_seconds,
+                "accepted": generator.accepted,
+                "rejected": generator.rejected,
+                "throttled": generator.throttled,
+                "errors": generator.errors,
+                "accepted_tps": generator.accepted / load_seconds,
+                "submit_latency": summarize(generator.latencies)
+            },
+            "chain": {
+                "height": len(chain),
+                "confirmed_transactions": confirmed,
+                "confirmed_tps": confirmed / elapsed
+            },
+            "mining": {
+                "blocks_mined": len(mining["blocks"]),
+                "empty_rounds": mining["empty_rounds"],
+                "errors": mining["mine_errors"],
+                "mine_call": summarize([b["mine_call_s"] for b in mining["blocks"]]),
+                "propagation": summarize(propagation),
+                "unpropagated": sum(len(b["not_propagated"]) for b in mining["blocks"]),
+                "blocks": mining["blocks"]
+            },
+            "relay": {
+                "compact_bytes": sum(r["sent_bytes"] for r in relay),
+                "full_block_bytes": sum(r["full_bytes"] for r in relay),
+                "pooled_txs": sum(r["pooled_txs"] for r in relay),
+                "missing_txs": sum(r["missing_txs"] for r in relay),
+                "fallbacks": sum(r["fallbacks"] for r in relay)
+            },
+            "convergence": {
+                "seconds": convergence_s,
+                "converged": converged,
+                # announcements received vs. full syncs actually run
+                "triggers": sum(r["triggers"] for r in rounds),
+                "coalesced": sum(r["coalesced"] for r in rounds),
+                "rounds": sum(r["rounds"] for r in rounds)
+            },
+            "nodes": [node.usage(elapsed) for node in nodes],
+            "log_dir": log_dir
+        }
+    finally:
+        for node in nodes:
+            node.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local network_node cluster under signed load.")
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--base-port", type=int, default=5100)
+    parser.add_argument("--difficulty", type=int, default=2)
+    parser.add_argument("--tps", type=float, default=10.0, help="offered transactions per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--wallets", type=int, default=10)
+    parser.add_argument("--tx-fanout", type=int, default=1,
+                        help="submit each transaction to this many nodes")
+    parser.add_argument("--mine-interval", type=float, default=5.0)
+    parser.add_argument("--propagation-timeout", type=float, default=10.0)
+    parser.add_argument("--convergence-timeout", type=float, default=30.0)
+    parser.add_argument("--poll", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--log-dir")
+    parser.add_argument("--node-arg", action="append", default=[],
+                        help="extra argument passed to every network_node.py (repeatable)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.nodes < 2:
+        parser.error("--nodes must be at least 2")
+
+    report = run(args)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#compression.py — Accept-Encoding negotiation and codecs for chain transfer
+
+import gzip
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd is offered only when the package is installed
+    zstandard = None
+
+MIN_SIZE = 1024
+LEVELS = {"zstd": 3, "gzip": 6, "deflate": 6}
+
+
+def available_encodings():
+    encodings = ["gzip", "deflate"]
+    if zstandard is not None:
+        encodings.insert(0, "zstd")
+    return encodings
+
+
+def accept_encoding_header():
+    """
+    What fetch_chain() advertises to peers.
+    """
+    return ", ".join(available_encodings())
+
+
+def parse_accept_encoding(header):
+    """
+    "gzip;q=0.5, zstd, identity;q=0" -> {"gzip": 0.5, "zstd": 1.0, "identity": 0.0}
+    """
+    prefs = {}
+    for part in (header or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        prefs[name.strip().lower()] = q
+    return prefs
+
+
+def negotiate(header):
+    """
+    Best encoding both sides support, or None for identity. Ties go to our
+    own preference order (zstd, gzip, deflate).
+    """
+    prefs = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = prefs.get(encoding, prefs.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data, encoding, level=None):
+    level = LEVELS[encoding] if level is None else level
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == "deflate":
+        return zlib.compress(data, level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"unsupported encoding {encoding!r}")
+
+
+def decompress(data, encoding):
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    if encoding == "deflate":
+        return zlib.decompress(data)
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"unsupported encoding {encoding!r}")
+
+
+def compressed_response(body, mimetype="application/json"):
+    """
+    Flask Response for `body` (bytes), compressed with whatever the current
+    request's Accept-Encoding allows. Small bodies are sent as-is.
+    """
+    from flask import Response, request
+
+    encoding = negotiate(request.headers.get("Accept-Encoding")) if len(body) >= MIN_SIZE else None
+    if encoding is not None:
+        body = compress(body, encoding)
+    response = Response(body, mimetype=mimetype)
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
@@ -9,6 +9,8 @@ export default function BlockchainPanel() {
   const [address, setAddress] = useState("");
   const [balance, setBalance] = useState(null);
   const [mining, setMining] = useState(false);
+  const [history, setHistory] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
 
   // Fetch chain
   const loadChain = async () => {
@@ -32,6 +34,15 @@ export default function BlockchainPanel() {
     setBalance(data.balance);
   };
 
+  // Fetch address activity (indexed on the node, one page at a time)
+  const loadHistory = async (cursor = 0) => {
+    if (!address) return;
+    const res = await fetch(`${API}/address/${address}/transactions?cursor=${cursor}&limit=20`);
+    const data = await res.json();
+    setHistory(cursor === 0 ? data.transactions : [...history, ...data.transactions]);
+    setNextCursor(data.next_cursor);
+  };
+
   // Mine a block
   const mineBlock = async () => {
     setMining(true);
@@ -68,9 +79,21 @@ export default function BlockchainPanel() {
           onChange={(e) => setAddress(e.target.value)}
         />
         <button onClick={loadBalance}>Check Balance</button>
+        <button onClick={() => loadHistory(0)}>Show Activity</button>
         {balance !== null && (
           <p className="balance">Balance: {balance}</p>
         )}
+        {history.map((item) => (
+          <div key={`${item.block_height}-${item.position}`} className="tx-card">
+            <p><strong>Block:</strong> #{item.block_height} ({item.confirmations} confirmations)</p>
+            <p><strong>From:</strong> {item.transaction.sender_address}</p>
+            <p><strong>To:</strong> {item.transaction.recipient_address}</p>
+            <p><strong>Amount:</strong> {item.transaction.amount}</p>
+          </div>
+        ))}
+        {nextCursor !== null && (
+          <button onClick={() => loadHistory(nextCursor)}>Load More</button>
+        )}
       </div>
 
       {/* Mining */}
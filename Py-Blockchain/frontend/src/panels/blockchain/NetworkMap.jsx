@@ -5,6 +5,7 @@ const API = "http://localhost:5000";
 
 export default function NetworkMap() {
   const [selfInfo, setSelfInfo] = useState(null);
+  const [peers, setPeers] = useState([]);
 
   const loadSelf = async () => {
     const res = await fetch(`${API}/chain`);
@@ -16,12 +17,31 @@ export default function NetworkMap() {
     });
   };
 
-  useEffect(() => {
+  // Latency, height and health as the node itself measured them
+  const loadPeers = async () => {
+    const res = await fetch(`${API}/nodes`);
+    const data = await res.json();
+    setPeers(data.peers || []);
+  };
+
+  const load = () => {
     loadSelf();
-    const interval = setInterval(loadSelf, 3000);
+    loadPeers();
+  };
+
+  useEffect(() => {
+    load();
+    const interval = setInterval(load, 3000);
     return () => clearInterval(interval);
   }, []);
 
+  const syncLabel = (peer) => {
+    if (peer.height == null || !selfInfo) return "unknown";
+    const diff = peer.height - selfInfo.height;
+    if (diff === 0) return "in sync";
+    return diff > 0 ? `${diff} ahead` : `${-diff} behind`;
+  };
+
   return (
     <div className="network-panel">
       <h1>Network Map</h1>
@@ -35,9 +55,42 @@ export default function NetworkMap() {
         </div>
       )}
 
-      <p className="note">
-        Multi-node consensus coming next — this panel will auto‑discover peers and visualize the network graph.
-      </p>
+      <h2>Peers ({peers.length})</h2>
+      {peers.length === 0 && <p className="note">No peers registered.</p>}
+      {peers.length > 0 && (
+        <table className="peer-table">
+          <thead>
+            <tr>
+              <th>Peer</th>
+              <th>Status</th>
+              <th>RTT</th>
+              <th>Height</th>
+              <th>Sync</th>
+              <th>Last seen</th>
+              <th>Failures</th>
+              <th>Strikes</th>
+            </tr>
+          </thead>
+          <tbody>
+            {peers.map((peer) => (
+              <tr key={peer.url} className={`peer-${peer.status}`}>
+                <td>{peer.url}</td>
+                <td>
+                  {peer.status}
+                  {peer.status === "backoff" && ` (${peer.retry_in}s)`}
+                  {peer.status === "banned" && ` (${peer.banned_for}s)`}
+                </td>
+                <td>{peer.rtt_ms == null ? "–" : `${peer.rtt_ms} ms`}</td>
+                <td>{peer.height ?? "–"}</td>
+                <td>{syncLabel(peer)}</td>
+                <td>{peer.last_seen ? new Date(peer.last_seen * 1000).toLocaleTimeString() : "never"}</td>
+                <td>{peer.failures}</td>
+                <td>{peer.strikes}</td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      )}
     </div>
   );
 }
@@ -0,0 +1,280 @@
+#hd_wallet.py — seed-based hierarchical key derivation (BIP32 on SECP256k1)
+#
+# One random seed yields a tree of keys: HMAC-SHA512 of the seed gives the
+# master key and chain code, and every child key is derived from its parent's
+# chain code and index. Back up the seed once and any key can be re-derived
+# from its path, e.g. m/44'/0'/0'/0/17 (' marks hardened indexes).
+#
+# Non-hardened children can be derived from the parent's public half alone
+# (an "xpub": compressed public key + chain code, 65 bytes hex here), so a
+# node given an account xpub can hand out deposit addresses without ever
+# holding a private key. Addresses are the same RIPEMD160(SHA256(pubkey)) as
+# pychain.crypto.Wallet; keys sign through Wallet.from_private_key.
+#
+#   python hd_wallet.py seed > seed.txt
+#   python hd_wallet.py xpub --seed-file seed.txt --path "m/44'/0'/0'/0"
+#   python hd_wallet.py key --seed-file seed.txt --path "m/44'/0'/0'/0/17"
+#   python hd_wallet.py addresses --xpub <xpub> --start 0 --count 100
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import threading
+
+from ecdsa import SECP256k1, VerifyingKey
+
+G = SECP256k1.generator
+N = SECP256k1.order
+HARDENED = 0x80000000
+PARALLEL_MIN = 512  # below this many children a process pool costs more than it saves
+
+
+def new_seed():
+    return os.urandom(32).hex()
+
+
+def raw_public_key(point):
+    """
+    The 64-byte x || y encoding transactions carry as sender_pubkey.
+    """
+    return point.x().to_bytes(32, "big") + point.y().to_bytes(32, "big")
+
+
+def compressed(point):
+    return bytes([2 + (point.y() & 1)]) + point.x().to_bytes(32, "big")
+
+
+def address_of(public_key):
+    return hashlib.new("ripemd160", hashlib.sha256(public_key).digest()).hexdigest()
+
+
+def parse_path(path):
+    """
+    "m/44'/0'/0'/0/17" (or 44h) -> [44 + HARDENED, HARDENED, HARDENED, 0, 17].
+    """
+    parts = path.strip().split("/")
+    if parts[0] not in ("m", "M"):
+        raise ValueError(f"path must start with m/: {path!r}")
+    indexes = []
+    for part in parts[1:]:
+        hardened = part.endswith(("'", "h"))
+        number = part[:-1] if hardened else part
+        if not number.isdigit() or int(number) >= HARDENED:
+            raise ValueError(f"bad path component {part!r}")
+        indexes.append(int(number) + (HARDENED if hardened else 0))
+    return indexes
+
+
+class ExtendedKey:
+    """
+    A key plus chain code. `secret` is None for public-only (xpub) keys.
+    """
+
+    __slots__ = ("secret", "point", "chain_code")
+
+    def __init__(self, secret, point, chain_code):
+        self.secret = secret
+        self.point = point
+        self.chain_code = chain_code
+
+    @classmethod
+    def from_seed(cls, seed_hex):
+        digest = hmac.new(b"Bitcoin seed", bytes.fromhex(seed_hex), hashlib.sha512).digest()
+        secret = int.from_bytes(digest[:32], "big")
+        if not 0 < secret < N:
+            raise ValueError("seed gives an invalid master key; use another seed")
+        return cls(secret, G * secret, digest[32:])
+
+    @classmethod
+    def from_xpub(cls, xpub_hex):
+        data = bytes.fromhex(xpub_hex)
+        if len(data) != 65:
+            raise ValueError("xpub must be 65 bytes of hex (compressed key + chain code)")
+        point = VerifyingKey.from_string(data[:33], curve=SECP256k1).pubkey.point
+        return cls(None, point, data[33:])
+
+    def child(self, index):
+        if index >= HARDENED:
+            if self.secret is None:
+                raise ValueError("hardened children need the private key")
+            data = b"\0" + self.secret.to_bytes(32, "big")
+        else:
+            data = compressed(self.point)
+        digest = hmac.new(self.chain_code, data + index.to_bytes(4, "big"), hashlib.sha512).digest()
+        tweak = int.from_bytes(digest[:32], "big")
+        if tweak >= N:
+            raise ValueError(f"index {index} gives an invalid key; skip it")
+        if self.secret is None:
+            return ExtendedKey(None, G * tweak + self.point, digest[32:])
+        secret = (tweak + self.secret) % N
+        if not secret:
+            raise ValueError(f"index {index} gives an invalid key; skip it")
+        return ExtendedKey(secret, G * secret, digest[32:])
+
+    def derive(self, path):
+        key = self
+        for index in parse_path(path):
+            key = key.child(index)
+        return key
+
+    def xpub(self):
+        return (compressed(self.point) + self.chain_code).hex()
+
+    @property
+    def public_key(self):
+        return raw_public_key(self.point).hex()
+
+    @property
+    def address(self):
+        return address_of(raw_public_key(self.point))
+
+    def export(self):
+        """
+        Same fields as pychain.crypto.Wallet.export().
+        """
+        if self.secret is None:
+            raise ValueError("public-only key")
+        return {
+            "private_key": self.secret.to_bytes(32, "big").hex(),
+            "public_key": self.public_key,
+            "address": self.address
+        }
+
+
+# ---------- Bulk derivation ----------
+
+def child_addresses(xpub_hex, indexes):
+    """
+    [(address, public key hex)] for the given non-hardened children of
+    xpub_hex. Runs in pool workers, so it takes and returns plain values.
+    """
+    parent = ExtendedKey.from_xpub(xpub_hex)
+    out = []
+    for index in indexes:
+        public_key = raw_public_key(parent.child(index).point)
+        out.append((address_of(public_key), public_key.hex()))
+    return out
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def worker_pool():
+    """
+    Shared process pool; spawned rather than forked, since the node that
+    uses it is multithreaded.
+    """
+    global _pool
+    import concurrent.futures
+    import multiprocessing
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                                           mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def derive_addresses(xpub_hex, indexes, workers=None):
+    """
+    child_addresses() split across `workers` processes (default: one per
+    CPU) when there are enough indexes to pay for it.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    indexes = list(indexes)
+    if workers <= 1 or len(indexes) < PARALLEL_MIN:
+        return child_addresses(xpub_hex, indexes)
+    size = -(-len(indexes) // workers)
+    chunks = [indexes[i:i + size] for i in range(0, len(indexes), size)]
+    out = []
+    for part in worker_pool().map(child_addresses, [xpub_hex] * len(chunks), chunks):
+        out.extend(part)
+    return out
+
+
+class AddressBook:
+    """
+    Every child derived so far: (xpub, index) -> (address, public key) and
+    the reverse address -> (xpub, path), so repeated ranges are not
+    recomputed and an incoming payment maps straight to its derivation path.
+    """
+
+    def __init__(self, max_entries=1_000_000):
+        self.max_entries = max_entries
+        self.children = {}
+        self.paths = {}
+        self.lock = threading.Lock()
+        self.stats = {"derived": 0, "cached": 0, "uncached": 0}
+
+    def derive(self, xpub_hex, base_path, start, count, cache=True):
+        """
+        [(index, path, address, public key)] for children start..start+count-1.
+        With cache=False nothing is looked up or stored (for xpubs the owner
+        does not want to fill the book with).
+        """
+        wanted = range(start, start + count)
+        if not cache:
+            derived = derive_addresses(xpub_hex, wanted)
+            with self.lock:
+                self.stats["uncached"] += count
+            return [(index, f"{base_path}/{index}", address, public_key)
+                    for index, (address, public_key) in zip(wanted, derived)]
+        with self.lock:
+            missing = [i for i in wanted if (xpub_hex, i) not in self.children]
+        derived = derive_addresses(xpub_hex, missing) if missing else []
+        with self.lock:
+            if len(self.children) + len(missing) <= self.max_entries:
+                for index, (address, public_key) in zip(missing, derived):
+                    self.children[(xpub_hex, index)] = (address, public_key)
+                    self.paths[address] = (xpub_hex, f"{base_path}/{index}")
+            fresh = dict(zip(missing, derived))
+            self.stats["derived"] += len(missing)
+            self.stats["cached"] += count - len(missing)
+            out = []
+            for index in wanted:
+                address, public_key = fresh.get(index) or self.children[(xpub_hex, index)]
+                out.append((index, f"{base_path}/{index}", address, public_key))
+        return out
+
+    def lookup(self, address):
+        with self.lock:
+            return self.paths.get(address)
+
+
+def read_seed(args):
+    if args.seed_file:
+        with open(args.seed_file) as f:
+            return f.read().strip()
+    return args.seed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed-based hierarchical wallets.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("seed", help="print a new random seed (back this up)")
+    for name, help_text in (("xpub", "print the extended public key at a path"),
+                            ("key", "print the key pair and address at a path")):
+        command = commands.add_parser(name, help=help_text)
+        source = command.add_mutually_exclusive_group(required=True)
+        source.add_argument("--seed")
+        source.add_argument("--seed-file")
+        command.add_argument("--path", default="m")
+    listing = commands.add_parser("addresses", help="derive child addresses of an xpub")
+    listing.add_argument("--xpub", required=True)
+    listing.add_argument("--start", type=int, default=0)
+    listing.add_argument("--count", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        print(new_seed())
+    elif args.command == "xpub":
+        print(ExtendedKey.from_seed(read_seed(args)).derive(args.path).xpub())
+    elif args.command == "key":
+        print(json.dumps(ExtendedKey.from_seed(read_seed(args)).derive(args.path).export(), indent=2))
+    else:
+        for index, (address, _) in zip(range(args.start, args.start + args.count),
+                                       derive_addresses(args.xpub, range(args.start, args.start + args.count))):
+            print(index, address)
@@ -0,0 +1,138 @@
+#indexes.py — txid, address-history, balance and address-filter indexes over the chain
+
+from filters import block_addresses, build_filter
+
+
+class ChainIndex:
+    """
+    txid -> (height, position), address -> [(height, position), ...] in
+    chain order, address -> balance, and height -> the block's address
+    filter (filters.py). Blocks are connected / disconnected one at a time, so adding
+    a block costs O(its transactions) and a reorg only touches the blocks
+    above the fork point.
+
+    Keys are the packed forms Transaction already holds (raw bytes for hex
+    values), so lookups use pack_hex() on the query side.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.tx_by_id = {}
+        self.by_address = {}
+        self.balances = {}
+        self.filters = {}
+        self.tx_count = 0
+        self.height = 0
+
+    def copy(self):
+        """
+        An independent index to apply a reorg to before swapping it in.
+        """
+        other = ChainIndex.__new__(ChainIndex)
+        other.tx_by_id = dict(self.tx_by_id)
+        other.by_address = {address: list(refs) for address, refs in self.by_address.items()}
+        other.balances = dict(self.balances)
+        other.filters = dict(self.filters)
+        other.tx_count = self.tx_count
+        other.height = self.height
+        return other
+
+    def load_state(self, balances, tx_count, height):
+        """
+        Start from snapshot state: balances and counts cover blocks below
+        `height`, whose transactions are not individually indexed.
+        """
+        self.reset()
+        self.balances = dict(balances)
+        self.tx_count = tx_count
+        self.height = height
+
+    def connect_block(self, block):
+        height = block.index
+        for position, tx in enumerate(block.transactions):
+            txid = getattr(tx, "_txid", None)
+            if txid is None:
+                continue  # "Genesis Block" marker
+            self._credit(tx, 1)
+            ref = (height, position)
+            # The same signed transaction can appear twice; keep the first
+            self.tx_by_id.setdefault(txid, ref)
+            self.by_address.setdefault(tx.sender_address, []).append(ref)
+            if tx.recipient_address != tx.sender_address:
+                self.by_address.setdefault(tx.recipient_address, []).append(ref)
+        # Kept after the block body is pruned: filters are what light clients scan
+        self.filters[height] = build_filter(block.hash, block_addresses(block.transactions))
+        self.height = height + 1
+
+    def disconnect_block(self, block):
+        """
+        Undo connect_block for the current tip block.
+        """
+        height = block.index
+        for position in range(len(block.transactions) - 1, -1, -1):
+            tx = block.transactions[position]
+            txid = getattr(tx, "_txid", None)
+            if txid is None:
+                continue
+            self._credit(tx, -1)
+            ref = (height, position)
+            if self.tx_by_id.get(txid) == ref:
+                del self.tx_by_id[txid]
+            for address in {tx.sender_address, tx.recipient_address}:
+                refs = self.by_address.get(address)
+                if refs and refs[-1] == ref:
+                    refs.pop()
+                    if not refs:
+                        del self.by_address[address]
+        self.filters.pop(height, None)
+        self.height = height
+
+    def _credit(self, tx, sign):
+        amount = sign * tx.amount
+        balances = self.balances
+        balances[tx.sender_address] = balances.get(tx.sender_address, 0) - amount
+        balances[tx.recipient_address] = balances.get(tx.recipient_address, 0) + amount
+        self.tx_count += sign
+
+    def balance(self, address):
+        return self.balances.get(address, 0)
+
+    def rebuild(self, chain):
+        self.reset()
+        for block in chain:
+            self.connect_block(block)
+
+    def reorg(self, old_chain, new_chain):
+        """
+        Switch from old_chain to new_chain, rolling back only above the fork.
+        Returns the fork height.
+        """
+        fork = 0
+        limit = min(len(old_chain), len(new_chain))
+        while fork < limit and old_chain[fork]._hash == new_chain[fork]._hash:
+            fork += 1
+        if any(block.transactions is None for block in old_chain[fork:]):
+            # Pruned bodies cannot be disconnected; replay the new chain instead
+            self.rebuild(new_chain)
+            return fork
+        for block in reversed(old_chain[fork:]):
+            self.disconnect_block(block)
+        for block in new_chain[fork:]:
+            self.connect_block(block)
+        return fork
+
+    def locate(self, txid):
+        return self.tx_by_id.get(txid)
+
+    def history(self, address, cursor=0, limit=50):
+        """
+        One page of an address's references, oldest first.
+        Returns (refs, next_cursor or None, total).
+        """
+        refs = self.by_address.get(address, [])
+        cursor = max(0, cursor)
+        page = refs[cursor:cursor + limit]
+        next_cursor = cursor + limit if cursor + limit < len(refs) else None
+        return page, next_cursor, len(refs)
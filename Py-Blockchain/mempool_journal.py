@@ -0,0 +1,219 @@
+#mempool_journal.py — append-only, group-committed journal of the transaction pool
+#
+# Layout:
+#   b"PYMEMPL1"
+#   records: u32 payload length, u32 crc32, payload
+#     b"+" + canonical transaction JSON      (pooled, signature already verified)
+#     b"-" + raw 32-byte txids               (left the pool: mined, confirmed, expired)
+#
+# Writers append a record and get a ticket; one writer thread takes every
+# record queued so far, writes them with a single write() and fsync() and
+# then wakes all their submitters, so concurrent submissions share a disk
+# flush instead of paying one each. A failed write fails every ticket in its
+# batch (their submitters are refused) and the next batch rewrites the file
+# from the live pool, so a torn append never hides later records. Removals are not waited for: losing one in
+# a crash only means the entry is dropped again as confirmed on reload. Once
+# most records are dead the writer rewrites the file with just the live pool.
+
+import collections
+import hashlib
+import os
+import struct
+import threading
+import zlib
+
+MAGIC = b"PYMEMPL1"
+HEADER = struct.Struct("<II")
+ADD = b"+"
+REMOVE = b"-"
+TXID_BYTES = 32
+
+
+class JournalError(OSError):
+    """
+    A pooled transaction could not be made durable (write failure or timeout).
+    """
+
+
+class MempoolJournal:
+    """
+    `live` mirrors the pool ({raw txid: canonical bytes}, oldest first);
+    the file is compacted when it holds more than `compact_ratio` records per
+    live entry and at least `compact_min` records, or once the pool is empty.
+    """
+
+    def __init__(self, path, compact_min=1024, compact_ratio=2):
+        self.path = path
+        self.compact_min = compact_min
+        self.compact_ratio = compact_ratio
+        self.live = {}
+        self.records = 0
+        self.buffer = []
+        self.queued = 0  # tickets handed out
+        self.settled = 0  # tickets whose batch has been written or has failed
+        self.failed = collections.deque(maxlen=1024)  # (first, last) ticket ranges of failed batches
+        self.broken = False  # a write failed; the next batch rewrites the whole file
+        self.file = None
+        self.thread = None
+        self.last_error = None  # str of the latest failed write, shown by status()
+        self.cond = threading.Condition()
+        self.stats = {"added": 0, "removed": 0, "commits": 0, "largest_commit": 0, "compactions": 0,
+                      "write_errors": 0}
+        if not os.path.exists(path):
+            self._write([])
+
+    # ----- Reading -----
+
+    def load(self):
+        """
+        Canonical bytes of every transaction still live in the journal, in
+        the order they were added. A torn final record (crash mid-append) is
+        cut off so the next append starts on a clean boundary.
+        """
+        live = {}
+        records = 0
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a mempool journal")
+            good = f.tell()
+            while True:
+                head = f.read(HEADER.size)
+                if len(head) < HEADER.size:
+                    break
+                length, crc = HEADER.unpack(head)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                kind, body = payload[:1], payload[1:]
+                if kind == ADD:
+                    live[hashlib.sha256(body).digest()] = body
+                else:
+                    for i in range(0, len(body), TXID_BYTES):
+                        live.pop(body[i:i + TXID_BYTES], None)
+                records += 1
+                good = f.tell()
+            end = f.seek(0, os.SEEK_END)
+        if good < end:
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+        with self.cond:
+            self.live = live
+            self.records = records
+        return list(live.values())
+
+    # ----- Writing -----
+
+    def start(self):
+        with self.cond:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="mempool-journal", daemon=True)
+                self.thread.start()
+        return self
+
+    def add(self, txid, canonical):
+        """
+        Queue a pooled transaction; returns the ticket to wait() on.
+        """
+        with self.cond:
+            self.live[txid] = canonical
+            self.stats["added"] += 1
+            return self._queue(ADD + canonical)
+
+    def remove(self, txids):
+        with self.cond:
+            txids = [txid for txid in txids if self.live.pop(txid, None) is not None]
+            if not txids:
+                return
+            self.stats["removed"] += len(txids)
+            self._queue(REMOVE + b"".join(txids))
+
+    def _queue(self, payload):
+        if self.thread is None:
+            self.start()
+        self.buffer.append(HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self.queued += 1
+        self.cond.notify_all()
+        return self.queued
+
+    def wait(self, ticket, timeout=5.0):
+        """
+        Block until the record behind `ticket` is on disk. False if its write
+        failed or it is not settled within `timeout` seconds.
+        """
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.settled >= ticket, timeout):
+                return False
+            return not any(first <= ticket <= last for first, last in self.failed)
+
+    def run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.buffer)
+                batch, self.buffer = self.buffer, []
+                first, ticket = self.settled + 1, self.queued
+                self.records += len(batch)
+                compact = self.broken or (self.records > self.compact_ratio * len(self.live)
+                                          and (self.records >= self.compact_min or not self.live))
+                live = list(self.live.values()) if compact else None
+            try:
+                if compact:
+                    self._write(live)
+                else:
+                    self._append(batch)
+            except OSError as e:
+                error = str(e)
+            else:
+                error = None
+            with self.cond:
+                if error is not None:
+                    self.stats["write_errors"] += 1
+                    self.last_error = error
+                    self.failed.append((first, ticket))
+                    if self.file is not None:
+                        self.file.close()
+                        self.file = None
+                self.broken = error is not None
+                self.settled = ticket
+                self.stats["commits"] += 1
+                self.stats["largest_commit"] = max(self.stats["largest_commit"], len(batch))
+                self.cond.notify_all()
+
+    def _append(self, batch):
+        if self.file is None:
+            self.file = open(self.path, "ab")
+        self.file.write(b"".join(batch))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def rewrite(self, entries):
+        """
+        Replace the journal with `entries` [(raw txid, canonical bytes)]
+        (the pool after a reload). Call before the writer thread starts.
+        """
+        with self.cond:
+            self.live = dict(entries)
+            self._write(list(self.live.values()))
+
+    def _write(self, canonicals):
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            for canonical in canonicals:
+                payload = ADD + canonical
+                f.write(HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.records = len(canonicals)
+        if self.thread is not None:
+            self.stats["compactions"] += 1
+
+    def status(self):
+        with self.cond:
+            return dict(self.stats, path=self.path, live=len(self.live), records=self.records,
+                        pending_records=len(self.buffer), file_bytes=os.path.getsize(self.path),
+                        last_error=self.last_error)
+
@@ -0,0 +1,155 @@
+#miner.py — standalone proof-of-work miner for network_node's /mining endpoints
+#
+#   python miner.py --node http://127.0.0.1:5000 --address <your address>
+#   python miner.py --node http://127.0.0.1:5000 --address <addr> --workers 8 --batch 200000
+#
+# Polls /mining/template, searches nonces on --workers processes and posts
+# every nonce that meets the share target to /mining/submit. Work switches to
+# a new template as soon as the node's tip or mempool changes (the template id
+# changes), so the node itself never spends CPU on proof of work.
+
+import argparse
+import hashlib
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+
+# ---------- Search (runs in worker processes) ----------
+
+def search(prefix, suffix, target, start, count):
+    """
+    First nonce in [start, start + count) whose hash is <= target, or None.
+    Returns (nonce or None, hashes tried).
+    """
+    base = hashlib.sha256(prefix)
+    for nonce in range(start, start + count):
+        h = base.copy()
+        h.update(str(nonce).encode())
+        h.update(suffix)
+        if h.hexdigest() <= target:
+            return nonce, nonce - start + 1
+    return None, count
+
+
+# ---------- Node protocol ----------
+
+def requests():
+    """
+    Imported on first use: worker processes only hash and never need it.
+    """
+    import requests
+    return requests
+
+
+class NodeClient:
+    def __init__(self, url, address, timeout=5):
+        self.url = url.rstrip("/")
+        self.address = address
+        self.timeout = timeout
+        self.session = requests().Session()
+
+    def template(self):
+        """
+        The node's current template, or None (no transactions / unreachable).
+        """
+        try:
+            response = self.session.get(f"{self.url}/mining/template",
+                                        params={"miner_address": self.address}, timeout=self.timeout)
+        except requests().exceptions.RequestException:
+            return None
+        return response.json() if response.status_code == 200 else None
+
+    def submit(self, template_id, nonce):
+        try:
+            response = self.session.post(f"{self.url}/mining/submit",
+                                         json={"template_id": template_id, "nonce": nonce},
+                                         timeout=self.timeout)
+        except requests().exceptions.RequestException as e:
+            return None, str(e)
+        return response.status_code, response.json().get("message")
+
+
+# ---------- Miner loop ----------
+
+class Miner:
+    def __init__(self, client, workers, batch, refresh, log=print):
+        self.client = client
+        self.workers = workers
+        self.batch = batch
+        self.refresh = refresh
+        self.log = log
+        self.stats = {"hashes": 0, "blocks": 0, "shares": 0, "stale": 0, "templates": 0}
+
+    def run(self, duration=None):
+        deadline = None if duration is None else time.time() + duration
+        with multiprocessing.Pool(self.workers) as pool:
+            template = None
+            while deadline is None or time.time() < deadline:
+                latest = self.client.template()
+                if latest is None:
+                    time.sleep(self.refresh)
+                    continue
+                if template is None or latest["template_id"] != template["template_id"]:
+                    template = latest
+                    self.stats["templates"] += 1
+                    nonces = itertools.count(0, self.batch)
+                self.work(pool, template, nonces, time.time() + self.refresh)
+        return self.stats
+
+    def work(self, pool, template, nonces, until):
+        """
+        Search batches on every worker until `until`, submitting what they find.
+        """
+        prefix = template["header_prefix"].encode()
+        suffix = template["body_suffix"].encode()
+        target = template["share_target"]
+
+        pending = [pool.apply_async(search, (prefix, suffix, target, next(nonces), self.batch))
+                   for _ in range(self.workers)]
+        while pending:
+            nonce, hashes = pending.pop(0).get()
+            self.stats["hashes"] += hashes
+            if nonce is not None:
+                status, message = self.client.submit(template["template_id"], nonce)
+                if status == 201:
+                    self.stats["blocks"] += 1
+                    self.log(f"[miner] block {template['index']} accepted (nonce {nonce})")
+                    return
+                if status == 202:
+                    self.stats["shares"] += 1
+                elif status == 409:
+                    self.stats["stale"] += 1
+                    return
+                else:
+                    self.log(f"[miner] submit failed: {status} {message}")
+            if time.time() < until:
+                pending.append(pool.apply_async(search, (prefix, suffix, target, next(nonces), self.batch)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mine for a network_node over /mining/template.")
+    parser.add_argument("--node", default="http://127.0.0.1:5000")
+    parser.add_argument("--address", help="address that receives block rewards")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch", type=int, default=50000, help="nonces per work unit")
+    parser.add_argument("--refresh", type=float, default=1.0, help="seconds between template checks")
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    args = parser.parse_args(argv)
+
+    miner = Miner(NodeClient(args.node, args.address), args.workers, args.batch, args.refresh)
+    started = time.time()
+    try:
+        stats = miner.run(args.duration)
+    except KeyboardInterrupt:
+        stats = miner.stats
+    elapsed = time.time() - started
+    print(f"[miner] {stats['blocks']} blocks, {stats['shares']} shares, {stats['stale']} stale, "
+          f"{stats['hashes'] / elapsed:,.0f} H/s over {elapsed:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
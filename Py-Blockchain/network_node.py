@@ -1,330 +1,120 @@
 #network_node.py — multi‑node Flask blockchain with consensus
+#
+# The chain itself lives in pychain/ (pychain.chain.Blockchain); this script
+# is its HTTP layer: one Blockchain served over Flask, plus the CLI.
 
 
-from flask import Flask, request, jsonify
-import hashlib
+from flask import Flask, Response, request, jsonify
+import argparse
 import json
+import os
+import threading
 import time
-from urllib.parse import urlparse
-import requests
-from ecdsa import SigningKey, SECP256k1, VerifyingKey, BadSignatureError
 
-app = Flask(__name__)
-
-# ---------- Wallet / Keys / Addresses ----------
+from admission import Admission, retry_after_header
+from chain_store import ChainStore
+from compression import compressed_response
+from filters import P as FILTER_P, M as FILTER_M
+from hd_wallet import AddressBook, ExtendedKey
+from mempool_journal import MempoolJournal
+from pychain.chain import Block, Blockchain, difficulty_target, json_scalar, share_target, target_hex, tx_to_json
+from pychain.crypto import Wallet
+# Re-exported: bench.py loads this file as a variant, and scripts sign with these
+from pychain.chain import Transaction, pack_hex, transaction_message, unpack_hex  # noqa: F401
+from pychain.crypto import pubkey_to_address, verify_signature  # noqa: F401
+from scheduler import ConsensusScheduler, MiningScheduler
+from tracing import install as install_tracing
 
-class Wallet:
-    def __init__(self):
-        self.private_key = SigningKey.generate(curve=SECP256k1)
-        self.public_key = self.private_key.get_verifying_key()
+app = Flask(__name__)
+install_tracing(app)
 
-    @property
-    def address(self):
-        pub_bytes = self.public_key.to_string()
-        sha = hashlib.sha256(pub_bytes).digest()
-        ripe = hashlib.new("ripemd160", sha).hexdigest()
-        return ripe
 
-    def sign(self, message: str) -> str:
-        signature = self.private_key.sign(message.encode())
-        return signature.hex()
+blockchain = Blockchain()
+auto_miner = None  # MiningScheduler when started with --auto-mine
+admission = Admission(blockchain)
+consensus_worker = ConsensusScheduler(blockchain)
+address_book = AddressBook()
+hd_account = None  # (xpub, path) from --hd-xpub / --hd-path
+MAX_DERIVE = 100000  # per request for the node's own --hd-xpub, whose addresses are cached
+MAX_DERIVE_FOREIGN = 1000  # for any other ?xpub=: never cached, so every request is fresh EC work
+MAX_BALANCES = 100000
 
-    def export(self):
-        return {
-            "private_key": self.private_key.to_string().hex(),
-            "public_key": self.public_key.to_string().hex(),
-            "address": self.address
-        }
 
+# ---------- Flask Endpoints ----------
 
-def verify_signature(public_key_hex: str, message: str, signature_hex: str) -> bool:
-    try:
-        pub_bytes = bytes.fromhex(public_key_hex)
-        vk = VerifyingKey.from_string(pub_bytes, curve=SECP256k1)
-        vk.verify(bytes.fromhex(signature_hex), message.encode())
-        return True
-    except (BadSignatureError, ValueError):
-        return False
-
-
-def pubkey_to_address(public_key_hex: str) -> str:
-    pub_bytes = bytes.fromhex(public_key_hex)
-    sha = hashlib.sha256(pub_bytes).digest()
-    ripe = hashlib.new("ripemd160", sha).hexdigest()
-    return ripe
-
-
-# ---------- Block / Blockchain ----------
-
-class Block:
-    def __init__(self, index, transactions, timestamp, previous_hash, nonce=0, hash_value=None):
-        self.index = index
-        self.transactions = transactions
-        self.timestamp = timestamp
-        self.previous_hash = previous_hash
-        self.nonce = nonce
-        self.hash = hash_value or self.compute_hash()
-
-    def compute_hash(self):
-        block_string = json.dumps({
-            "index": self.index,
-            "transactions": self.transactions,
-            "timestamp": self.timestamp,
-            "previous_hash": self.previous_hash,
-            "nonce": self.nonce
-        }, sort_keys=True).encode()
-        return hashlib.sha256(block_string).hexdigest()
-
-
-class Blockchain:
-    def __init__(self, difficulty=3):
-        self.unconfirmed_transactions = []
-        self.chain = []
-        self.difficulty = difficulty
-        self.nodes = set()
-        self.create_genesis_block()
-
-    # ----- Core chain -----
-
-    def create_genesis_block(self):
-        genesis_block = Block(
-            index=0,
-            transactions=["Genesis Block"],
-            timestamp=time.time(),
-            previous_hash="0"
-        )
-        self.chain.append(genesis_block)
-
-    @property
-    def last_block(self):
-        return self.chain[-1]
-
-    # ----- Transactions -----
-
-    def create_transaction_message(self, sender, recipient, amount, timestamp):
-        tx_core = {
-            "sender": sender,
-            "recipient": recipient,
-            "amount": amount,
-            "timestamp": timestamp
-        }
-        return json.dumps(tx_core, sort_keys=True)
-
-    def add_signed_transaction(self, sender_pubkey_hex, recipient_address, amount, signature_hex, timestamp=None):
-        if timestamp is None:
-            timestamp = time.time()
-
-        sender_address = pubkey_to_address(sender_pubkey_hex)
-        message = self.create_transaction_message(
-            sender=sender_address,
-            recipient=recipient_address,
-            amount=amount,
-            timestamp=timestamp
-        )
-
-        if not verify_signature(sender_pubkey_hex, message, signature_hex):
-            return False, "Invalid signature"
-
-        tx = {
-            "sender_address": sender_address,
-            "sender_pubkey": sender_pubkey_hex,
-            "recipient_address": recipient_address,
-            "amount": amount,
-            "timestamp": timestamp,
-            "signature": signature_hex
-        }
-
-        self.unconfirmed_transactions.append(tx)
-        return True, "Transaction added"
-
-    # ----- Proof of Work / Mining -----
-
-    def proof_of_work(self, block):
-        block.nonce = 0
-        computed_hash = block.compute_hash()
-        target_prefix = "0" * self.difficulty
-
-        while not computed_hash.startswith(target_prefix):
-            block.nonce += 1
-            computed_hash = block.compute_hash()
-
-        return computed_hash
-
-    def add_block(self, block, proof):
-        previous_hash = self.last_block.hash
-
-        if previous_hash != block.previous_hash:
-            return False
-
-        if not self.is_valid_proof(block, proof):
-            return False
-
-        block.hash = proof
-        self.chain.append(block)
-        return True
-
-    def is_valid_proof(self, block, block_hash):
-        return (block_hash.startswith("0" * self.difficulty)
-                and block_hash == block.compute_hash())
-
-    def mine(self, miner_address=None, reward_amount=1):
-        if not self.unconfirmed_transactions:
-            return None, "No transactions to mine"
-
-        if miner_address is not None:
-            reward_tx = {
-                "sender_address": "NETWORK",
-                "sender_pubkey": None,
-                "recipient_address": miner_address,
-                "amount": reward_amount,
-                "timestamp": time.time(),
-                "signature": None
-            }
-            self.unconfirmed_transactions.append(reward_tx)
-
-        new_block = Block(
-            index=len(self.chain),
-            transactions=self.unconfirmed_transactions.copy(),
-            timestamp=time.time(),
-            previous_hash=self.last_block.hash
-        )
-
-        proof = self.proof_of_work(new_block)
-        added = self.add_block(new_block, proof)
-
-        if added:
-            self.unconfirmed_transactions = []
-            return new_block, "Block mined"
+def chain_json(blocks, key="chain", encode=None, **extra):
+    """
+    {key: [...], **extra} with keys sorted like jsonify, built from each
+    block's cached encoding instead of re-serializing. `encode` replaces
+    Block.to_json (blockchain.block_json also handles pruned bodies).
+    """
+    encode = encode or Block.to_json
+    fields = dict(extra)
+    fields.setdefault("length", len(blocks))
+    fields[key] = None
+    parts = []
+    for name in sorted(fields):
+        if name == key:
+            value = b"[" + b", ".join(encode(block) for block in blocks) + b"]"
         else:
-            return None, "Failed to add block"
-
-    # ----- Validation -----
-
-    def is_chain_valid(self, chain=None):
-        chain = chain or self.chain
-
-        for i in range(1, len(chain)):
-            prev = chain[i - 1]
-            curr = chain[i]
-
-            if curr["previous_hash"] != prev["hash"]:
-                return False
-
-            # Rebuild block to recompute hash
-            block_obj = Block(
-                index=curr["index"],
-                transactions=curr["transactions"],
-                timestamp=curr["timestamp"],
-                previous_hash=curr["previous_hash"],
-                nonce=curr["nonce"]
-            )
-            if curr["hash"] != block_obj.compute_hash():
-                return False
-
-            if not curr["hash"].startswith("0" * self.difficulty):
-                return False
-
-            for tx in curr["transactions"]:
-                if tx == "Genesis Block":
-                    continue
-                if tx["sender_address"] == "NETWORK":
-                    continue
-
-                sender_pubkey_hex = tx["sender_pubkey"]
-                signature_hex = tx["signature"]
-
-                msg = self.create_transaction_message(
-                    sender=tx["sender_address"],
-                    recipient=tx["recipient_address"],
-                    amount=tx["amount"],
-                    timestamp=tx["timestamp"]
-                )
-
-                if not verify_signature(sender_pubkey_hex, msg, signature_hex):
-                    return False
-
-        return True
-
-    def balance_of(self, address):
-        balance = 0
-        for block in self.chain:
-            if block.index == 0:
-                continue
-            for tx in block.transactions:
-                if tx == "Genesis Block":
-                    continue
-                if tx["sender_address"] == address:
-                    balance -= tx["amount"]
-                if tx["recipient_address"] == address:
-                    balance += tx["amount"]
-        return balance
-
-    # ----- Networking / Consensus -----
-
-    def register_node(self, address):
-        """
-        address: 'http://host:port'
-        """
-        parsed = urlparse(address)
-        self.nodes.add(f"{parsed.scheme}://{parsed.netloc}")
-
-    def resolve_conflicts(self):
-        """
-        Longest valid chain rule.
-        """
-        neighbours = self.nodes
-        new_chain = None
-
-        max_length = len(self.chain)
-
-        for node in neighbours:
-            try:
-                response = requests.get(f"{node}/chain")
-            except requests.exceptions.RequestException:
-                continue
-
-            if response.status_code != 200:
-                continue
-
-            data = response.json()
-            length = data["length"]
-            chain = data["chain"]
-
-            if length > max_length and self.is_chain_valid(chain):
-                max_length = length
-                new_chain = chain
-
-        if new_chain:
-            # Replace local chain
-            new_chain_objs = []
-            for b in new_chain:
-                new_chain_objs.append(
-                    Block(
-                        index=b["index"],
-                        transactions=b["transactions"],
-                        timestamp=b["timestamp"],
-                        previous_hash=b["previous_hash"],
-                        nonce=b["nonce"],
-                        hash_value=b["hash"]
-                    )
-                )
-            self.chain = new_chain_objs
-            return True
-
-        return False
+            value = json.dumps(fields[name]).encode()
+        parts.append(json.dumps(name).encode() + b": " + value)
+    return b"{" + b", ".join(parts) + b"}"
 
 
-blockchain = Blockchain()
-
-
-# ---------- Flask Endpoints ----------
-
 @app.route("/wallet/new", methods=["GET"])
 def wallet_new():
   wallet = Wallet()
   return jsonify(wallet.export()), 200
 
 
+@app.route("/wallets/derive", methods=["GET"])
+def wallets_derive():
+    """
+    Addresses start..start+count-1 of an extended public key (?xpub=, else
+    the node's --hd-xpub), derived in parallel. The node never sees private
+    keys: hd_wallet.py re-derives them from the seed and the returned path.
+    Only the node's own xpub is remembered for /wallets/path; any other is
+    derived and served without caching, at most MAX_DERIVE_FOREIGN at a time.
+    """
+    start = request.args.get("start", default=0, type=int)
+    count = request.args.get("count", default=20, type=int)
+    xpub = request.args.get("xpub")
+    path = request.args.get("path", default="M" if xpub else hd_account and hd_account[1])
+    xpub = xpub or hd_account and hd_account[0]
+    if not xpub:
+        return jsonify({"message": "Pass xpub or start the node with --hd-xpub"}), 400
+    own = hd_account is not None and (xpub, path) == hd_account
+    limit = MAX_DERIVE if own else MAX_DERIVE_FOREIGN
+    if start < 0 or not 0 < count <= limit or start + count > 0x80000000:
+        return jsonify({"message": f"Need start >= 0 and 1 <= count <= {limit} (non-hardened indexes)"}), 400
+    try:
+        ExtendedKey.from_xpub(xpub)
+        derived = address_book.derive(xpub, path, start, count, cache=own)
+    except (ValueError, TypeError) as e:
+        return jsonify({"message": f"Invalid xpub: {e}"}), 400
+    return jsonify({
+        "xpub": xpub,
+        "path": path,
+        "start": start,
+        "count": count,
+        "addresses": [{"index": index, "path": child_path, "address": address, "public_key": public_key}
+                      for index, child_path, address, public_key in derived]
+    }), 200
+
+
+@app.route("/wallets/path/<address>", methods=["GET"])
+def wallets_path(address):
+    """
+    Derivation path of an address /wallets/derive handed out for the node's --hd-xpub.
+    """
+    found = address_book.lookup(address.lower())
+    if found is None:
+        return jsonify({"message": "Address was not derived on this node"}), 404
+    xpub, path = found
+    return jsonify({"address": address.lower(), "xpub": xpub, "path": path}), 200
+
+
 @app.route("/transaction/new", methods=["POST"])
 def transaction_new():
     data = request.get_json()
@@ -332,15 +122,17 @@ def transaction_new():
     if not all(k in data for k in required):
         return jsonify({"message": "Missing fields"}), 400
 
-    ok, msg = blockchain.add_signed_transaction(
-        sender_pubkey_hex=data["sender_pubkey"],
+    status, msg, retry_after = admission.submit(
+        client=request.remote_addr,
+        sender_pubkey=data["sender_pubkey"],
         recipient_address=data["recipient_address"],
         amount=data["amount"],
-        signature_hex=data["signature"],
+        signature=data["signature"],
         timestamp=data["timestamp"]
     )
 
-    status = 201 if ok else 400
+    if retry_after is not None:
+        return jsonify({"message": msg, "retry_after": retry_after}), status, retry_after_header(retry_after)
     return jsonify({"message": msg}), status
 
 
@@ -352,12 +144,7 @@ def mine():
     if block is None:
         return jsonify({"message": msg}), 400
 
-    # Broadcast new block to peers (simple: ask them to resolve)
-    for node in blockchain.nodes:
-        try:
-            requests.get(f"{node}/nodes/resolve", timeout=2)
-        except requests.exceptions.RequestException:
-            pass
+    announce_block(block)
 
     return jsonify({
         "message": msg,
@@ -365,32 +152,226 @@ def mine():
         "hash": block.hash,
         "previous_hash": block.previous_hash,
         "nonce": block.nonce,
-        "transactions": block.transactions
+        "transactions": [tx_to_json(tx) for tx in block.transactions]
+    }), 200
+
+
+def announce_block(block=None):
+    """
+    Send a new block to peers as a compact block. Peers that cannot take it
+    (or, without a block, every peer) are asked to schedule a consensus round.
+    """
+    compact = None if block is None else blockchain.compact_block(block)
+    for node in blockchain.peers.ranked(blockchain.nodes):
+        if compact is not None and blockchain.relay_compact(node, block, compact):
+            continue
+        response = blockchain.peer_get(node, "/nodes/resolve", timeout=2)
+        if response is not None and response.status_code in (200, 202):
+            blockchain.peers.seen_height(node, response.json().get("length"))
+
+
+# ----- External mining -----
+
+@app.route("/mining/template", methods=["GET"])
+def mining_template():
+    """
+    Work for miner.py: sha256(header_prefix + str(nonce) + body_suffix) must
+    be <= target (hex). body_suffix is the serialized rest of the block.
+    """
+    miner_address = request.args.get("miner_address", default=None, type=str)
+    template_id, block = blockchain.block_template(miner_address)
+    if block is None:
+        return jsonify({"message": "No transactions to mine"}), 400
+    target = blockchain.work_target(block)
+
+    return jsonify({
+        "template_id": template_id,
+        "index": block.index,
+        "previous_hash": block.previous_hash,
+        "timestamp": block.timestamp,
+        "transaction_count": len(block.transactions),
+        "header_prefix": '{"index": ' + json_scalar(block.index).decode() + ', "nonce": ',
+        "body_suffix": block.tail().decode(),
+        "target": target_hex(target),
+        "share_target": target_hex(share_target(target))
     }), 200
 
 
+@app.route("/mining/submit", methods=["POST"])
+def mining_submit():
+    data = request.get_json(silent=True) or {}
+    template_id, nonce = data.get("template_id"), data.get("nonce")
+    if not isinstance(template_id, str) or type(nonce) is not int or nonce < 0:
+        return jsonify({"message": "Please supply template_id and a non-negative integer nonce"}), 400
+
+    result, block = blockchain.submit_work(template_id, nonce)
+    if result == "block":
+        announce_block(block)
+        return jsonify({"message": "Block accepted", "index": block.index, "hash": block.hash}), 201
+    if result == "share":
+        return jsonify({"message": "Share accepted"}), 202
+    if result in ("stale", "unknown"):
+        return jsonify({"message": f"Template is {result}; fetch a new one"}), 409
+    return jsonify({"message": "Nonce does not meet the share target"}), 400
+
+
+# ----- Compact block relay -----
+
+def compact_result(result, detail):
+    if result == "added":
+        return jsonify({"message": "Block added", "length": blockchain.height}), 201
+    if result == "known":
+        return jsonify({"message": "Block already known", "length": blockchain.height}), 200
+    if result == "missing":
+        return jsonify({"message": "Send the missing transactions", "missing": detail}), 200
+    if result == "orphan":
+        consensus_worker.trigger()
+        return jsonify({"message": "Block does not extend our tip; consensus round scheduled",
+                        "length": blockchain.height}), 202
+    if result == "unknown":
+        return jsonify({"message": "No compact block pending with that hash"}), 404
+    return jsonify({"message": detail}), 400
+
+
+@app.route("/blocks/compact", methods=["POST"])
+def receive_compact_block():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"message": "Please supply a compact block"}), 400
+    return compact_result(*blockchain.receive_compact(data))
+
+
+@app.route("/blocks/compact/transactions", methods=["POST"])
+def receive_missing_transactions():
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get("hash"), str) or not isinstance(data.get("transactions"), dict):
+        return jsonify({"message": "Please supply hash and transactions"}), 400
+    return compact_result(*blockchain.fill_compact(data["hash"], data["transactions"]))
+
+
+def history_unavailable():
+    """
+    503 for block ranges this node cannot serve: history below a snapshot
+    that is still being backfilled, or bodies pruned without a chain store.
+    """
+    if blockchain.base:
+        message = "History below the snapshot is still being backfilled"
+    else:
+        message = "Older block bodies are pruned on this node"
+    return jsonify({
+        "message": message,
+        "available_from": blockchain.servable_from
+    }), 503, {"Retry-After": "5"}
+
+
+def body_unavailable():
+    return jsonify({"message": "Block body is pruned and no peer could supply it"}), 503
+
+
 @app.route("/chain", methods=["GET"])
 def full_chain():
-    chain_data = []
-    for block in blockchain.chain:
-        chain_data.append({
-            "index": block.index,
-            "timestamp": block.timestamp,
-            "previous_hash": block.previous_hash,
-            "hash": block.hash,
-            "nonce": block.nonce,
-            "transactions": block.transactions
-        })
+    """
+    ?strict=1 re-verifies every signature, ignoring checkpoints.
+    """
+    if blockchain.servable_from:
+        return history_unavailable()
+    valid = blockchain.is_chain_valid(strict=request.args.get("strict", default=0, type=int) == 1 or None)
+    body = chain_json(blockchain.chain, encode=blockchain.block_json, valid=valid)
+    return compressed_response(body), 200
+
+
+@app.route("/blocks", methods=["GET"])
+def block_range():
+    """
+    Blocks [from, to) of the chain; `to` defaults to the tip.
+    """
+    base, height = blockchain.base, blockchain.height
+    start = request.args.get("from", default=0, type=int)
+    end = request.args.get("to", default=height, type=int)
+    start = max(0, start)
+    end = min(height, end)
+    if start < blockchain.servable_from and start < end:
+        return history_unavailable()
+    blocks = blockchain.chain[start - base:end - base] if start < end else []
+    body = chain_json(blocks, key="blocks", encode=blockchain.block_json, length=height,
+                      to=start + len(blocks), **{"from": start})
+    return compressed_response(body), 200
+
+
+@app.route("/filters", methods=["GET"])
+def block_filters():
+    """
+    Address filters for blocks [from, to), at most 1000; `to` defaults to
+    the tip. Test them with filters.match_any and fetch matching blocks
+    from /blocks.
+    """
+    height = blockchain.height
+    start = max(0, request.args.get("from", default=0, type=int))
+    end = min(height, start + 1000, request.args.get("to", default=height, type=int))
+    if start < blockchain.base and start < end:
+        return history_unavailable()
+    filters = []
+    for h in range(start, end):
+        data = blockchain.block_filter(h)
+        if data is None:
+            return body_unavailable()
+        filters.append({"height": h, "hash": blockchain.block_at(h).hash, "filter": data.hex()})
+    body = json.dumps({"from": start, "to": start + len(filters), "length": height,
+                       "p": FILTER_P, "m": FILTER_M, "filters": filters}).encode()
+    return compressed_response(body), 200
+
+
+@app.route("/analytics/columns", methods=["GET"])
+def analytics_columns():
+    """
+    The whole chain as columnar .npy arrays in one zip (np.load opens it as
+    an .npz); `python analytics.py export --node URL` unpacks it for mmap.
+    """
+    if blockchain.servable_from:
+        return history_unavailable()
+    try:
+        body = blockchain.columns_archive()
+    except LookupError:
+        return body_unavailable()
+    return compressed_response(body, mimetype="application/zip"), 200
+
+
+@app.route("/status", methods=["GET"])
+def status():
     return jsonify({
-        "length": len(chain_data),
-        "chain": chain_data,
-        "valid": blockchain.is_chain_valid(chain_data)
+        "height": blockchain.height,
+        "tip": blockchain.last_block.hash,
+        "target": target_hex(blockchain.next_target() or difficulty_target(blockchain.difficulty)),
+        "pending": len(blockchain.unconfirmed_transactions),
+        "peers": len(blockchain.nodes),
+        "snapshot": blockchain.snapshot and {
+            "height": blockchain.snapshot["height"],
+            "hash": blockchain.snapshot["hash"]
+        },
+        "bootstrap": blockchain.bootstrap_state,
+        "pruned_below": blockchain.pruned_below,
+        "checkpoint": max(blockchain.checkpoints, default=None),
+        "mining": blockchain.mining_stats,
+        "auto_mine": auto_miner and auto_miner.stats,
+        "admission": admission.snapshot(),
+        "consensus": consensus_worker.status(),
+        "relay": blockchain.relay_stats,
+        "wallets": dict(address_book.stats, addresses=len(address_book.paths)),
+        "journal": blockchain.journal and dict(blockchain.journal.status(), reload=blockchain.journal_state)
     }), 200
 
 
+@app.route("/snapshot", methods=["GET"])
+def latest_snapshot():
+    if blockchain.snapshot is None:
+        return jsonify({"message": "No snapshot yet"}), 404
+    return compressed_response(json.dumps(blockchain.snapshot).encode()), 200
+
+
 @app.route("/pending", methods=["GET"])
 def pending():
-    return jsonify(blockchain.unconfirmed_transactions), 200
+    body = b"[" + b", ".join(tx.canonical for tx in blockchain.unconfirmed_transactions) + b"]"
+    return Response(body, mimetype="application/json"), 200
 
 
 @app.route("/balance/<address>", methods=["GET"])
@@ -399,6 +380,71 @@ def balance(address):
     return jsonify({"address": address, "balance": bal}), 200
 
 
+@app.route("/balances", methods=["POST"])
+def balances():
+    """
+    Balances of up to MAX_BALANCES addresses in one request, all as of the
+    returned height and tip. {"addresses": [...], "pending": true} adds each
+    address's net pooled change (balance + pending is what it can spend).
+    """
+    data = request.get_json(silent=True) or {}
+    addresses = data.get("addresses")
+    if (not isinstance(addresses, list) or not 0 < len(addresses) <= MAX_BALANCES
+            or not all(isinstance(address, str) for address in addresses)):
+        return jsonify({"message": f"Please supply addresses: a list of 1 to {MAX_BALANCES} strings"}), 400
+    height, tip, confirmed, deltas = blockchain.balances_of(addresses, pending=bool(data.get("pending")))
+    result = {"height": height, "tip": tip, "balances": dict(zip(addresses, confirmed))}
+    if deltas is not None:
+        result["pending"] = dict(zip(addresses, deltas))
+    return compressed_response(json.dumps(result).encode()), 200
+
+
+def located_tx_json(block, position):
+    tx = block.transactions[position]
+    return {
+        "txid": tx.txid,
+        "block_height": block.index,
+        "block_hash": block.hash,
+        "position": position,
+        "confirmations": blockchain.height - block.index,
+        "transaction": tx.to_dict()
+    }
+
+
+@app.route("/tx/<txid>", methods=["GET"])
+def transaction_by_id(txid):
+    found = blockchain.find_transaction(txid.lower())
+    if found is None:
+        return jsonify({"message": "Transaction not found"}), 404
+    if found[0] is None:
+        return body_unavailable()
+    return jsonify(located_tx_json(*found)), 200
+
+
+@app.route("/address/<address>/transactions", methods=["GET"])
+def address_transactions(address):
+    """
+    Confirmed transactions sending to or from `address`, oldest first.
+    Pass the returned next_cursor back as ?cursor= for the next page.
+    """
+    cursor = request.args.get("cursor", default=0, type=int)
+    limit = request.args.get("limit", default=50, type=int)
+    if cursor < 0 or not 1 <= limit <= 500:
+        return jsonify({"message": "cursor must be >= 0 and limit between 1 and 500"}), 400
+
+    page, next_cursor, total = blockchain.address_history(address, cursor, limit)
+    if any(block is None for block, _ in page):
+        return body_unavailable()
+    return jsonify({
+        "address": address,
+        "indexed_from": blockchain.base,
+        "total": total,
+        "cursor": cursor,
+        "next_cursor": next_cursor,
+        "transactions": [located_tx_json(block, position) for block, position in page]
+    }), 200
+
+
 # ----- Networking endpoints -----
 
 @app.route("/nodes/register", methods=["POST"])
@@ -419,36 +465,170 @@ def register_nodes():
 
 @app.route("/nodes", methods=["GET"])
 def list_nodes():
-    return jsonify({"nodes": list(blockchain.nodes)}), 200
+    return jsonify({
+        "nodes": list(blockchain.nodes),
+        "peers": blockchain.peers.to_list(blockchain.nodes)
+    }), 200
 
 
 @app.route("/nodes/resolve", methods=["GET"])
 def consensus():
-    replaced = blockchain.resolve_conflicts()
+    """
+    Schedule a consensus round on the background worker and return at once
+    (202). With ?wait=SECONDS, wait for a round that started after this
+    request and answer with its outcome and our chain, as before.
+    """
+    ticket = consensus_worker.trigger()
+    wait = request.args.get("wait", default=None, type=float)
+    if wait is None:
+        return jsonify({
+            "message": "Consensus round scheduled",
+            "length": blockchain.height,
+            "consensus": consensus_worker.status()
+        }), 202
+
+    summary = consensus_worker.wait(ticket, timeout=wait)
+    if summary is None:
+        return jsonify({
+            "message": "Consensus round still running",
+            "length": blockchain.height,
+            "consensus": consensus_worker.status()
+        }), 202
+    replaced = summary["replaced"]
 
     if replaced:
         message = "Our chain was replaced"
     else:
         message = "Our chain is authoritative"
 
-    chain_data = []
-    for block in blockchain.chain:
-        chain_data.append({
-            "index": block.index,
-            "timestamp": block.timestamp,
-            "previous_hash": block.previous_hash,
-            "hash": block.hash,
-            "nonce": block.nonce,
-            "transactions": block.transactions
-        })
-
-    return jsonify({
-        "message": message,
-        "length": len(chain_data),
-        "chain": chain_data
-    }), 200
+    if blockchain.servable_from:
+        return jsonify({"message": message, "length": blockchain.height}), 200
+    body = chain_json(blockchain.chain, encode=blockchain.block_json, message=message)
+    return compressed_response(body), 200
 
 
 if __name__ == "__main__":
-    # Run like:  python network_node.py  (then set port via FLASK_RUN_PORT or use flask run)
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # Run like:  python network_node.py --port 5001
+    parser = argparse.ArgumentParser(description="Multi-node Flask blockchain node.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--difficulty", type=int, default=3)
+    parser.add_argument("--block-interval", type=float,
+                        help="retarget toward this many seconds per block (every node must agree)")
+    parser.add_argument("--retarget-window", type=int, default=20, help="blocks averaged when retargeting")
+    parser.add_argument("--debug", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--remote-debug-endpoints", action="store_true",
+                        help="let /debug/* (traces, profiler) answer clients other than localhost")
+    parser.add_argument("--data-dir", help="persist the chain (compressed) and the pending pool in this directory")
+    parser.add_argument("--truncate-store", action="store_true",
+                        help="if a stored block is invalid, keep the blocks before it and cut the store back "
+                             "to them (default: refuse to start)")
+    parser.add_argument("--snapshot-interval", type=int, default=100,
+                        help="snapshot state every N blocks (0 disables)")
+    parser.add_argument("--bootstrap-from", metavar="URL",
+                        help="start from this peer's snapshot instead of replaying its whole chain")
+    parser.add_argument("--snapshot-hash", help="snapshot hash to trust (required with --bootstrap-from)")
+    parser.add_argument("--checkpoint", action="append", default=[], metavar="HEIGHT:HASH",
+                        help="trusted block; signatures at or below it are not re-verified (repeatable)")
+    parser.add_argument("--strict", action="store_true",
+                        help="verify every signature, ignoring checkpoints")
+    parser.add_argument("--auto-mine", action="store_true",
+                        help="mine in the background when the pool is big enough or has waited long enough")
+    parser.add_argument("--miner-address", help="reward address for --auto-mine blocks")
+    parser.add_argument("--mine-min-txs", type=int, default=100)
+    parser.add_argument("--mine-min-bytes", type=int, default=256 * 1024)
+    parser.add_argument("--mine-max-wait", type=float, default=10.0,
+                        help="seconds the oldest pending transaction may wait")
+    parser.add_argument("--max-block-txs", type=int, default=1000)
+    parser.add_argument("--max-block-bytes", type=int, default=1024 * 1024)
+    parser.add_argument("--consensus-interval", type=float, default=30.0,
+                        help="seconds between background consensus rounds without announcements (0 disables)")
+    parser.add_argument("--consensus-debounce", type=float, default=0.2,
+                        help="seconds to collect announcements into one consensus round")
+    parser.add_argument("--allow-overspend", action="store_true",
+                        help="accept transactions the sender cannot afford (test harnesses with unfunded wallets)")
+    parser.add_argument("--tx-rate", type=float, default=200,
+                        help="transactions per second accepted from one client IP (0 disables)")
+    parser.add_argument("--tx-burst", type=int, default=400)
+    parser.add_argument("--sender-rate", type=float, default=20,
+                        help="transactions per second accepted from one sender key (0 disables)")
+    parser.add_argument("--sender-burst", type=int, default=50)
+    parser.add_argument("--verify-queue", type=int, default=256,
+                        help="transactions waiting for signature checks before new ones get 503")
+    parser.add_argument("--verify-workers", type=int, default=2)
+    parser.add_argument("--max-pool", type=int, default=50000, help="pending transactions before new ones get 503")
+    parser.add_argument("--mempool-expiry", type=float, default=72 * 3600,
+                        help="drop pending transactions older than this many seconds (0 keeps them)")
+    parser.add_argument("--hd-xpub", help="account extended public key /wallets/derive hands out addresses from "
+                                          "(python hd_wallet.py xpub)")
+    parser.add_argument("--hd-path", default="m/44'/0'/0'/0", help="derivation path of --hd-xpub, used in paths")
+    parser.add_argument("--prune", type=int, default=0, metavar="K",
+                        help="keep only the last K block bodies in memory; older ones are read from "
+                             "--data-dir, or fetched from peers without one")
+    args = parser.parse_args()
+    if args.bootstrap_from and not args.snapshot_hash:
+        parser.error("--bootstrap-from needs --snapshot-hash (see the peer's /status)")
+    if args.prune < 0:
+        parser.error("--prune must be a positive block count")
+
+    app.config["DEBUG_ENDPOINTS_REMOTE"] = args.remote_debug_endpoints
+    blockchain.difficulty = args.difficulty
+    blockchain.block_interval = args.block_interval
+    blockchain.retarget_window = args.retarget_window
+    blockchain.snapshot_interval = args.snapshot_interval
+    blockchain.prune_depth = args.prune
+    blockchain.max_block_txs = args.max_block_txs
+    blockchain.max_block_bytes = args.max_block_bytes
+    blockchain.strict = args.strict
+    blockchain.allow_overspend = args.allow_overspend
+    blockchain.pool_expiry = args.mempool_expiry
+    if args.hd_xpub:
+        try:
+            ExtendedKey.from_xpub(args.hd_xpub)
+        except ValueError as e:
+            parser.error(f"--hd-xpub: {e}")
+        hd_account = (args.hd_xpub, args.hd_path)
+    consensus_worker.interval = args.consensus_interval
+    consensus_worker.debounce = args.consensus_debounce
+    admission = Admission(blockchain, client_rate=args.tx_rate, client_burst=args.tx_burst,
+                          sender_rate=args.sender_rate, sender_burst=args.sender_burst,
+                          queue_size=args.verify_queue, workers=args.verify_workers,
+                          max_pool=args.max_pool)
+    for checkpoint in args.checkpoint:
+        height, _, block_hash = checkpoint.partition(":")
+        if not height.isdigit() or len(block_hash) != 64:
+            parser.error(f"--checkpoint expects HEIGHT:HASH, got {checkpoint!r}")
+        blockchain.add_checkpoint(int(height), block_hash)
+
+    # With --debug the reloader re-runs this script in a child process that does the serving;
+    # only that process opens the store and journal, bootstraps and runs background threads
+    serving = not args.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+    if args.data_dir and serving:
+        os.makedirs(args.data_dir, exist_ok=True)
+        try:
+            dropped = blockchain.attach_store(ChainStore(os.path.join(args.data_dir, "chain.dat")),
+                                              truncate=args.truncate_store)
+        except ValueError as e:
+            raise SystemExit(f"cannot load the chain store: {e} "
+                             f"Restart with the chain's settings, or pass --truncate-store to keep the blocks before it.")
+        if dropped:
+            print(f"--truncate-store: dropped {dropped} invalid stored blocks, kept {blockchain.height}")
+
+    if args.bootstrap_from and blockchain.height == 1 and serving:
+        started = time.time()
+        ok, msg = blockchain.bootstrap_from(args.bootstrap_from, args.snapshot_hash)
+        if not ok:
+            raise SystemExit(f"bootstrap failed: {msg}")
+        blockchain.bootstrap_state["ready_s"] = round(time.time() - started, 3)
+        blockchain.register_node(args.bootstrap_from)
+        threading.Thread(target=blockchain.backfill, args=([args.bootstrap_from],), daemon=True).start()
+    if args.data_dir and serving:
+        blockchain.attach_journal(MempoolJournal(os.path.join(args.data_dir, "mempool.log")))
+    if serving:
+        consensus_worker.start()
+    if args.auto_mine and serving:
+        auto_miner = MiningScheduler(blockchain, miner_address=args.miner_address,
+                                     min_txs=args.mine_min_txs, min_bytes=args.mine_min_bytes,
+                                     max_wait=args.mine_max_wait,
+                                     on_block=announce_block).start()
+    app.run(host=args.host, port=args.port, debug=args.debug, threaded=True)
@@ -4,52 +4,12 @@ from flask import Flask, request, jsonify
 import hashlib
 import json
 import time
-from ecdsa import SigningKey, SECP256k1, VerifyingKey, BadSignatureError
-
-app = Flask(__name__)
-
-# ---------- Wallet / Keys / Addresses ----------
-
-class Wallet:
-    def __init__(self):
-        self.private_key = SigningKey.generate(curve=SECP256k1)
-        self.public_key = self.private_key.get_verifying_key()
-
-    @property
-    def address(self):
-        pub_bytes = self.public_key.to_string()
-        sha = hashlib.sha256(pub_bytes).digest()
-        ripe = hashlib.new("ripemd160", sha).hexdigest()
-        return ripe
-
-    def sign(self, message: str) -> str:
-        signature = self.private_key.sign(message.encode())
-        return signature.hex()
-
-    def export(self):
-        return {
-            "private_key": self.private_key.to_string().hex(),
-            "public_key": self.public_key.to_string().hex(),
-            "address": self.address
-        }
 
+from pychain.crypto import Wallet, pubkey_to_address, verify_signature
+from tracing import tracer, install as install_tracing
 
-def verify_signature(public_key_hex: str, message: str, signature_hex: str) -> bool:
-    try:
-        pub_bytes = bytes.fromhex(public_key_hex)
-        vk = VerifyingKey.from_string(pub_bytes, curve=SECP256k1)
-        vk.verify(bytes.fromhex(signature_hex), message.encode())
-        return True
-    except (BadSignatureError, ValueError):
-        return False
-
-
-def pubkey_to_address(public_key_hex: str) -> str:
-    pub_bytes = bytes.fromhex(public_key_hex)
-    sha = hashlib.sha256(pub_bytes).digest()
-    ripe = hashlib.new("ripemd160", sha).hexdigest()
-    return ripe
-
+app = Flask(__name__)
+install_tracing(app)
 
 # ---------- Block / Blockchain ----------
 
@@ -62,7 +22,15 @@ class Block:
         self.nonce = nonce
         self.hash = self.compute_hash()
 
+    @tracer.traced("Block.compute_hash")
     def compute_hash(self):
+        return self.hash_contents()
+
+    def hash_contents(self):
+        """
+        compute_hash without its span: the PoW loop calls this once per nonce
+        and is traced as a whole.
+        """
         block_string = json.dumps({
             "index": self.index,
             "transactions": self.transactions,
@@ -102,6 +70,7 @@ class Blockchain:
         }
         return json.dumps(tx_core, sort_keys=True)
 
+    @tracer.traced("Blockchain.add_signed_transaction")
     def add_signed_transaction(self, sender_pubkey_hex, recipient_address, amount, signature_hex, timestamp=None):
         if timestamp is None:
             timestamp = time.time()
@@ -129,14 +98,15 @@ class Blockchain:
         self.unconfirmed_transactions.append(tx)
         return True, "Transaction added"
 
+    @tracer.traced("Blockchain.proof_of_work")
     def proof_of_work(self, block):
         block.nonce = 0
-        computed_hash = block.compute_hash()
+        computed_hash = block.hash_contents()
         target_prefix = "0" * self.difficulty
 
         while not computed_hash.startswith(target_prefix):
             block.nonce += 1
-            computed_hash = block.compute_hash()
+            computed_hash = block.hash_contents()
 
         return computed_hash
 
@@ -157,6 +127,7 @@ class Blockchain:
         return (block_hash.startswith("0" * self.difficulty)
                 and block_hash == block.compute_hash())
 
+    @tracer.traced("Blockchain.mine")
     def mine(self, miner_address=None, reward_amount=1):
         if not self.unconfirmed_transactions:
             return None, "No transactions to mine"
@@ -188,6 +159,7 @@ class Blockchain:
         else:
             return None, "Failed to add block"
 
+    @tracer.traced("Blockchain.is_chain_valid")
     def is_chain_valid(self):
         for i in range(1, len(self.chain)):
             prev = self.chain[i - 1]
@@ -223,6 +195,7 @@ class Blockchain:
 
         return True
 
+    @tracer.traced("Blockchain.balance_of")
     def balance_of(self, address):
         balance = 0
         for block in self.chain:
@@ -0,0 +1,130 @@
+#peers.py — per-peer health: latency, last contact, height, failures and bans
+#
+# Blockchain.nodes stays the set of registered URLs; this table scores them.
+# Every HTTP exchange with a peer reports its round-trip time or failure, and
+# resolve_conflicts reports peers that serve invalid chains. Unreachable peers
+# are skipped for an exponentially growing backoff, peers that keep serving
+# invalid chains are banned for a while, and sync contacts the rest fastest
+# first.
+
+import threading
+import time
+
+
+class PeerStats:
+    __slots__ = ("url", "rtt", "last_seen", "height", "failures", "strikes",
+                 "retry_at", "banned_until", "requests")
+
+    def __init__(self, url):
+        self.url = url
+        self.rtt = None  # seconds, moving average
+        self.last_seen = None
+        self.height = None
+        self.failures = 0  # consecutive
+        self.strikes = 0
+        self.retry_at = 0.0
+        self.banned_until = 0.0
+        self.requests = 0
+
+    def status(self, now):
+        if now < self.banned_until:
+            return "banned"
+        if now < self.retry_at:
+            return "backoff"
+        if self.last_seen is None:
+            return "unknown"
+        return "healthy" if not self.failures else "retrying"
+
+    def to_dict(self, now):
+        return {
+            "url": self.url,
+            "status": self.status(now),
+            "rtt_ms": None if self.rtt is None else round(self.rtt * 1000, 1),
+            "last_seen": self.last_seen,
+            "height": self.height,
+            "failures": self.failures,
+            "strikes": self.strikes,
+            "retry_in": round(max(0.0, self.retry_at - now), 1),
+            "banned_for": round(max(0.0, self.banned_until - now), 1),
+            "requests": self.requests
+        }
+
+
+class PeerTable:
+    """
+    Backoff after n consecutive failures is base_backoff * 2**(n-1), capped
+    at max_backoff; every ban_strikes invalid chains ban a peer for ban_seconds.
+    """
+
+    def __init__(self, base_backoff=1.0, max_backoff=300.0, ban_strikes=3, ban_seconds=600.0):
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.ban_strikes = ban_strikes
+        self.ban_seconds = ban_seconds
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def get(self, url):
+        with self.lock:
+            stats = self.stats.get(url)
+            if stats is None:
+                stats = self.stats[url] = PeerStats(url)
+            return stats
+
+    # ----- Reports -----
+
+    def success(self, url, rtt):
+        stats = self.get(url)
+        with self.lock:
+            stats.rtt = rtt if stats.rtt is None else 0.8 * stats.rtt + 0.2 * rtt
+            stats.last_seen = time.time()
+            stats.failures = 0
+            stats.retry_at = 0.0
+            stats.requests += 1
+
+    def seen_height(self, url, height):
+        self.get(url).height = height
+
+    def failure(self, url):
+        stats = self.get(url)
+        with self.lock:
+            stats.failures += 1
+            stats.requests += 1
+            delay = min(self.max_backoff, self.base_backoff * 2 ** (stats.failures - 1))
+            stats.retry_at = time.time() + delay
+
+    def strike(self, url):
+        """
+        The peer served an invalid chain or block.
+        """
+        stats = self.get(url)
+        with self.lock:
+            stats.strikes += 1
+            if stats.strikes % self.ban_strikes == 0:
+                stats.banned_until = time.time() + self.ban_seconds
+
+    # ----- Selection -----
+
+    def available(self, url, now=None):
+        stats = self.stats.get(url)
+        if stats is None:
+            return True
+        now = time.time() if now is None else now
+        return now >= stats.banned_until and now >= stats.retry_at
+
+    def ranked(self, urls):
+        """
+        The available urls, fastest first. Peers without a measurement yet
+        come first (so they get one) in their original order.
+        """
+        now = time.time()
+        ready = [url for url in urls if self.available(url, now)]
+        return sorted(ready, key=self.rtt)
+
+    def rtt(self, url):
+        stats = self.stats.get(url)
+        return 0.0 if stats is None or stats.rtt is None else stats.rtt
+
+    def to_list(self, urls):
+        now = time.time()
+        return [self.get(url).to_dict(now) for url in sorted(urls)]
@@ -0,0 +1,51 @@
+#pychain/__init__.py — the chain core shared by network_node.py and the tools around it
+#
+#   pychain.crypto   Wallet, verify_signature, pubkey_to_address   (ecdsa)
+#   pychain.chain    Transaction, Block, Blockchain, encodings     (stdlib; crypto / requests on first use)
+#
+# Importing the package loads neither: `from pychain import Blockchain` loads
+# pychain.chain, `pychain.Wallet` loads pychain.crypto, and Flask is only
+# imported by the node scripts themselves.
+
+import importlib
+import importlib.util
+import sys
+
+EXPORTS = {
+    "Wallet": "pychain.crypto",
+    "verify_signature": "pychain.crypto",
+    "pubkey_to_address": "pychain.crypto",
+    "Transaction": "pychain.chain",
+    "Block": "pychain.chain",
+    "Blockchain": "pychain.chain",
+    "pack_hex": "pychain.chain",
+    "unpack_hex": "pychain.chain",
+    "transaction_message": "pychain.chain",
+    "difficulty_target": "pychain.chain",
+    "target_hex": "pychain.chain",
+}
+
+
+def __getattr__(name):
+    module = EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'pychain' has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
+
+
+def lazy_import(name):
+    """
+    Module `name`, executed on first attribute access instead of now; None
+    if it is not installed (the same contract as an optional import).
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        return None
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
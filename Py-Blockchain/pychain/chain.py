@@ -0,0 +1,1585 @@
+#pychain/chain.py — transactions, blocks and the Blockchain every node runs
+#
+# Needs only the standard library and this folder's helper modules to import.
+# Signature checks load pychain.crypto (ecdsa) and peer requests load
+# `requests` the first time they are used, so tools that only hash, replay or
+# simulate chains never pay for either.
+
+import collections
+import contextlib
+import hashlib
+import json
+import math
+import threading
+import time
+from urllib.parse import urlparse
+
+from analytics import archive, build_columns, column_files
+from compression import accept_encoding_header
+from filters import block_addresses, build_filter
+from indexes import ChainIndex
+from mempool_journal import JournalError
+from peers import PeerTable
+from pychain import lazy_import
+from relay import new_salt, pool_by_short_id, short_txid, shortid_key
+from snapshots import make_snapshot, verify_snapshot
+from tracing import tracer
+
+crypto = lazy_import("pychain.crypto")
+requests = lazy_import("requests")
+
+
+# ---------- Compact encodings ----------
+
+def pack_hex(value):
+    """
+    Hold lowercase hex (hashes, keys, signatures, addresses) as raw bytes: half
+    the characters and no per-string overhead. Anything that would not
+    round-trip exactly ("NETWORK", "0", None, hand-typed addresses) is kept
+    as-is, so the JSON and block hashes stay byte-for-byte identical.
+    """
+    if isinstance(value, str) and value and len(value) % 2 == 0:
+        try:
+            raw = bytes.fromhex(value)
+        except ValueError:
+            return value
+        if raw.hex() == value:
+            return raw
+    return value
+
+
+def unpack_hex(value):
+    return value.hex() if isinstance(value, bytes) else value
+
+
+# ---------- Transaction / Block / Blockchain ----------
+
+MAX_TARGET = 2 ** 256 - 1
+MEDIAN_SPAN = 11  # a block's timestamp must be later than the median of this many before it
+
+
+HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
+def is_number(value):
+    return type(value) in (int, float) and math.isfinite(value)
+
+
+def is_hex(value):
+    return isinstance(value, str) and value != "" and len(value) % 2 == 0 and HEX_DIGITS.issuperset(value)
+
+
+def target_hex(target):
+    """
+    A 256-bit integer target as 64 hex digits. Comparing equal-length hex
+    strings orders them numerically, so a hash meets the target exactly
+    when `hash_hex <= target_hex(target)`.
+    """
+    return format(target, "064x")
+
+
+def difficulty_target(difficulty):
+    """
+    Integer target equivalent to `difficulty` leading hex zeros, the rule for
+    blocks that carry no target of their own.
+    """
+    return 16 ** (64 - difficulty) - 1
+
+
+def block_work(target):
+    """
+    Expected hashes to meet `target`; fork choice sums this over a chain.
+    """
+    return 2 ** 256 // (target + 1)
+
+
+def share_target(target):
+    """
+    16x easier than the block target: proof of work for miners that never find a block.
+    """
+    return min(MAX_TARGET, target * 16 + 15)
+
+
+def json_scalar(value):
+    return str(value).encode() if type(value) is int else json.dumps(value).encode()
+
+
+def transaction_message(sender, recipient, amount, timestamp):
+    """
+    Canonical message format for signing.
+    """
+    tx_core = {
+        "sender": sender,
+        "recipient": recipient,
+        "amount": amount,
+        "timestamp": timestamp
+    }
+    return json.dumps(tx_core, sort_keys=True)
+
+
+def well_formed(tx):
+    """
+    A transaction dict has the field types balances and the index rely on:
+    a positive amount and a timestamp that are finite numbers, and hex
+    addresses, key and signature. Rewards (sender "NETWORK") may pay any
+    string recipient and carry no key or signature.
+    """
+    if not (is_number(tx["amount"]) and tx["amount"] > 0 and is_number(tx["timestamp"])):
+        return False
+    if tx["sender_address"] == "NETWORK":
+        return isinstance(tx["recipient_address"], str) and tx["recipient_address"] != ""
+    return all(is_hex(tx[key]) for key in ("sender_address", "recipient_address", "sender_pubkey", "signature"))
+
+
+class Transaction:
+    """
+    A transaction with its hex fields held as raw bytes. `canonical` is
+    exactly the json.dumps(sort_keys=True) text this transaction contributes
+    to a block hash or to /chain; it is spliced from the fields when needed
+    rather than stored, and only its SHA-256 (the txid) is kept.
+    """
+
+    __slots__ = ("sender_address", "sender_pubkey", "recipient_address", "amount", "timestamp", "signature", "_txid")
+
+    def __init__(self, sender_address, sender_pubkey, recipient_address, amount, timestamp, signature):
+        self.sender_address = pack_hex(sender_address)
+        self.sender_pubkey = pack_hex(sender_pubkey)
+        self.recipient_address = pack_hex(recipient_address)
+        self.amount = amount
+        self.timestamp = timestamp
+        self.signature = pack_hex(signature)
+        self._txid = hashlib.sha256(self.canonical).digest()
+
+    @classmethod
+    def from_dict(cls, tx):
+        if not well_formed(tx):
+            raise ValueError("Malformed transaction")
+        return cls(
+            sender_address=tx["sender_address"],
+            sender_pubkey=tx["sender_pubkey"],
+            recipient_address=tx["recipient_address"],
+            amount=tx["amount"],
+            timestamp=tx["timestamp"],
+            signature=tx["signature"]
+        )
+
+    @classmethod
+    def from_canonical(cls, canonical):
+        """
+        Rebuild from canonical bytes (a journal entry); the txid is hashed from them as given.
+        """
+        tx = json.loads(canonical)
+        self = cls.__new__(cls)
+        self.sender_address = pack_hex(tx["sender_address"])
+        self.sender_pubkey = pack_hex(tx["sender_pubkey"])
+        self.recipient_address = pack_hex(tx["recipient_address"])
+        self.amount = tx["amount"]
+        self.timestamp = tx["timestamp"]
+        self.signature = pack_hex(tx["signature"])
+        self._txid = hashlib.sha256(canonical).digest()
+        return self
+
+    @property
+    def canonical(self):
+        """
+        json.dumps(self.to_dict(), sort_keys=True).encode(), spliced from scalar encodings.
+        """
+        return b"".join([
+            b'{"amount": ', json_scalar(self.amount),
+            b', "recipient_address": ', json_scalar(unpack_hex(self.recipient_address)),
+            b', "sender_address": ', json_scalar(unpack_hex(self.sender_address)),
+            b', "sender_pubkey": ', json_scalar(unpack_hex(self.sender_pubkey)),
+            b', "signature": ', json_scalar(unpack_hex(self.signature)),
+            b', "timestamp": ', json_scalar(self.timestamp), b"}"
+        ])
+
+    def to_dict(self):
+        return {
+            "sender_address": unpack_hex(self.sender_address),
+            "sender_pubkey": unpack_hex(self.sender_pubkey),
+            "recipient_address": unpack_hex(self.recipient_address),
+            "amount": self.amount,
+            "timestamp": self.timestamp,
+            "signature": unpack_hex(self.signature)
+        }
+
+    @property
+    def txid(self):
+        return self._txid.hex()
+
+    @property
+    def signing_message(self):
+        """
+        Same text as transaction_message(), spliced from scalar encodings
+        rather than building and sorting a dict.
+        """
+        return "".join([
+            '{"amount": ', json_scalar(self.amount).decode(),
+            ', "recipient": ', json_scalar(unpack_hex(self.recipient_address)).decode(),
+            ', "sender": ', json_scalar(unpack_hex(self.sender_address)).decode(),
+            ', "timestamp": ', json_scalar(self.timestamp).decode(), "}"
+        ])
+
+    @property
+    def is_reward(self):
+        return self.sender_address == "NETWORK"
+
+
+def tx_to_json(tx):
+    return tx.to_dict() if isinstance(tx, Transaction) else tx
+
+
+def tx_encoding(tx):
+    return tx.canonical if isinstance(tx, Transaction) else json.dumps(tx, sort_keys=True).encode()
+
+
+class Block:
+    """
+    Block hash input is json.dumps({...}, sort_keys=True) of the block fields.
+    Sorted, the nonce is the second key, so everything after it (previous
+    hash, timestamp and the transactions' cached encodings) is assembled once
+    into `_tail` and each hash attempt only formats the index and nonce.
+    """
+
+    __slots__ = ("index", "_transactions", "_timestamp", "_previous_hash", "_target", "nonce", "_hash", "_tail")
+
+    def __init__(self, index, transactions, timestamp, previous_hash, nonce=0, hash_value=None, target=None):
+        self.index = index
+        self.transactions = transactions
+        self.timestamp = timestamp
+        self.previous_hash = previous_hash
+        self.target = target
+        self.nonce = nonce
+        self.hash = hash_value or self.compute_hash()
+
+    @property
+    def transactions(self):
+        """
+        None once the body has been pruned (see Blockchain.prune_bodies).
+        """
+        return self._transactions
+
+    @transactions.setter
+    def transactions(self, value):
+        self._transactions = [Transaction.from_dict(tx) if isinstance(tx, dict) else tx for tx in value]
+        self._tail = None
+
+    @property
+    def timestamp(self):
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, value):
+        self._timestamp = value
+        self._tail = None
+
+    @property
+    def hash(self):
+        return unpack_hex(self._hash)
+
+    @hash.setter
+    def hash(self, value):
+        self._hash = pack_hex(value)
+
+    @property
+    def previous_hash(self):
+        return unpack_hex(self._previous_hash)
+
+    @previous_hash.setter
+    def previous_hash(self, value):
+        self._previous_hash = pack_hex(value)
+        self._tail = None
+
+    @property
+    def target(self):
+        """
+        Integer PoW target set by retargeting, or None for blocks that use the
+        chain's fixed difficulty. Only hashed (and serialized) when set, so
+        blocks without one keep their original hashes.
+        """
+        return self._target
+
+    @target.setter
+    def target(self, value):
+        self._target = int(value, 16) if isinstance(value, str) else value
+        self._tail = None
+
+    @property
+    def pruned(self):
+        return self._transactions is None
+
+    def prune(self):
+        """
+        Drop the transactions; the header fields and hash stay.
+        """
+        self._transactions = None
+        self._tail = None
+
+    @classmethod
+    def from_dict(cls, b):
+        if not (type(b["index"]) is int and type(b["nonce"]) is int and is_number(b["timestamp"])
+                and isinstance(b["hash"], str) and isinstance(b["previous_hash"], str)
+                and isinstance(b["transactions"], list) and (b.get("target") is None or is_hex(b["target"]))):
+            raise ValueError("Malformed block")
+        return cls(
+            index=b["index"],
+            transactions=b["transactions"],
+            timestamp=b["timestamp"],
+            previous_hash=b["previous_hash"],
+            nonce=b["nonce"],
+            hash_value=b["hash"],
+            target=b.get("target")
+        )
+
+    def to_dict(self):
+        block = {
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "previous_hash": self.previous_hash,
+            "hash": self.hash,
+            "nonce": self.nonce,
+            "transactions": [tx_to_json(tx) for tx in self.transactions]
+        }
+        if self._target is not None:
+            block["target"] = target_hex(self._target)
+        return block
+
+    def tail(self):
+        if self._tail is None:
+            target = b"" if self._target is None else b', "target": "' + target_hex(self._target).encode() + b'"'
+            self._tail = b"".join([
+                b', "previous_hash": ', json_scalar(self.previous_hash), target,
+                b', "timestamp": ', json_scalar(self.timestamp),
+                b', "transactions": [', b", ".join(tx_encoding(tx) for tx in self.transactions), b"]}"
+            ])
+        return self._tail
+
+    def hasher(self):
+        """
+        Returns nonce -> hex hash for this block's current contents (the PoW inner loop).
+        """
+        prefix = hashlib.sha256(b'{"index": ' + json_scalar(self.index) + b', "nonce": ')
+        tail = self.tail()
+
+        def hash_for_nonce(nonce):
+            h = prefix.copy()
+            h.update(json_scalar(nonce))
+            h.update(tail)
+            return h.hexdigest()
+
+        return hash_for_nonce
+
+    @tracer.traced("Block.compute_hash")
+    def compute_hash(self):
+        return self.hasher()(self.nonce)
+
+    def to_json(self):
+        """
+        This block as /chain JSON, spliced from the cached encodings.
+        """
+        return b"".join([
+            b'{"hash": ', json_scalar(self.hash),
+            b', "index": ', json_scalar(self.index),
+            b', "nonce": ', json_scalar(self.nonce),
+            self.tail()
+        ])
+
+
+class Blockchain:
+    def __init__(self, difficulty=3):
+        self.unconfirmed_transactions = []
+        self.pending_delta = {}  # packed address -> net change pooled transactions will make
+        self.allow_overspend = False
+        self.pool_expiry = None  # seconds a transaction may stay pending
+        self.journal = None
+        self.journal_state = None
+        self.columns_cache = None  # (tip hash, analytics archive)
+        self.chain = []
+        self.difficulty = difficulty
+        self.nodes = set()
+        self.peers = PeerTable()
+        self.store = None
+        self.index = ChainIndex()
+        self.snapshot = None
+        self.snapshot_interval = 0
+        self.bootstrap_state = None
+        self.prune_depth = 0
+        self.pruned_below = 0
+        self.checkpoints = {}
+        self.strict = False
+        self.pool_version = 0
+        self.pool_since = None
+        self.max_block_txs = None
+        self.max_block_bytes = None
+        self.resolving = 0
+        self.block_interval = None
+        self.retarget_window = 20
+        self.max_future = 120.0  # seconds a block's timestamp may run ahead of this node's clock
+        self.templates = collections.OrderedDict()
+        self.partial_blocks = collections.OrderedDict()  # hash -> compact block awaiting transactions
+        self.relay_stats = {"sent": 0, "sent_bytes": 0, "full_bytes": 0, "received": 0, "reconstructed": 0,
+                            "pooled_txs": 0, "missing_txs": 0, "collisions": 0, "orphaned": 0, "fallbacks": 0}
+        self.mining_stats = {"templates": 0, "shares": 0, "blocks": 0, "stale": 0}
+        self.lock = threading.RLock()
+        self.create_genesis_block()
+        self.index.rebuild(self.chain)
+
+    # ----- Core chain -----
+
+    def create_genesis_block(self):
+        genesis_block = Block(
+            index=0,
+            transactions=["Genesis Block"],
+            timestamp=time.time(),
+            previous_hash="0"
+        )
+        self.chain.append(genesis_block)
+
+    @property
+    def last_block(self):
+        return self.chain[-1]
+
+    @property
+    def base(self):
+        """
+        Height of self.chain[0]: 0, or the snapshot tip while older blocks are backfilled.
+        """
+        return self.chain[0].index
+
+    @property
+    def height(self):
+        return self.base + len(self.chain)
+
+    def block_at(self, height):
+        if self.base <= height < self.height:
+            return self.chain[height - self.base]
+        return None
+
+    # ----- Transactions -----
+
+    def create_transaction_message(self, sender, recipient, amount, timestamp):
+        return transaction_message(sender, recipient, amount, timestamp)
+
+    def spendable(self, address):
+        """
+        Confirmed balance plus what pooled transactions will add or take
+        (packed address; two dict lookups).
+        """
+        return self.index.balance(address) + self.pending_delta.get(address, 0)
+
+    def precheck(self, sender_pubkey_hex, recipient_address, amount, timestamp):
+        """
+        (ok, msg) for the checks that cost no signature verification: the
+        recipient is a hex address, amount and timestamp are numbers (the
+        amount positive) and the sender can afford it.
+        """
+        if not is_hex(recipient_address):
+            return False, "Invalid recipient address"
+        if not is_number(amount) or amount <= 0:
+            return False, "Invalid amount"
+        if not is_number(timestamp):
+            return False, "Invalid timestamp"
+        try:
+            sender_address = crypto.pubkey_to_address(sender_pubkey_hex)
+        except (ValueError, TypeError):
+            return False, "Invalid public key"
+        if not self.allow_overspend and self.spendable(pack_hex(sender_address)) < amount:
+            return False, "Insufficient funds"
+        return True, "OK"
+
+    @tracer.traced("Blockchain.add_signed_transaction")
+    def add_signed_transaction(self, sender_pubkey_hex, recipient_address, amount, signature_hex, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+
+        ok, msg = self.precheck(sender_pubkey_hex, recipient_address, amount, timestamp)
+        if not ok:
+            return False, msg
+        sender_address = crypto.pubkey_to_address(sender_pubkey_hex)
+
+        tx = Transaction(
+            sender_address=sender_address,
+            sender_pubkey=sender_pubkey_hex,
+            recipient_address=recipient_address,
+            amount=amount,
+            timestamp=timestamp,
+            signature=signature_hex
+        )
+
+        if not crypto.verify_signature(sender_pubkey_hex, tx.signing_message, signature_hex):
+            return False, "Invalid signature"
+
+        with self.lock:
+            # Checked again: another submission from this sender may have been pooled meanwhile
+            if not self.allow_overspend and self.spendable(tx.sender_address) < amount:
+                return False, "Insufficient funds"
+            self.apply_pending(tx, 1)
+            ticket = self.journal and self.journal.add(tx._txid, tx.canonical)
+            # Pooled last, once nothing above can fail
+            if not self.unconfirmed_transactions:
+                self.pool_since = time.time()
+            self.unconfirmed_transactions.append(tx)
+            self.pool_version += 1
+        # Outside the lock, so concurrent submissions share the journal's next fsync
+        if ticket and not self.journal.wait(ticket):
+            with self.lock:
+                if any(pooled is tx for pooled in self.unconfirmed_transactions):
+                    self.replace_pool([pooled for pooled in self.unconfirmed_transactions if pooled is not tx])
+                    raise JournalError("Transaction could not be written to the mempool journal")
+        return True, "Transaction added"
+
+    def apply_pending(self, tx, sign):
+        """
+        Add (sign=1) or remove (-1) a pooled transaction's effect on pending_delta.
+        """
+        delta = self.pending_delta
+        for address, change in ((tx.sender_address, -tx.amount), (tx.recipient_address, tx.amount)):
+            value = delta.get(address, 0) + sign * change
+            if value:
+                delta[address] = value
+            else:
+                delta.pop(address, None)
+
+    def replace_pool(self, pending):
+        """
+        Make `pending`, a subset of the pool, the new pool; the transactions
+        left out are taken off pending_delta.
+        """
+        kept = {id(tx) for tx in pending}
+        dropped = [tx for tx in self.unconfirmed_transactions if id(tx) not in kept and isinstance(tx, Transaction)]
+        for tx in dropped:
+            self.apply_pending(tx, -1)
+        if self.journal is not None:
+            self.journal.remove([tx._txid for tx in dropped])
+        self.unconfirmed_transactions = pending
+        if not pending:
+            self.pool_since = None
+        self.pool_version += 1
+
+    def drop_confirmed(self):
+        """
+        Remove pooled transactions the (new) chain already contains.
+        """
+        confirmed = self.index.tx_by_id
+        pending = self.unexpired([tx for tx in self.unconfirmed_transactions
+                                  if not (isinstance(tx, Transaction) and tx._txid in confirmed)])
+        if len(pending) != len(self.unconfirmed_transactions):
+            self.replace_pool(pending)
+
+    def unexpired(self, pending):
+        """
+        `pending` without transactions older than pool_expiry seconds.
+        """
+        if not self.pool_expiry:
+            return pending
+        cutoff = time.time() - self.pool_expiry
+        return [tx for tx in pending
+                if not (isinstance(tx, Transaction) and type(tx.timestamp) in (int, float) and tx.timestamp < cutoff)]
+
+    def pool_bytes(self):
+        return sum(len(tx_encoding(tx)) for tx in self.unconfirmed_transactions)
+
+    # ----- Difficulty -----
+
+    def work_target(self, block):
+        """
+        The integer target `block`'s hash must not exceed.
+        """
+        return block.target if block.target is not None else difficulty_target(self.difficulty)
+
+    def retarget(self, recent):
+        """
+        Target for the block after recent[-1], given up to retarget_window + 1
+        blocks ending with it: the average target over the window, scaled by
+        how long those blocks actually took against block_interval (clamped
+        to 4x either way). Integer milliseconds keep every node's result
+        identical. Genesis is skipped, its timestamp is when the node started.
+        """
+        recent = [b for b in recent if b.index > 0]
+        if len(recent) < 2:
+            return self.work_target(recent[-1]) if recent else difficulty_target(self.difficulty)
+
+        spans = len(recent) - 1
+        expected = spans * int(self.block_interval * 1000)
+        actual = int(round((recent[-1].timestamp - recent[0].timestamp) * 1000))
+        actual = min(max(actual, expected // 4), expected * 4)
+        average = sum(self.work_target(b) for b in recent[1:]) // spans
+        return max(1, min(MAX_TARGET, average * actual // expected))
+
+    def next_target(self):
+        """
+        Target for the next block on this chain; None while retargeting is off.
+        """
+        if self.block_interval is None:
+            return None
+        return self.retarget(self.chain[-(self.retarget_window + 1):])
+
+    def valid_timestamp(self, block, previous):
+        """
+        `block`'s timestamp is later than the median of the last MEDIAN_SPAN
+        blocks in `previous` and at most max_future seconds ahead of our
+        clock. retarget() trusts timestamps, so neither bound may be left open.
+        """
+        timestamp = block.timestamp
+        if not is_number(timestamp) or timestamp > time.time() + self.max_future:
+            return False
+        recent = [b.timestamp for b in previous[-MEDIAN_SPAN:]]
+        if not recent:
+            return True
+        if not all(is_number(t) for t in recent):
+            return False
+        return timestamp > sorted(recent)[len(recent) // 2]
+
+    def chain_work(self, blocks):
+        """
+        Total work of `blocks`; 0 if a target is malformed (such a chain
+        fails validation anyway).
+        """
+        work = 0
+        for block in blocks:
+            target = self.work_target(block)
+            if type(target) is not int or not 0 <= target <= MAX_TARGET:
+                return 0
+            work += block_work(target)
+        return work
+
+    @property
+    def total_work(self):
+        """
+        Work of this node's chain. While bootstrapping from a snapshot the
+        history below base is counted at the snapshot tip's target.
+        """
+        return self.chain_work(self.chain) + self.base * block_work(self.work_target(self.chain[0]))
+
+    # ----- Proof of Work / Mining -----
+
+    @tracer.traced("Blockchain.proof_of_work")
+    def proof_of_work(self, block):
+        hash_for_nonce = block.hasher()
+        target = target_hex(self.work_target(block))
+
+        nonce = 0
+        computed_hash = hash_for_nonce(nonce)
+
+        while computed_hash > target:
+            nonce += 1
+            computed_hash = hash_for_nonce(nonce)
+
+        block.nonce = nonce
+        return computed_hash
+
+    def add_block(self, block, proof):
+        with self.lock:
+            previous_hash = self.last_block.hash
+
+            if previous_hash != block.previous_hash:
+                return False
+
+            if block.target != self.next_target():
+                return False
+
+            if not self.valid_timestamp(block, self.chain):
+                return False
+
+            if not self.is_valid_proof(block, proof):
+                return False
+
+            block.hash = proof
+            self.index.connect_block(block)
+            self.chain.append(block)
+            self.persist_block(block)
+            self.prune_bodies()
+            self.maybe_snapshot()
+            return True
+
+    def is_valid_proof(self, block, block_hash):
+        return (block_hash <= target_hex(self.work_target(block))
+                and block_hash == block.compute_hash())
+
+    def candidate_block(self, miner_address=None, reward_amount=1):
+        """
+        Next block over a snapshot of the pool (plus a reward to
+        miner_address), or None if there is nothing to mine. Transactions
+        submitted while it is being mined stay pending, as do any beyond
+        max_block_txs / max_block_bytes (oldest first).
+        """
+        if not self.unconfirmed_transactions:
+            return None
+
+        transactions = self.unconfirmed_transactions[:self.max_block_txs]
+        if self.max_block_bytes is not None:
+            size = 0
+            for count, tx in enumerate(transactions):
+                size += len(tx_encoding(tx))
+                if size > self.max_block_bytes:
+                    transactions = transactions[:max(count, 1)]
+                    break
+
+        if miner_address is not None:
+            reward_tx = Transaction(
+                sender_address="NETWORK",
+                sender_pubkey=None,
+                recipient_address=miner_address,
+                amount=reward_amount,
+                timestamp=time.time(),
+                signature=None
+            )
+            transactions.append(reward_tx)
+
+        return Block(
+            index=self.height,
+            transactions=transactions,
+            timestamp=time.time(),
+            previous_hash=self.last_block.hash,
+            target=self.next_target()
+        )
+
+    def remove_mined(self, block):
+        """
+        Take `block`'s transactions (and expired ones) out of the pool; call with self.lock held.
+        """
+        mined = {tx.txid for tx in block.transactions if isinstance(tx, Transaction)}
+        self.replace_pool(self.unexpired([
+            tx for tx in self.unconfirmed_transactions
+            if (tx.txid if isinstance(tx, Transaction) else Transaction.from_dict(tx).txid) not in mined
+        ]))
+
+    @tracer.traced("Blockchain.mine")
+    def mine(self, miner_address=None, reward_amount=1):
+        new_block = self.candidate_block(miner_address, reward_amount)
+        if new_block is None:
+            return None, "No transactions to mine"
+
+        proof = self.proof_of_work(new_block)
+        # One critical section, as in submit_work: a transaction admitted
+        # between the two steps would otherwise be dropped from the pool
+        with self.lock:
+            added = self.add_block(new_block, proof)
+            if added:
+                self.remove_mined(new_block)
+
+        if added:
+            return new_block, "Block mined"
+        else:
+            return None, "Failed to add block"
+
+    # ----- External mining -----
+
+    def block_template(self, miner_address=None):
+        """
+        (template_id, block) for external miners. While the tip and the pool
+        are unchanged every poll gets the same template, so miners can tell
+        when to switch work by comparing ids.
+        """
+        with self.lock:
+            key = (self.last_block.hash, self.pool_version, miner_address)
+            for template_id, (template_key, block) in reversed(self.templates.items()):
+                if template_key == key:
+                    return template_id, block
+
+            block = self.candidate_block(miner_address)
+            if block is None:
+                return None, None
+            template_id = hashlib.sha256(block.tail() + json_scalar(block.index)).hexdigest()[:16]
+            self.templates[template_id] = (key, block)
+            while len(self.templates) > 32:
+                self.templates.popitem(last=False)
+            self.mining_stats["templates"] += 1
+            return template_id, block
+
+    def submit_work(self, template_id, nonce):
+        """
+        (status, block): status is "block" (accepted), "share" (meets only
+        the share target), "stale" (tip moved on), "unknown" or "invalid".
+        """
+        with self.lock:
+            entry = self.templates.get(template_id)
+            if entry is None:
+                return "unknown", None
+            _, block = entry
+            if block.previous_hash != self.last_block.hash:
+                self.mining_stats["stale"] += 1
+                return "stale", None
+
+            block.nonce = nonce
+            proof = block.compute_hash()
+            if self.add_block(block, proof):
+                del self.templates[template_id]
+                self.remove_mined(block)
+                self.mining_stats["blocks"] += 1
+                return "block", block
+            if proof <= target_hex(share_target(self.work_target(block))):
+                self.mining_stats["shares"] += 1
+                return "share", None
+            return "invalid", None
+
+    # ----- Compact block relay -----
+
+    def compact_block(self, block):
+        """
+        The block's header plus a salted short id per pooled transaction.
+        Rewards (and anything else a peer cannot have pooled) are included
+        in full as [position, transaction] pairs under "prefilled".
+        """
+        salt = new_salt()
+        key = shortid_key(block.hash, salt)
+        compact = block.to_dict()
+        del compact["transactions"]
+        compact.update(salt=salt, short_ids=[], prefilled=[])
+        for position, tx in enumerate(block.transactions):
+            if isinstance(tx, Transaction) and not tx.is_reward:
+                compact["short_ids"].append(short_txid(key, tx._txid))
+            else:
+                compact["prefilled"].append([position, tx_to_json(tx)])
+        return compact
+
+    def receive_compact(self, compact):
+        """
+        (status, detail): "added", "known", "orphan" (does not extend our
+        tip), "missing" with the positions to ask the sender for, or
+        "invalid" with a reason.
+        """
+        with self.lock:
+            self.relay_stats["received"] += 1
+            try:
+                block_hash = compact["hash"]
+                known = self.block_at(compact["index"])
+                if known is not None and known.hash == block_hash:
+                    return "known", None
+                if compact["previous_hash"] != self.last_block.hash:
+                    return "orphan", None
+
+                prefilled = {position: Transaction.from_dict(tx) for position, tx in compact["prefilled"]}
+                short_ids = iter(compact["short_ids"])
+                size = len(compact["short_ids"]) + len(prefilled)
+                pool = pool_by_short_id(shortid_key(block_hash, compact["salt"]),
+                                        ((tx._txid, tx) for tx in self.unconfirmed_transactions
+                                         if isinstance(tx, Transaction)))
+                transactions = [prefilled[i] if i in prefilled else pool.get(next(short_ids))
+                                for i in range(size)]
+            except (KeyError, TypeError, ValueError, StopIteration):
+                return "invalid", "Malformed compact block"
+
+            self.relay_stats["pooled_txs"] += sum(1 for i, tx in enumerate(transactions)
+                                                  if tx is not None and i not in prefilled)
+            self.partial_blocks[block_hash] = (compact, transactions, set(prefilled), False)
+            while len(self.partial_blocks) > 16:
+                self.partial_blocks.popitem(last=False)
+            return self.complete_compact(block_hash)
+
+    def fill_compact(self, block_hash, transactions):
+        """
+        Add the transactions (position -> dict) a sender returned for a
+        "missing" answer, then finish the block. "unknown" if it is not pending.
+        """
+        with self.lock:
+            partial = self.partial_blocks.get(block_hash)
+            if partial is None:
+                return "unknown", None
+            _, slots, _, _ = partial
+            try:
+                for position, tx in transactions.items():
+                    position = int(position)
+                    if 0 <= position < len(slots) and slots[position] is None:
+                        slots[position] = Transaction.from_dict(tx)
+            except (AttributeError, KeyError, TypeError, ValueError):
+                return "invalid", "Malformed transactions"
+            return self.complete_compact(block_hash)
+
+    def complete_compact(self, block_hash):
+        compact, slots, prefilled, refetched = self.partial_blocks[block_hash]
+        missing = [i for i, tx in enumerate(slots) if tx is None]
+        if missing:
+            self.relay_stats["missing_txs"] += len(missing)
+            return "missing", missing
+
+        try:
+            block = Block.from_dict(dict(compact, transactions=slots))
+        except (KeyError, TypeError, ValueError):
+            del self.partial_blocks[block_hash]
+            return "invalid", "Malformed compact block"
+        if block.compute_hash() != block_hash:
+            if refetched:
+                del self.partial_blocks[block_hash]
+                return "invalid", "Block hash mismatch"
+            # A short id matched the wrong pooled transaction: ask for all of them
+            self.relay_stats["collisions"] += 1
+            for i in range(len(slots)):
+                if i not in prefilled:
+                    slots[i] = None
+            self.partial_blocks[block_hash] = (compact, slots, prefilled, True)
+            return self.complete_compact(block_hash)
+
+        del self.partial_blocks[block_hash]
+        # Pooled transactions had their signatures checked on admission
+        pooled = {tx._txid for tx in self.unconfirmed_transactions if isinstance(tx, Transaction)}
+        if not self.is_chain_valid([self.last_block, block], verified=pooled) \
+                or not self.add_block(block, block_hash):
+            return "invalid", "Block failed validation"
+        self.remove_mined(block)
+        self.relay_stats["reconstructed"] += 1
+        return "added", None
+
+    # ----- Persistence -----
+
+    def attach_store(self, store, truncate=False):
+        """
+        Load the chain kept in `store` (a ChainStore), or seed an empty store
+        with the current chain. Every later block is appended. Blocks are
+        validated and indexed as they are read, so a pruning node never holds
+        more than prune_depth bodies while loading.
+
+        A stored block that is malformed or fails validation raises
+        ValueError and the store is left as it is; with truncate=True the
+        blocks before it are loaded and the store is cut back to them.
+        Returns the number of stored blocks dropped that way.
+        """
+        blocks = []
+        index = ChainIndex()
+        records = store.scan()
+        error = None
+        for block_json in records:
+            try:
+                block = Block.from_dict(json.loads(block_json))
+            except (KeyError, TypeError, ValueError):
+                error = "is malformed"
+                break
+            if block.index != len(blocks):
+                error = f"has index {block.index}"
+                break
+            if blocks and not self.is_chain_valid([blocks[-1], block]):
+                error = "fails validation"
+                break
+            blocks.append(block)
+            index.connect_block(block)
+            if self.prune_depth and len(blocks) > self.prune_depth:
+                blocks[-self.prune_depth - 1].prune()
+
+        dropped = 0
+        if error is not None:
+            dropped = 1 + sum(1 for _ in records)  # finish the scan so the store knows every offset
+            if not truncate or not blocks:
+                raise ValueError(f"{store.path}: block {len(blocks)} {error} ({dropped} stored blocks from it "
+                                 f"on); the store was left unchanged. Was it built with a different "
+                                 f"difficulty or block interval?")
+            store.truncate(len(blocks))
+
+        self.store = store
+        if blocks:
+            self.chain = blocks
+            self.index = index
+            self.pruned_below = max(0, len(blocks) - self.prune_depth) if self.prune_depth else 0
+        else:
+            store.rewrite([b.to_json() for b in self.chain])
+        if self.snapshot_interval and self.height > 1:
+            self.take_snapshot()
+        return dropped
+
+    def attach_journal(self, journal):
+        """
+        Refill the pool from `journal` (a MempoolJournal) after a restart and
+        journal every later change. Entries were verified before they were
+        journaled, so signatures are not checked again; entries the chain has
+        confirmed, that have expired or that their sender can no longer cover
+        are dropped, and the journal is compacted to what is left.
+        """
+        started = time.perf_counter()
+        entries = journal.load()
+        confirmed = self.index.tx_by_id
+        counts = {"journaled": len(entries), "loaded": 0, "confirmed": 0, "expired": 0, "unfunded": 0}
+        with self.lock:
+            pooled = {tx._txid for tx in self.unconfirmed_transactions if isinstance(tx, Transaction)}
+            for canonical in entries:
+                tx = Transaction.from_canonical(canonical)
+                if tx._txid in confirmed or tx._txid in pooled:
+                    counts["confirmed"] += 1
+                elif not self.unexpired([tx]):
+                    counts["expired"] += 1
+                elif not self.allow_overspend and self.spendable(tx.sender_address) < tx.amount:
+                    counts["unfunded"] += 1
+                else:
+                    if not self.unconfirmed_transactions:
+                        self.pool_since = time.time()
+                    self.unconfirmed_transactions.append(tx)
+                    self.apply_pending(tx, 1)
+                    counts["loaded"] += 1
+            self.pool_version += 1
+            journal.rewrite((tx._txid, tx.canonical) for tx in self.unconfirmed_transactions
+                            if isinstance(tx, Transaction))
+            self.journal = journal
+        counts["seconds"] = round(time.perf_counter() - started, 3)
+        self.journal_state = counts
+        return counts
+
+    def persist_block(self, block):
+        if self.store is None or self.base:
+            return  # a bootstrapping node writes its store once history is complete
+        self.store.append(block.to_json())
+        if self.store.should_retrain():
+            self.store.compact()
+
+    def replace_chain(self, new_chain):
+        with self.lock:
+            # Indexed on the side and swapped in, so a failure leaves chain and index as they were
+            if self.base:
+                # A full chain from a peer also ends a pending backfill
+                index = ChainIndex()
+                index.rebuild(new_chain)
+            else:
+                index = self.index.copy()
+                index.reorg(self.chain, new_chain)
+            self.index = index
+            self.chain = new_chain
+            self.drop_confirmed()
+            if self.store is not None:
+                self.store.rewrite([b.to_json() for b in new_chain])
+            self.pruned_below = 0
+            self.prune_bodies()
+            self.maybe_snapshot()
+
+    # ----- Pruning -----
+
+    def prune_bodies(self):
+        """
+        Keep only the last prune_depth block bodies in memory. Older bodies
+        are read back from the chain store or, without one, from peers.
+        A bootstrapping node keeps everything until its history is complete.
+        """
+        if not self.prune_depth or self.base:
+            return
+        keep_from = len(self.chain) - self.prune_depth
+        for height in range(self.pruned_below, keep_from):
+            self.chain[height].prune()
+        self.pruned_below = max(self.pruned_below, keep_from)
+
+    @property
+    def servable_from(self):
+        """
+        Lowest height whose block this node can serve in full.
+        """
+        if self.base:
+            return self.base
+        return 0 if self.store is not None else self.pruned_below
+
+    def block_json(self, block):
+        """
+        /chain JSON of `block`, read back from the store if its body was pruned.
+        """
+        if not block.pruned:
+            return block.to_json()
+        if self.store is not None:
+            return self.store.read(block.index)
+        full = self.full_block(block.index)
+        if full is None:
+            raise LookupError(f"body of block {block.index} is unavailable")
+        return full.to_json()
+
+    def full_block(self, height):
+        """
+        The block at `height` with its transactions, loading a pruned body
+        from the store or a peer; None if no source has it. A loaded body is
+        returned as a new Block and is not kept.
+        """
+        block = self.block_at(height)
+        if block is None or not block.pruned:
+            return block
+
+        def checked(b):
+            try:
+                full = Block.from_dict(b)
+            except (KeyError, TypeError, ValueError):
+                return None
+            if full._hash == block._hash and full.hash == full.compute_hash():
+                return full
+            return None
+
+        if self.store is not None:
+            full = checked(json.loads(self.store.read(height)))
+            if full is not None:
+                return full
+        for node in self.peers.ranked(sorted(self.nodes)):
+            fetched = self.fetch_blocks(node, height, height + 1)
+            full = checked(fetched[0]) if fetched else None
+            if full is not None:
+                return full
+            if fetched:
+                self.peers.strike(node)
+        return None
+
+    # ----- Snapshots / Bootstrap -----
+
+    def take_snapshot(self):
+        balances = {unpack_hex(address): amount for address, amount in self.index.balances.items()}
+        self.snapshot = make_snapshot(self.height, self.last_block.hash, self.difficulty,
+                                      balances, self.index.tx_count)
+        return self.snapshot
+
+    def maybe_snapshot(self):
+        """
+        Snapshot every `snapshot_interval` blocks, and again whenever a chain
+        replacement orphans the block the current snapshot was taken at.
+        """
+        if not self.snapshot_interval or self.height < 2:
+            return
+        if self.height % self.snapshot_interval == 0:
+            self.take_snapshot()
+            return
+        if self.snapshot is not None:
+            block = self.block_at(self.snapshot["height"] - 1)
+            if block is None or block.hash != self.snapshot["tip"]:
+                self.take_snapshot()
+
+    def bootstrap(self, snapshot, blocks):
+        """
+        Start from a verified snapshot instead of genesis. `blocks` are the
+        block the snapshot was taken at (its tip) and everything after it;
+        all of them are fully validated, the history below is backfilled later.
+        """
+        blocks = self.chain_from_dicts(blocks) if blocks and isinstance(blocks[0], dict) else blocks
+        if not blocks:
+            return False, "No blocks after snapshot"
+
+        anchor = blocks[0]
+        if anchor.index != snapshot["height"] - 1 or anchor.hash != snapshot["tip"]:
+            return False, "Blocks do not start at the snapshot tip"
+        if not self.is_valid_proof(anchor, anchor.hash):
+            return False, "Invalid snapshot tip block"
+        if not self.is_chain_valid(blocks):
+            return False, "Invalid blocks after snapshot"
+
+        with self.lock:
+            self.chain = blocks
+            self.index.load_state({pack_hex(a): amount for a, amount in snapshot["balances"].items()},
+                                  snapshot["tx_count"], snapshot["height"])
+            for block in blocks[1:]:
+                self.index.connect_block(block)
+            self.snapshot = snapshot
+            self.bootstrap_state = {
+                "state": "backfilling",
+                "snapshot": snapshot["hash"],
+                "snapshot_height": snapshot["height"],
+                "suffix_blocks": len(blocks) - 1
+            }
+        return True, "Bootstrapped from snapshot"
+
+    def complete_backfill(self, history):
+        """
+        Splice blocks [0, base) under the snapshot tip once they validate.
+        The index is rebuilt from real history, so a snapshot that lied about
+        balances is corrected here (and reported as snapshot_matched=False).
+        """
+        anchor = self.chain[0]
+        blocks = self.chain_from_dicts(history) if history and isinstance(history[0], dict) else history
+        if not blocks or blocks[0].index != 0 or len(blocks) != anchor.index:
+            return False, "Incomplete history"
+        if blocks[-1]._hash != anchor._previous_hash or not self.is_chain_valid(blocks + [anchor]):
+            return False, "History does not lead to the snapshot tip"
+
+        index = ChainIndex()
+        index.rebuild(blocks)
+        index.connect_block(anchor)
+        balances = {unpack_hex(address): amount for address, amount in index.balances.items()}
+        replayed = make_snapshot(index.height, anchor.hash, self.snapshot["difficulty"],
+                                 balances, index.tx_count)
+
+        with self.lock:
+            if self.chain[0] is not anchor:
+                return False, "Chain was replaced during backfill"
+            for block in self.chain[1:]:
+                index.connect_block(block)
+            self.chain = blocks + self.chain
+            self.index = index
+            if self.store is not None:
+                self.store.rewrite([b.to_json() for b in self.chain])
+            self.pruned_below = 0
+            self.prune_bodies()
+            self.bootstrap_state.update(state="complete",
+                                        snapshot_matched=replayed["hash"] == self.bootstrap_state["snapshot"])
+        return True, "History backfilled"
+
+    def backfill(self, sources, retry=5.0):
+        """
+        Background thread body: fetch and splice history below the snapshot,
+        trying each source (then registered peers) until one succeeds.
+        """
+        started = time.time()
+        while self.base:
+            for node in list(sources) + self.peers.ranked(sorted(self.nodes)):
+                history = self.fetch_blocks(node, 0, self.base)
+                if history is None:
+                    continue
+                ok, msg = self.complete_backfill(history)
+                if ok or not self.base:
+                    break
+                self.peers.strike(node)
+                self.bootstrap_state["error"] = f"{node}: {msg}"
+            else:
+                time.sleep(retry)
+        if self.bootstrap_state is not None:
+            self.bootstrap_state["backfill_s"] = round(time.time() - started, 3)
+            if self.bootstrap_state["state"] == "backfilling":
+                self.bootstrap_state["state"] = "replaced"
+
+    def bootstrap_from(self, node, snapshot_hash):
+        """
+        Download the peer's latest snapshot, check it against the hash the
+        operator trusts, then fetch and validate the blocks after it.
+        """
+        snapshot = self.fetch_snapshot(node)
+        if snapshot is None:
+            return False, "Peer has no snapshot"
+        ok, msg = verify_snapshot(snapshot, snapshot_hash)
+        if not ok:
+            return False, msg
+        if snapshot["difficulty"] != self.difficulty:
+            return False, "Snapshot was taken at a different difficulty"
+
+        blocks = self.fetch_blocks(node, snapshot["height"] - 1)
+        if blocks is None:
+            return False, "Could not fetch blocks after snapshot"
+        return self.bootstrap(snapshot, blocks)
+
+    # ----- Validation -----
+
+    def chain_from_dicts(self, chain):
+        """
+        Build Block objects from /chain JSON once; None if the JSON is malformed.
+        """
+        try:
+            return [Block.from_dict(b) for b in chain]
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def add_checkpoint(self, height, block_hash):
+        self.checkpoints[height] = pack_hex(block_hash.lower())
+
+    def assume_valid_height(self, chain):
+        """
+        Highest checkpoint `chain` matches, or -1. Every hash link is still
+        checked, so matching it means the whole history below is the
+        checkpointed one.
+        """
+        if not chain:
+            return -1
+        base = chain[0].index
+        best = -1
+        for height, block_hash in self.checkpoints.items():
+            if height > best and base <= height < base + len(chain) and chain[height - base]._hash == block_hash:
+                best = height
+        return best
+
+    def valid_target(self, chain, i):
+        """
+        chain[i] carries the target retargeting requires. Once blocks carry
+        targets they all must; the exact value is only checked when the
+        window behind chain[i] is in `chain` (a bootstrap suffix may start
+        in the middle of it).
+        """
+        curr, prev = chain[i], chain[i - 1]
+        if curr.target is None:
+            return prev.target is None
+        if self.block_interval is None:
+            return False
+        start = i - self.retarget_window - 1
+        if start < 0 and chain[0].index > 0:
+            return True
+        return curr.target == self.retarget(chain[max(0, start):i])
+
+    @tracer.traced("Blockchain.is_chain_valid")
+    def is_chain_valid(self, chain=None, strict=None, verified=None):
+        """
+        chain: list of Block objects, or of block dicts as served by /chain.
+        Signatures in blocks at or below a matching checkpoint are not
+        re-verified unless strict (default: self.strict), nor are those of
+        transactions whose raw txid is in `verified`.
+        """
+        chain = chain or self.chain
+        if chain and isinstance(chain[0], dict):
+            chain = self.chain_from_dicts(chain)
+            if chain is None:
+                return False
+
+        strict = self.strict if strict is None else strict
+        assume_valid = -1 if strict else self.assume_valid_height(chain)
+
+        for i in range(1, len(chain)):
+            prev = chain[i - 1]
+            curr = chain[i]
+
+            if curr._previous_hash != prev._hash:
+                return False
+
+            if not self.valid_target(chain, i):
+                return False
+
+            if not self.valid_timestamp(curr, chain[max(0, i - MEDIAN_SPAN):i]):
+                return False
+
+            curr_hash = curr.hash
+            if curr_hash > target_hex(self.work_target(curr)):
+                return False
+
+            if curr.pruned:
+                continue  # body was validated when the block was accepted
+
+            if curr_hash != curr.compute_hash():
+                return False
+
+            if curr.index <= assume_valid:
+                continue  # hash links and PoW only
+
+            for tx in curr.transactions:
+                if not isinstance(tx, Transaction):
+                    if tx == "Genesis Block":
+                        continue
+                    return False
+                fields = tx.to_dict()
+                if not well_formed(fields):
+                    return False
+                if tx.is_reward or (verified is not None and tx._txid in verified):
+                    continue
+
+                if not crypto.verify_signature(fields["sender_pubkey"], tx.signing_message, fields["signature"]):
+                    return False
+
+        return True
+
+    @tracer.traced("Blockchain.balance_of")
+    def balance_of(self, address):
+        return self.index.balance(pack_hex(address))
+
+    @tracer.traced("Blockchain.balances_of")
+    def balances_of(self, addresses, pending=False):
+        """
+        (height, tip hash, confirmed balances, pending deltas or None) for
+        many addresses, read under one lock so every figure is as of the same
+        tip and pool. Each address is one dict lookup; nothing is scanned.
+        """
+        keys = [pack_hex(address) for address in addresses]
+        with self.lock:
+            held = self.index.balances
+            confirmed = [held.get(key, 0) for key in keys]
+            deltas = [self.pending_delta.get(key, 0) for key in keys] if pending else None
+            return self.height, self.last_block.hash, confirmed, deltas
+
+    # ----- Lookups -----
+
+    def find_transaction(self, txid):
+        """
+        (block, position) of a confirmed transaction, or None.
+        """
+        try:
+            ref = self.index.locate(bytes.fromhex(txid))
+        except ValueError:
+            return None
+        if ref is None:
+            return None
+        height, position = ref
+        return self.full_block(height), position
+
+    def block_filter(self, height):
+        """
+        Address filter bytes for the block at `height`, or None. The index
+        keeps one per connected block; the snapshot anchor's is built here.
+        """
+        data = self.index.filters.get(height)
+        if data is None:
+            block = self.full_block(height)
+            if block is not None:
+                data = build_filter(block.hash, block_addresses(block.transactions))
+        return data
+
+    def address_history(self, address, cursor=0, limit=50):
+        """
+        One page of (block, position) for transactions touching `address`,
+        oldest first. Returns (page, next_cursor or None, total).
+        """
+        refs, next_cursor, total = self.index.history(pack_hex(address), cursor, limit)
+        blocks = {h: self.full_block(h) for h in {h for h, _ in refs}}
+        return [(blocks[h], p) for h, p in refs], next_cursor, total
+
+    def columns_archive(self):
+        """
+        The chain as analytics columns (a zip of .npy files, see analytics.py),
+        rebuilt only when the tip has moved. Pruned bodies are read back one
+        block at a time.
+        """
+        with self.lock:
+            blocks = list(self.chain)
+        tip = blocks[-1].hash
+        if self.columns_cache is None or self.columns_cache[0] != tip:
+            def bodies():
+                for block in blocks:
+                    if block.pruned:
+                        block = self.full_block(block.index)
+                        if block is None:
+                            raise LookupError("block body is unavailable")
+                    yield block
+            self.columns_cache = (tip, archive(column_files(*build_columns(bodies()))))
+        return self.columns_cache[1]
+
+    # ----- Networking / Consensus -----
+
+    def register_node(self, address):
+        """
+        address: 'http://host:port'
+        """
+        parsed = urlparse(address)
+        self.nodes.add(f"{parsed.scheme}://{parsed.netloc}")
+
+    def peer_get(self, node, path, **kwargs):
+        return self.peer_request("GET", node, path, **kwargs)
+
+    def peer_post(self, node, path, **kwargs):
+        return self.peer_request("POST", node, path, **kwargs)
+
+    def peer_request(self, method, node, path, **kwargs):
+        """
+        Request node + path, recording the round trip (time to response
+        headers) or the failure in self.peers. None if the peer is unreachable.
+        """
+        try:
+            response = requests.request(method, f"{node}{path}", **kwargs)
+        except requests.exceptions.RequestException:
+            self.peers.failure(node)
+            return None
+        self.peers.success(node, response.elapsed.total_seconds())
+        return response
+
+    def fetch_chain(self, node):
+        """
+        Download a peer's chain. Returns (length, chain) or None if unreachable.
+        Override to swap the transport (simulator.py serves chains from memory).
+        """
+        with tracer.span("resolve_conflicts.fetch", node=node):
+            response = self.peer_get(node, "/chain",
+                                     headers={"Accept-Encoding": accept_encoding_header()})
+        if response is None or response.status_code != 200:
+            return None
+
+        with tracer.span("resolve_conflicts.decode", node=node):
+            data = response.json()
+        self.peers.seen_height(node, data["length"])
+        return data["length"], data["chain"]
+
+    def fetch_snapshot(self, node):
+        response = self.peer_get(node, "/snapshot", timeout=10)
+        return response.json() if response is not None and response.status_code == 200 else None
+
+    def fetch_blocks(self, node, start, end=None, page=500):
+        """
+        Block dicts [start, end) from a peer's /blocks, `page` at a time;
+        `end` defaults to the peer's tip. None if the peer fails part way or
+        returns a page that does not move past `start` (the peer is struck).
+        """
+        blocks = []
+        while end is None or start < end:
+            stop = start + page if end is None else min(end, start + page)
+            response = self.peer_get(node, "/blocks", params={"from": start, "to": stop},
+                                     headers={"Accept-Encoding": accept_encoding_header()},
+                                     timeout=30)
+            if response is None or response.status_code != 200:
+                return None
+            data = response.json()
+            blocks.extend(data["blocks"])
+            if not data["blocks"]:
+                break
+            if type(data["to"]) is not int or data["to"] <= start:
+                self.peers.strike(node)
+                return None
+            start = data["to"]
+        return blocks
+
+    def relay_compact(self, node, block, compact):
+        """
+        Send `compact` (compact_block(block)) to a peer and answer its request
+        for missing transactions. False if the peer did not take the block,
+        so the caller can fall back to a consensus round.
+        """
+        payload = json.dumps(compact)
+        response = self.peer_post(node, "/blocks/compact", data=payload,
+                                  headers={"Content-Type": "application/json"}, timeout=10)
+        self.relay_stats["sent"] += 1
+        self.relay_stats["sent_bytes"] += len(payload)
+        self.relay_stats["full_bytes"] += len(block.to_json())
+        if response is not None and response.status_code == 202:
+            self.relay_stats["orphaned"] += 1
+            return True  # the peer is behind and scheduled its own consensus round
+        if response is None or response.status_code not in (200, 201):
+            self.relay_stats["fallbacks"] += 1
+            return False
+
+        missing = response.json().get("missing")
+        if missing:
+            payload = json.dumps({
+                "hash": block.hash,
+                "transactions": {str(i): tx_to_json(block.transactions[i])
+                                 for i in missing if type(i) is int and 0 <= i < len(block.transactions)}
+            })
+            response = self.peer_post(node, "/blocks/compact/transactions", data=payload,
+                                      headers={"Content-Type": "application/json"}, timeout=10)
+            self.relay_stats["sent_bytes"] += len(payload)
+            if response is None or response.status_code not in (200, 201):
+                self.relay_stats["fallbacks"] += 1
+                return False
+        self.peers.seen_height(node, response.json().get("length"))
+        return True
+
+    @property
+    def syncing(self):
+        """
+        True while resolving conflicts or backfilling history (auto-mining pauses).
+        """
+        return self.resolving > 0 or self.base > 0
+
+    @contextlib.contextmanager
+    def sync_in_progress(self):
+        with self.lock:
+            self.resolving += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.resolving -= 1
+
+    @tracer.traced("Blockchain.resolve_conflicts")
+    def resolve_conflicts(self):
+        """
+        Most-work valid chain rule: a peer chain replaces ours only if it
+        carries more cumulative work, so a long chain of cheap blocks does
+        not win. Peers in backoff or banned are skipped, and the rest are
+        asked fastest first.
+        """
+        neighbours = self.peers.ranked(self.nodes)
+        new_chain = None
+
+        best_work = self.total_work
+
+        with self.sync_in_progress():
+            for node in neighbours:
+                fetched = self.fetch_chain(node)
+                if fetched is None:
+                    continue
+
+                _, chain = fetched
+                # Decode once: the same Block objects are weighed, validated and adopted
+                blocks = self.chain_from_dicts(chain)
+                if not blocks or blocks[0].index != 0:
+                    self.peers.strike(node)
+                    continue
+
+                work = self.chain_work(blocks)
+                if work <= best_work:
+                    continue
+
+                if self.is_chain_valid(blocks):
+                    best_work = work
+                    new_chain = blocks
+                else:
+                    self.peers.strike(node)
+
+            if new_chain:
+                self.replace_chain(new_chain)
+                return True
+
+        return False
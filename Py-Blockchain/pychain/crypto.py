@@ -0,0 +1,65 @@
+#pychain/crypto.py — keys, signatures and addresses (the only layer that needs ecdsa)
+
+import hashlib
+
+from ecdsa import SigningKey, SECP256k1, VerifyingKey, BadSignatureError
+
+from tracing import tracer
+
+
+# ---------- Wallet / Keys / Addresses ----------
+
+class Wallet:
+    def __init__(self):
+        self.private_key = SigningKey.generate(curve=SECP256k1)
+        self.public_key = self.private_key.get_verifying_key()
+
+    @classmethod
+    def from_private_key(cls, private_key_hex):
+        """
+        A wallet for an existing key, e.g. one derived by hd_wallet.py.
+        """
+        wallet = cls.__new__(cls)
+        wallet.private_key = SigningKey.from_string(bytes.fromhex(private_key_hex), curve=SECP256k1)
+        wallet.public_key = wallet.private_key.get_verifying_key()
+        return wallet
+
+    @property
+    def address(self):
+        pub_bytes = self.public_key.to_string()
+        sha = hashlib.sha256(pub_bytes).digest()
+        ripe = hashlib.new("ripemd160", sha).hexdigest()
+        return ripe
+
+    def sign(self, message: str) -> str:
+        signature = self.private_key.sign(message.encode())
+        return signature.hex()
+
+    def export(self):
+        return {
+            "private_key": self.private_key.to_string().hex(),
+            "public_key": self.public_key.to_string().hex(),
+            "address": self.address
+        }
+
+
+@tracer.traced("verify_signature")
+def verify_signature(public_key_hex, message: str, signature_hex) -> bool:
+    """
+    Key and signature may be hex strings (API input) or raw bytes (Transaction fields).
+    """
+    try:
+        pub_bytes = public_key_hex if isinstance(public_key_hex, bytes) else bytes.fromhex(public_key_hex)
+        sig_bytes = signature_hex if isinstance(signature_hex, bytes) else bytes.fromhex(signature_hex)
+        vk = VerifyingKey.from_string(pub_bytes, curve=SECP256k1)
+        vk.verify(sig_bytes, message.encode())
+        return True
+    except (BadSignatureError, ValueError, TypeError):
+        return False
+
+
+def pubkey_to_address(public_key_hex: str) -> str:
+    pub_bytes = bytes.fromhex(public_key_hex)
+    sha = hashlib.sha256(pub_bytes).digest()
+    ripe = hashlib.new("ripemd160", sha).hexdigest()
+    return ripe
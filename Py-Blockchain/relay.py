@@ -0,0 +1,41 @@
+#relay.py — short salted transaction ids for compact block relay
+#
+# A compact block is a block's header plus, for each pooled transaction in
+# it, a 6-byte id: SHA-256(key + txid) truncated, where the key is derived
+# from the block hash and a random per-message salt. Peers already hold most
+# of those transactions in their pools, so they rebuild the block locally and
+# ask the sender for the rest in one round trip. The salt keeps anyone from
+# precomputing transactions whose short ids collide; the block hash catches
+# a collision that happens anyway, and the receiver then asks for everything.
+
+import hashlib
+import os
+
+SHORT_ID_BYTES = 6
+
+
+def new_salt():
+    return os.urandom(8).hex()
+
+
+def shortid_key(block_hash, salt):
+    return hashlib.sha256(bytes.fromhex(block_hash) + bytes.fromhex(salt)).digest()[:16]
+
+
+def short_txid(key, txid):
+    """
+    txid: the raw 32-byte transaction id.
+    """
+    return hashlib.sha256(key + txid).digest()[:SHORT_ID_BYTES].hex()
+
+
+def pool_by_short_id(key, pool):
+    """
+    {short id: transaction} for (txid, transaction) pairs. Ids two pooled
+    transactions share map to None, so they are fetched instead of guessed.
+    """
+    found = {}
+    for txid, tx in pool:
+        short = short_txid(key, txid)
+        found[short] = None if short in found else tx
+    return found
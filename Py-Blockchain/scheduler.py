@@ -0,0 +1,187 @@
+#scheduler.py — background workers: auto-mining and coalesced consensus rounds
+
+import random
+import threading
+import time
+
+
+class MiningScheduler:
+    """
+    Mines a block whenever the pool holds min_txs transactions or min_bytes
+    of them, or its oldest transaction has waited max_wait seconds. Block
+    size is capped by the blockchain's max_block_txs / max_block_bytes, so a
+    backlog drains over several bounded blocks. Nothing is mined while the
+    node is syncing (resolving conflicts or backfilling history).
+    """
+
+    def __init__(self, blockchain, miner_address=None, min_txs=100, min_bytes=256 * 1024,
+                 max_wait=10.0, poll=0.25, on_block=None):
+        self.blockchain = blockchain
+        self.miner_address = miner_address
+        self.min_txs = min_txs
+        self.min_bytes = min_bytes
+        self.max_wait = max_wait
+        self.poll = poll
+        self.on_block = on_block
+        self.stopped = threading.Event()
+        self.thread = None
+        self.stats = {"blocks": 0, "failed": 0, "paused": 0, "last_reason": None,
+                      "last_block_txs": None, "last_mine_s": None}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="auto-miner", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def due(self, now=None):
+        """
+        Why a block should be mined now, or None.
+        """
+        bc = self.blockchain
+        pool = bc.unconfirmed_transactions
+        if not pool:
+            return None
+        if len(pool) >= self.min_txs:
+            return "transactions"
+        if bc.pool_bytes() >= self.min_bytes:
+            return "bytes"
+        now = time.time() if now is None else now
+        if bc.pool_since is not None and now - bc.pool_since >= self.max_wait:
+            return "max_wait"
+        return None
+
+    def run(self):
+        while not self.stopped.wait(self.poll):
+            if self.blockchain.syncing:
+                self.stats["paused"] += 1
+                continue
+            reason = self.due()
+            if reason is None:
+                continue
+
+            started = time.perf_counter()
+            block, _ = self.blockchain.mine(miner_address=self.miner_address)
+            if block is None:
+                self.stats["failed"] += 1  # the tip moved on during PoW
+                continue
+            self.stats.update(blocks=self.stats["blocks"] + 1, last_reason=reason,
+                              last_block_txs=len(block.transactions),
+                              last_mine_s=round(time.perf_counter() - started, 3))
+            if self.on_block is not None:
+                self.on_block(block)
+
+
+class ConsensusScheduler:
+    """
+    Runs resolve_conflicts on one background thread. A trigger (a peer
+    announcing a block) only schedules a round: triggers that arrive within
+    `debounce` seconds of each other, or while a round is running, are
+    served by a single next round instead of one sync each. Without triggers
+    a round still runs every `interval` seconds, plus or minus `jitter`
+    of it, so nodes that missed an announcement catch up and peers do not
+    poll in lockstep.
+    """
+
+    def __init__(self, blockchain, debounce=0.2, interval=30.0, jitter=0.25):
+        self.blockchain = blockchain
+        self.debounce = debounce
+        self.interval = interval
+        self.jitter = jitter
+        self.rng = random.Random()
+        self.cond = threading.Condition()
+        self.requested = 0  # ticket of the latest trigger
+        self.covered = 0  # highest ticket a finished round started after
+        self.running = None  # ticket the current round started after
+        self.thread = None
+        self.stats = {"triggers": 0, "coalesced": 0, "rounds": 0, "periodic": 0, "replaced": 0,
+                      "last_round": None}
+
+    def start(self):
+        with self.cond:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="consensus", daemon=True)
+                self.thread.start()
+        return self
+
+    def trigger(self):
+        """
+        Ask for a round. Returns a ticket for wait().
+        """
+        self.start()
+        with self.cond:
+            if self.pending():
+                self.stats["coalesced"] += 1  # the next round will serve this one too
+            self.requested += 1
+            self.stats["triggers"] += 1
+            self.cond.notify_all()
+            return self.requested
+
+    def wait(self, ticket, timeout=None):
+        """
+        Block until a round that started after `ticket` was issued finishes.
+        Returns that round's summary, or None on timeout.
+        """
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.covered >= ticket, timeout):
+                return None
+            return self.stats["last_round"]
+
+    def pending(self):
+        """
+        True if a trigger is waiting for a round that has not started yet.
+        """
+        picked = self.covered if self.running is None else self.running
+        return self.requested > picked
+
+    def next_periodic(self):
+        if not self.interval:
+            return None
+        return self.interval * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+    def run(self):
+        while True:
+            with self.cond:
+                periodic = not self.cond.wait_for(lambda: self.requested > self.covered,
+                                                  self.next_periodic())
+            if not periodic:
+                time.sleep(self.debounce)  # let a burst of announcements pile up
+            with self.cond:
+                ticket = self.running = self.requested
+
+            started = time.time()
+            try:
+                replaced = self.blockchain.resolve_conflicts()
+            except Exception as e:  # keep the worker alive; the round is reported as failed
+                replaced, error = False, repr(e)
+            else:
+                error = None
+
+            with self.cond:
+                self.running = None
+                self.covered = ticket
+                self.stats["rounds"] += 1
+                self.stats["periodic"] += periodic
+                self.stats["replaced"] += replaced
+                self.stats["last_round"] = {
+                    "started": started,
+                    "duration_s": round(time.time() - started, 3),
+                    "replaced": replaced,
+                    "height": self.blockchain.height,
+                    "error": error
+                }
+                self.cond.notify_all()
+
+    def status(self):
+        with self.cond:
+            if self.running is not None:
+                state = "running"
+            elif self.pending():
+                state = "scheduled"
+            else:
+                state = "idle"
+            return dict(self.stats, state=state, pending=self.pending())
@@ -0,0 +1,530 @@
+#simulator.py — deterministic discrete-event simulator for network_node consensus
+#
+#   python simulator.py --nodes 100 --blocks 200 --strategy push
+#   python simulator.py --nodes 300 --compare resolve resolve-relay push gossip
+#   python simulator.py --nodes 50 --partition 100:400:0.5 --seed 7
+#   python simulator.py --nodes 30 --blocks 200 --hashrate-growth 8 --retarget
+#
+# Every simulated node runs the real network_node.Blockchain: blocks are built
+# with its proof_of_work / add_block, chains are checked with is_chain_valid,
+# and "resolve" uses resolve_conflicts unchanged. Only the transport is
+# replaced: chain downloads and block announcements go through an in-memory
+# network with per-link latency, bandwidth and scheduled partitions. Time is
+# simulated, so hundreds of nodes run far faster than wall-clock, and the same
+# seed always gives the same result.
+
+import argparse
+import heapq
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+from pychain.chain import Block, Blockchain, difficulty_target  # noqa: E402
+
+STRATEGIES = ["resolve", "resolve-relay", "push", "gossip"]
+
+ANNOUNCE_BYTES = 120  # an HTTP GET /nodes/resolve with headers
+
+
+# ---------- Transport ----------
+
+class Transport:
+    """
+    In-memory network between simulated nodes.
+    Subclass and override latency() / reachable() to model other networks.
+    """
+
+    def __init__(self, sim, rng, latency_min, latency_max, jitter, bandwidth):
+        self.sim = sim
+        self.rng = rng
+        self.latency_min = latency_min
+        self.latency_max = latency_max
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.partitions = []
+        self.links = {}
+        self.bytes_by_kind = {}
+        self.messages = 0
+        self.dropped = 0
+
+    def add_partition(self, start, end, groups):
+        self.partitions.append((start, end, groups))
+
+    def link_latency(self, a, b):
+        key = (min(a, b), max(a, b))
+        if key not in self.links:
+            self.links[key] = self.rng.uniform(self.latency_min, self.latency_max)
+        return self.links[key]
+
+    def latency(self, src, dst, size):
+        delay = self.link_latency(src, dst) + size / self.bandwidth
+        if self.jitter:
+            delay += self.rng.expovariate(1.0 / self.jitter)
+        return delay
+
+    def reachable(self, src, dst):
+        now = self.sim.now
+        for start, end, groups in self.partitions:
+            if start <= now < end and groups[src] != groups[dst]:
+                return False
+        return True
+
+    def account(self, kind, size):
+        self.messages += 1
+        self.bytes_by_kind[kind] = self.bytes_by_kind.get(kind, 0) + size
+
+    def send(self, src, dst, kind, payload, size, handler):
+        if not self.reachable(src, dst):
+            self.dropped += 1
+            return False
+        self.account(kind, size)
+        self.sim.schedule(self.latency(src, dst, size), handler, dst, src, payload)
+        return True
+
+    def fetch_chain(self, src, dst):
+        """
+        Synchronous GET /chain from dst, as seen by src right now.
+        """
+        if not self.reachable(src, dst):
+            self.dropped += 1
+            return None
+        peer = self.sim.nodes[dst].blockchain
+        chain = [self.sim.block_dict(b) for b in peer.chain]
+        self.account("chain", self.sim.chain_bytes(peer.chain))
+        return len(chain), chain
+
+
+class PeerSet(dict):
+    """
+    Insertion-ordered stand-in for Blockchain.nodes. A real set iterates in
+    hash order, which changes with PYTHONHASHSEED and would make
+    resolve_conflicts' tie-breaking differ between runs with the same seed.
+    """
+
+    def add(self, url):
+        self[url] = None
+
+
+class SimBlockchain(Blockchain):
+    """
+    The real Blockchain with resolve_conflicts' HTTP fetch routed through the Transport.
+    """
+
+    def __init__(self, sim, node_id, difficulty):
+        super().__init__(difficulty=difficulty)
+        self.sim = sim
+        self.node_id = node_id
+        self.nodes = PeerSet()
+
+    def fetch_chain(self, node):
+        return self.sim.transport.fetch_chain(self.node_id, self.sim.url_to_id[node])
+
+
+class SimNode:
+    def __init__(self, sim, node_id, difficulty, hashpower):
+        self.id = node_id
+        self.url = f"sim://node{node_id}"
+        self.blockchain = SimBlockchain(sim, node_id, difficulty)
+        self.hashpower = hashpower
+        self.mine_gen = 0
+        self.peers = []
+        self.known = set()
+        self.resolving = False
+
+
+# ---------- Simulator ----------
+
+class Simulator:
+    def __init__(self, nodes=50, degree=8, difficulty=1, block_interval=10.0,
+                 strategy="resolve", fanout=3, latency_min=0.02, latency_max=0.2,
+                 jitter=0.01, bandwidth=1_000_000, txs_per_block=0, retarget=False,
+                 hashrate_growth=1.0, seed=1234):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy {strategy!r}")
+        self.rng = random.Random(seed)
+        self.now = 0.0
+        self.events = []
+        self._seq = itertools.count()
+        self.strategy = strategy
+        self.fanout = fanout
+        self.block_interval = block_interval
+        self.txs_per_block = txs_per_block
+        self.hashrate_growth = hashrate_growth
+        # Mining rates change with the target or the hashrate; rescheduling is then needed
+        self.rate_varies = retarget or hashrate_growth != 1.0
+        self.base_target = difficulty_target(difficulty)
+        self.stop_mining_at = float("inf")
+        self.transport = Transport(self, random.Random(self.rng.random()),
+                                   latency_min, latency_max, jitter, bandwidth)
+
+        self._block_dicts = {}
+        self._block_sizes = {}
+        self.mined = []
+        self.adopted = {}
+        self.duplicates = 0
+
+        weights = [self.rng.paretovariate(1.5) for _ in range(nodes)]
+        total = sum(weights)
+        self.nodes = [SimNode(self, i, difficulty, w / total) for i, w in enumerate(weights)]
+        if retarget:
+            for node in self.nodes:
+                node.blockchain.block_interval = block_interval
+        self.url_to_id = {n.url: n.id for n in self.nodes}
+
+        # Every node starts from the same genesis block
+        genesis = self.nodes[0].blockchain.chain[0]
+        genesis.timestamp = 0.0
+        genesis.hash = genesis.compute_hash()
+        for node in self.nodes:
+            node.blockchain.chain = [genesis]
+            node.known.add(genesis.hash)
+
+        self._build_topology(degree)
+
+    def _build_topology(self, degree):
+        n = len(self.nodes)
+        edges = set()
+        for i in range(n):
+            edges.add((min(i, (i + 1) % n), max(i, (i + 1) % n)))
+        target = n * min(degree, n - 1) // 2
+        while len(edges) < target:
+            a, b = self.rng.sample(range(n), 2)
+            edges.add((min(a, b), max(a, b)))
+        for a, b in sorted(edges):
+            if a == b:
+                continue
+            self.nodes[a].peers.append(b)
+            self.nodes[b].peers.append(a)
+        for node in self.nodes:
+            node.peers.sort()
+            for peer in node.peers:
+                node.blockchain.register_node(self.nodes[peer].url)
+
+    # ----- Event loop -----
+
+    def schedule(self, delay, handler, *args):
+        heapq.heappush(self.events, (self.now + delay, next(self._seq), handler, args))
+
+    def run(self, until):
+        while self.events and self.events[0][0] <= until:
+            self.now, _, handler, args = heapq.heappop(self.events)
+            handler(*args)
+        self.now = max(self.now, until)
+
+    # ----- Sizes -----
+
+    def block_dict(self, block):
+        cached = self._block_dicts.get(block.hash)
+        if cached is None:
+            cached = block.to_dict()
+            self._block_dicts[block.hash] = cached
+        return cached
+
+    def block_bytes(self, block):
+        size = self._block_sizes.get(block.hash)
+        if size is None:
+            size = len(json.dumps(self.block_dict(block)))
+            self._block_sizes[block.hash] = size
+        return size
+
+    def chain_bytes(self, chain):
+        return 40 + sum(self.block_bytes(b) + 2 for b in chain)
+
+    # ----- Mining -----
+
+    def start_mining(self, stop_at):
+        self.stop_mining_at = stop_at
+        rate = 1.0 / self.block_interval
+        for node in self.nodes:
+            if self.rate_varies:
+                self.schedule_mining(node)
+            else:
+                self.schedule(self.rng.expovariate(rate * node.hashpower), self.on_mine, node.id)
+        if self.rate_varies:
+            self.schedule(self.block_interval, self.on_tick)
+
+    def mining_rate(self, node):
+        """
+        Blocks per second for `node` now: its share of a network hashrate that
+        grows linearly to hashrate_growth x while mining, scaled by how much
+        easier or harder its next target is than the starting difficulty.
+        """
+        growth = 1.0 + (self.hashrate_growth - 1.0) * min(1.0, self.now / self.stop_mining_at)
+        target = node.blockchain.next_target() or self.base_target
+        return node.hashpower * growth * (target / self.base_target) / self.block_interval
+
+    def schedule_mining(self, node):
+        """
+        (Re)draw the node's next block time. Mining is memoryless, so dropping
+        the pending draw and sampling at the new rate is exact.
+        """
+        node.mine_gen += 1
+        self.schedule(self.rng.expovariate(self.mining_rate(node)), self.on_mine, node.id, node.mine_gen)
+
+    def on_tick(self):
+        """
+        Resample every node while the hashrate ramps.
+        """
+        if self.now >= self.stop_mining_at:
+            return
+        for node in self.nodes:
+            self.schedule_mining(node)
+        self.schedule(self.block_interval, self.on_tick)
+
+    def on_mine(self, node_id, gen=None):
+        if self.now >= self.stop_mining_at:
+            return
+        node = self.nodes[node_id]
+        if gen is not None and gen != node.mine_gen:
+            return
+        bc = node.blockchain
+        transactions = [{
+            "sender_address": "NETWORK",
+            "sender_pubkey": None,
+            "recipient_address": node.url,
+            "amount": 1,
+            "timestamp": self.now,
+            "signature": None
+        }]
+        transactions.extend(self.filler_transactions(len(bc.chain)))
+        block = Block(index=len(bc.chain), transactions=transactions,
+                      timestamp=self.now, previous_hash=bc.last_block.hash, target=bc.next_target())
+        proof = bc.proof_of_work(block)
+        if bc.add_block(block, proof):
+            self.mined.append({"hash": block.hash, "miner": node_id, "time": self.now,
+                               "height": block.index, "hashes": block.nonce + 1})
+            self.adopt(node, [block])
+            self.announce(node, block, exclude=None)
+
+        if self.rate_varies:
+            self.schedule_mining(node)
+            return
+        rate = 1.0 / self.block_interval
+        self.schedule(self.rng.expovariate(rate * node.hashpower), self.on_mine, node_id)
+
+    def filler_transactions(self, height):
+        """
+        Stand-in payload so bandwidth scales with block size; structured like a
+        signed transfer but sent by NETWORK so validation skips ECDSA.
+        """
+        return [{
+            "sender_address": "NETWORK",
+            "sender_pubkey": "04" * 64,
+            "recipient_address": f"{height:08x}{i:032x}",
+            "amount": 1,
+            "timestamp": self.now,
+            "signature": "ab" * 64
+        } for i in range(self.txs_per_block)]
+
+    def adopt(self, node, blocks):
+        for block in blocks:
+            if block.hash not in node.known:
+                node.known.add(block.hash)
+                self.adopted.setdefault(block.hash, []).append(self.now)
+        if self.rate_varies and self.now < self.stop_mining_at:
+            self.schedule_mining(node)  # new tip, new target
+
+    # ----- Propagation strategies -----
+
+    def announce(self, node, block, exclude):
+        peers = [p for p in node.peers if p != exclude]
+        if self.strategy in ("resolve", "resolve-relay"):
+            for peer in peers:
+                self.transport.send(node.id, peer, "announce", None, ANNOUNCE_BYTES, self.on_announce)
+            return
+        if self.strategy == "gossip":
+            peers = self.rng.sample(peers, min(self.fanout, len(peers)))
+        size = self.block_bytes(block)
+        for peer in peers:
+            self.transport.send(node.id, peer, "block", block, size, self.on_block)
+
+    def on_announce(self, node_id, src, _payload):
+        node = self.nodes[node_id]
+        if node.resolving:
+            self.duplicates += 1
+            return
+        node.resolving = True
+        # resolve_conflicts downloads every peer's chain before deciding
+        rtt = max((2 * self.transport.link_latency(node_id, p) for p in node.peers), default=0.0)
+        self.schedule(rtt, self.on_resolve, node_id)
+
+    def on_resolve(self, node_id):
+        node = self.nodes[node_id]
+        node.resolving = False
+        if node.blockchain.resolve_conflicts():
+            self.adopt(node, node.blockchain.chain)
+            if self.strategy == "resolve-relay":
+                self.announce(node, node.blockchain.last_block, exclude=None)
+
+    def on_block(self, node_id, src, block):
+        node = self.nodes[node_id]
+        bc = node.blockchain
+        if block.hash in node.known:
+            self.duplicates += 1
+            return
+
+        if block.previous_hash == bc.last_block.hash:
+            pair = [self.block_dict(bc.last_block), self.block_dict(block)]
+            if bc.is_chain_valid(pair) and bc.add_block(block, block.hash):
+                self.adopt(node, [block])
+                self.announce(node, block, exclude=src)
+            return
+
+        if block.index >= len(bc.chain):
+            # Missing ancestors: fall back to a chain download from the sender
+            saved = bc.nodes
+            bc.nodes = PeerSet.fromkeys([self.nodes[src].url])
+            try:
+                replaced = bc.resolve_conflicts()
+            finally:
+                bc.nodes = saved
+            if replaced:
+                self.adopt(node, bc.chain)
+                self.announce(node, bc.last_block, exclude=src)
+            return
+
+        # Shorter side of a fork: remember it so it is not relayed again
+        node.known.add(block.hash)
+
+    # ----- Reporting -----
+
+    def report(self, mining_seconds, wall_seconds):
+        tips = {}
+        for node in self.nodes:
+            bc = node.blockchain
+            key = (len(bc.chain), bc.last_block.hash)
+            tips[key] = tips.get(key, 0) + 1
+        (best_length, best_tip), _ = max(tips.items(), key=lambda kv: (kv[0][0], kv[1]))
+        best = next(n for n in self.nodes if n.blockchain.last_block.hash == best_tip).blockchain
+        main = {b.hash for b in best.chain}
+
+        mined = len(self.mined)
+        stale = [m for m in self.mined if m["hash"] not in main]
+        total_work = sum(m["hashes"] for m in self.mined) or 1
+        orphaned_work = sum(m["hashes"] for m in stale)
+        main_blocks = best_length - 1
+        total_bytes = sum(self.transport.bytes_by_kind.values())
+
+        n = len(self.nodes)
+        reach = {50: [], 90: [], 100: []}
+        for m in self.mined:
+            if m["hash"] not in main:
+                continue
+            times = sorted(self.adopted.get(m["hash"], []))
+            for pct in reach:
+                needed = max(1, -(-pct * n // 100))
+                if len(times) >= needed:
+                    reach[pct].append(times[needed - 1] - m["time"])
+
+        def mean(values):
+            return sum(values) / len(values) if values else None
+
+        times = [b.timestamp for b in best.chain[1:]]
+        intervals = [b - a for a, b in zip(times, times[1:])]
+        half = len(intervals) // 2
+
+        return {
+            "strategy": self.strategy,
+            "nodes": n,
+            "simulated_seconds": self.now,
+            "mining_seconds": mining_seconds,
+            "wall_seconds": wall_seconds,
+            "speedup": self.now / wall_seconds if wall_seconds else None,
+            "blocks_mined": mined,
+            "main_chain_blocks": main_blocks,
+            "stale_blocks": len(stale),
+            "fork_rate": len(stale) / mined if mined else 0.0,
+            "orphaned_work_fraction": orphaned_work / total_work,
+            "converged": len(tips) == 1,
+            "distinct_tips": len(tips),
+            "bytes_total": total_bytes,
+            "bytes_by_kind": dict(sorted(self.transport.bytes_by_kind.items())),
+            "bytes_per_block": total_bytes / main_blocks if main_blocks else None,
+            "messages": self.transport.messages,
+            "dropped_messages": self.transport.dropped,
+            "duplicate_deliveries": self.duplicates,
+            "propagation_mean_s": {f"p{pct}": mean(v) for pct, v in reach.items()},
+            "block_interval_s": {
+                "mean": mean(intervals),
+                "first_half": mean(intervals[:half]),
+                "second_half": mean(intervals[half:])
+            },
+            "blocks_reaching_all_nodes": len(reach[100])
+        }
+
+
+def run_simulation(args, strategy):
+    sim = Simulator(nodes=args.nodes, degree=args.degree, difficulty=args.difficulty,
+                    block_interval=args.block_interval, strategy=strategy, fanout=args.fanout,
+                    latency_min=args.latency_min, latency_max=args.latency_max,
+                    jitter=args.jitter, bandwidth=args.bandwidth,
+                    txs_per_block=args.txs_per_block, retarget=args.retarget,
+                    hashrate_growth=args.hashrate_growth, seed=args.seed)
+    partition_rng = random.Random(args.seed + 1)
+    for spec in args.partition:
+        start, end, fraction = (float(x) for x in spec.split(":"))
+        ids = list(range(args.nodes))
+        partition_rng.shuffle(ids)
+        cut = int(round(fraction * args.nodes))
+        groups = [0] * args.nodes
+        for i in ids[cut:]:
+            groups[i] = 1
+        sim.transport.add_partition(start, end, groups)
+
+    mining_seconds = args.blocks * args.block_interval
+    started = time.perf_counter()
+    sim.start_mining(stop_at=mining_seconds)
+    sim.run(until=mining_seconds + args.drain)
+    return sim.report(mining_seconds, time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate network_node consensus in memory.")
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--degree", type=int, default=8, help="average peers per node")
+    parser.add_argument("--blocks", type=int, default=100, help="expected blocks mined network-wide")
+    parser.add_argument("--block-interval", type=float, default=10.0, help="mean seconds between blocks")
+    parser.add_argument("--difficulty", type=int, default=1, help="real PoW difficulty used to build blocks")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="resolve")
+    parser.add_argument("--compare", nargs="+", choices=STRATEGIES,
+                        help="run the same seed under several strategies")
+    parser.add_argument("--fanout", type=int, default=3, help="peers per relay for gossip")
+    parser.add_argument("--latency-min", type=float, default=0.02)
+    parser.add_argument("--latency-max", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--bandwidth", type=float, default=1_000_000, help="bytes per second per link")
+    parser.add_argument("--txs-per-block", type=int, default=0)
+    parser.add_argument("--retarget", action="store_true",
+                        help="nodes retarget toward --block-interval (integer targets)")
+    parser.add_argument("--hashrate-growth", type=float, default=1.0,
+                        help="network hashrate grows linearly to this multiple while mining")
+    parser.add_argument("--partition", action="append", default=[], metavar="START:END:FRACTION",
+                        help="split the network for simulated seconds [START, END)")
+    parser.add_argument("--drain", type=float, default=30.0,
+                        help="simulated seconds to let messages settle after mining stops")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+
+    strategies = args.compare or [args.strategy]
+    results = [run_simulation(args, s) for s in strategies]
+    report = {"config": {k: v for k, v in vars(args).items() if k != "output"}, "results": results}
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+#snapshots.py — hash-committed snapshots of derived chain state for fast bootstrap
+#
+# A snapshot covers blocks [0, height): the balances they produce, the hash of
+# block height-1 (`tip`) and the number of confirmed transactions, committed
+# to by `hash`, the SHA-256 of the other fields as sorted JSON. A node given that hash out of
+# band can adopt the state, download and fully validate only the blocks after
+# `tip`, and backfill the older history later.
+
+import hashlib
+import json
+
+FIELDS = ("height", "tip", "difficulty", "balances", "tx_count")
+
+
+def snapshot_hash(snapshot):
+    state = {name: snapshot[name] for name in FIELDS}
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+
+def make_snapshot(height, tip, difficulty, balances, tx_count):
+    """
+    balances: {address (str): amount}; addresses with a zero balance are left out.
+    """
+    snapshot = {
+        "height": height,
+        "tip": tip,
+        "difficulty": difficulty,
+        "balances": {address: amount for address, amount in sorted(balances.items()) if amount},
+        "tx_count": tx_count
+    }
+    snapshot["hash"] = snapshot_hash(snapshot)
+    return snapshot
+
+
+def verify_snapshot(snapshot, expected_hash):
+    """
+    (ok, msg): the snapshot is well formed and commits to expected_hash.
+    """
+    try:
+        if snapshot_hash(snapshot) != expected_hash.lower():
+            return False, "Snapshot hash mismatch"
+        if snapshot.get("hash") != expected_hash.lower():
+            return False, "Snapshot hash field mismatch"
+        if not isinstance(snapshot["height"], int) or snapshot["height"] < 2:
+            return False, "Invalid snapshot height"
+    except (KeyError, TypeError, AttributeError):
+        return False, "Malformed snapshot"
+    return True, "Snapshot verified"
@@ -0,0 +1,405 @@
+#tracing.py — named timing spans, per-request trace trees and an on-demand sampling profiler
+
+import collections
+import functools
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+# ---------- Spans / Traces ----------
+
+class Span:
+    def __init__(self, name, start, attrs=None):
+        self.name = name
+        self.start = start
+        self.end = None
+        self.attrs = attrs or {}
+        self.children = []
+
+    @property
+    def duration(self):
+        if self.end is None:
+            return 0.0
+        return self.end - self.start
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 4),
+            "attrs": self.attrs,
+            "children": [c.to_dict() for c in self.children]
+        }
+
+
+class Trace:
+    """
+    One trace tree, usually one HTTP request.
+    Individual spans are kept up to `max_spans`; past that (e.g. is_chain_valid
+    hashing every block of a long chain) only the per-name summary grows.
+    """
+
+    def __init__(self, trace_id, name, max_spans, attrs=None):
+        self.trace_id = trace_id
+        self.thread_id = threading.get_ident()
+        self.root = Span(name, time.perf_counter(), attrs)
+        self.wall_start = time.time()
+        self.max_spans = max_spans
+        self.span_count = 1
+        self.dropped = 0
+        self.summary = {}
+        self.stack = [self.root]
+
+    def record(self, name, duration):
+        count, total, worst = self.summary.get(name, (0, 0.0, 0.0))
+        self.summary[name] = (count + 1, total + duration, max(worst, duration))
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "wall_start": self.wall_start,
+            "duration_ms": round(self.root.duration * 1000, 4),
+            "spans": self.span_count,
+            "dropped_spans": self.dropped,
+            "summary": {
+                name: {
+                    "count": count,
+                    "total_ms": round(total * 1000, 4),
+                    "max_ms": round(worst * 1000, 4)
+                }
+                for name, (count, total, worst) in sorted(
+                    self.summary.items(), key=lambda kv: -kv[1][1])
+            },
+            "root": self.root.to_dict()
+        }
+
+    def chrome_events(self, pid=None):
+        """
+        Chrome trace format ("X" complete events), viewable in chrome://tracing or Perfetto.
+        """
+        pid = pid or os.getpid()
+        offset = self.wall_start - self.root.start
+        events = []
+
+        def walk(span):
+            events.append({
+                "name": span.name,
+                "cat": "span",
+                "ph": "X",
+                "ts": round((span.start + offset) * 1e6, 3),
+                "dur": round(span.duration * 1e6, 3),
+                "pid": pid,
+                "tid": self.thread_id,
+                "args": dict(span.attrs, trace_id=self.trace_id)
+            })
+            for child in span.children:
+                walk(child)
+
+        walk(self.root)
+        return events
+
+
+class Tracer:
+    def __init__(self, max_traces=100, max_spans=5000, enabled=True):
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.traces = collections.deque(maxlen=max_traces)
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        return getattr(self._local, "trace", None)
+
+    def start_trace(self, name, **attrs):
+        if not self.enabled:
+            return None
+        trace = Trace(next(self._ids), name, self.max_spans, attrs)
+        self._local.trace = trace
+        return trace
+
+    def finish_trace(self, **attrs):
+        trace = self.current
+        if trace is None:
+            return None
+        self._local.trace = None
+        trace.root.end = time.perf_counter()
+        trace.root.attrs.update(attrs)
+        with self._lock:
+            self.traces.append(trace)
+        return trace
+
+    @contextmanager
+    def trace(self, name, **attrs):
+        """
+        Explicit trace for work outside a request (background threads, CLI tools).
+        """
+        if self.current is not None:
+            with self.span(name, **attrs):
+                yield self.current
+            return
+        trace = self.start_trace(name, **attrs)
+        try:
+            yield trace
+        finally:
+            self.finish_trace()
+
+    @contextmanager
+    def span(self, name, **attrs):
+        trace = self.current
+        if trace is None:
+            yield None
+            return
+
+        start = time.perf_counter()
+        span = None
+        if trace.span_count < trace.max_spans:
+            span = Span(name, start, attrs)
+            trace.stack[-1].children.append(span)
+            trace.stack.append(span)
+            trace.span_count += 1
+        else:
+            trace.dropped += 1
+
+        try:
+            yield span
+        finally:
+            end = time.perf_counter()
+            trace.record(name, end - start)
+            if span is not None:
+                span.end = end
+                trace.stack.pop()
+
+    def traced(self, name=None):
+        """
+        Decorator form of span(). Costs one thread-local lookup when no trace is active.
+        """
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if getattr(self._local, "trace", None) is None:
+                    return func(*args, **kwargs)
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def get(self, trace_id):
+        with self._lock:
+            for trace in self.traces:
+                if trace.trace_id == trace_id:
+                    return trace
+        return None
+
+    def recent(self, limit=None):
+        with self._lock:
+            traces = list(self.traces)
+        traces.reverse()
+        return traces[:limit] if limit else traces
+
+    def export_json(self, traces):
+        return [t.to_dict() for t in traces]
+
+    def export_chrome(self, traces):
+        events = []
+        for trace in traces:
+            events.extend(trace.chrome_events())
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+# ---------- Sampling profiler ----------
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a daemon thread snapshots every other thread's stack
+    via sys._current_frames() at a fixed interval. Safe to start and stop on a
+    live node; costs nothing while stopped.
+    """
+
+    def __init__(self):
+        self.interval = 0.005
+        self.samples = collections.Counter()
+        self.sample_count = 0
+        self.started_at = None
+        self.stopped_at = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=0.005):
+        if type(interval) not in (int, float) or not math.isfinite(interval):
+            raise ValueError("interval must be a finite number of seconds")
+        with self._lock:
+            if self.running:
+                return False
+            self.interval = max(0.0005, float(interval))
+            self.samples = collections.Counter()
+            self.sample_count = 0
+            self.started_at = time.time()
+            self.stopped_at = None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        with self._lock:
+            if not self.running:
+                return False
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.stopped_at = time.time()
+            return True
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[tuple(stack)] += 1
+            self.sample_count += 1
+
+    def report(self, top=30):
+        samples = self.samples.copy()
+        total = sum(samples.values()) or 1
+        own_counts = collections.Counter()
+        inclusive_counts = collections.Counter()
+        for stack, count in samples.items():
+            own_counts[stack[-1]] += count
+            for func in set(stack):
+                inclusive_counts[func] += count
+
+        def rows(counter):
+            return [
+                {"function": func, "samples": count, "percent": round(100.0 * count / total, 2)}
+                for func, count in counter.most_common(top)
+            ]
+
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "ticks": self.sample_count,
+            "stack_samples": sum(samples.values()),
+            "self": rows(own_counts),
+            "inclusive": rows(inclusive_counts)
+        }
+
+    def folded(self):
+        """
+        Collapsed-stack text, the input format of flamegraph.pl / speedscope.
+        """
+        lines = [";".join(stack) + f" {count}" for stack, count in self.samples.copy().items()]
+        return "\n".join(sorted(lines)) + "\n"
+
+
+tracer = Tracer()
+profiler = SamplingProfiler()
+
+
+# ---------- Flask integration ----------
+
+LOOPBACK = ("127.0.0.1", "::1")
+
+
+def install(app, tracer=tracer, profiler=profiler):
+    """
+    Wrap every request in a trace and add the /debug endpoints:
+      GET  /debug/traces[?limit=&format=json|chrome]
+      GET  /debug/traces/<id>[?format=json|chrome]
+      POST /debug/tracing   {"enabled": true|false}
+      GET  /debug/profiler[?format=json|folded]
+      POST /debug/profiler  {"action": "start"|"stop", "interval": 0.005}
+    They are unauthenticated, so they only answer requests from localhost
+    unless app.config["DEBUG_ENDPOINTS_REMOTE"] is set.
+    """
+    from flask import Response, jsonify, request
+
+    @app.before_request
+    def _start_request_trace():
+        if request.path.startswith("/debug/"):
+            if not app.config.get("DEBUG_ENDPOINTS_REMOTE") and request.remote_addr not in LOOPBACK:
+                return jsonify({"message": "/debug endpoints only answer localhost"}), 403
+            return
+        tracer.start_trace(f"{request.method} {request.path}",
+                           query=request.query_string.decode(errors="replace"))
+
+    @app.teardown_request
+    def _finish_request_trace(exc):
+        if exc is not None:
+            tracer.finish_trace(error=repr(exc))
+        else:
+            tracer.finish_trace()
+
+    def render(traces):
+        if request.args.get("format") == "chrome":
+            return Response(json.dumps(tracer.export_chrome(traces)), mimetype="application/json")
+        return jsonify(tracer.export_json(traces))
+
+    @app.route("/debug/traces", methods=["GET"])
+    def debug_traces():
+        limit = request.args.get("limit", default=20, type=int)
+        return render(tracer.recent(limit)), 200
+
+    @app.route("/debug/traces/<int:trace_id>", methods=["GET"])
+    def debug_trace(trace_id):
+        trace = tracer.get(trace_id)
+        if trace is None:
+            return jsonify({"message": "Unknown trace"}), 404
+        return render([trace]), 200
+
+    @app.route("/debug/tracing", methods=["POST"])
+    def debug_tracing():
+        data = request.get_json(silent=True) or {}
+        if "enabled" in data:
+            tracer.enabled = bool(data["enabled"])
+        return jsonify({"enabled": tracer.enabled}), 200
+
+    @app.route("/debug/profiler", methods=["GET", "POST"])
+    def debug_profiler():
+        if request.method == "GET":
+            if request.args.get("format") == "folded":
+                return Response(profiler.folded(), mimetype="text/plain"), 200
+            return jsonify(profiler.report(request.args.get("top", default=30, type=int))), 200
+
+        data = request.get_json(silent=True) or {}
+        action = data.get("action")
+        if action == "start":
+            interval = data.get("interval", 0.005)
+            if type(interval) not in (int, float) or not math.isfinite(interval):
+                return jsonify({"message": "interval must be a finite number of seconds"}), 400
+            started = profiler.start(interval)
+            message = "Profiler started" if started else "Profiler already running"
+        elif action == "stop":
+            stopped = profiler.stop()
+            message = "Profiler stopped" if stopped else "Profiler not running"
+        else:
+            return jsonify({"message": "action must be 'start' or 'stop'"}), 400
+        return jsonify({"message": message, "running": profiler.running}), 200
+
+    return app